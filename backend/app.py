@@ -1,26 +1,97 @@
+import click
 from flask import Flask
 from flask_cors import CORS
 from config import Config
 from models.database import db
-from routes.crops import crops_bp
-from routes.iot import iot_bp
-from routes.marketplace import marketplace_bp
+from routes.crops import crops_bp, recommender
+from routes.fertilizer import fertilizer_bp, advisor
+from routes.iot import iot_bp, anomaly_detector, ingest_queue, ingestor, stream_hub
+from routes.marketplace import marketplace_bp, product_search, response_cache
 from routes.predictions import predictions_bp
 from routes.chatbot import chatbot_bp
+from services.db_engine import configure_engine, engine_options
+from services.json_provider import FastJSONProvider
+from services.metrics import RequestMetrics
+
+request_metrics = RequestMetrics()
+
+def _service_metrics():
+    """Scrape-time gauges and counters from the in-process services"""
+    queue = ingest_queue.stats()
+    yield 'sensor_ingest_queue_depth', 'gauge', 'Readings waiting to be written', [({}, queue['depth'])]
+    yield 'sensor_ingest_queue_capacity', 'gauge', 'Readings the ingest queue may hold', [({}, queue['maxPending'])]
+    yield 'sensor_ingest_readings_total', 'counter', 'Readings handled by the ingest queue', [
+        ({'outcome': outcome}, queue[outcome]) for outcome in ('enqueued', 'flushed', 'inserted', 'rejected', 'lostReadings')
+    ]
+    yield 'sensor_ingest_flushes_total', 'counter', 'Ingest queue flushes', [
+        ({'result': 'ok'}, queue['flushes'] - queue['failedFlushes']), ({'result': 'error'}, queue['failedFlushes'])
+    ]
+    yield 'sensor_ingest_flush_seconds', 'gauge', 'Ingest queue flush latency', [
+        ({'stat': 'mean'}, queue['meanFlushMs'] / 1000),
+        ({'stat': 'max'}, queue['maxFlushMs'] / 1000),
+        ({'stat': 'last'}, queue['lastFlushMs'] / 1000)
+    ]
+    yield 'sensor_ingest_oldest_pending_seconds', 'gauge', 'Age of the oldest queued reading', [
+        ({}, queue['oldestPendingMs'] / 1000)
+    ]
+    yield 'sensor_stream_subscribers', 'gauge', 'Connected live sensor stream clients', [
+        ({}, stream_hub.subscriber_count())
+    ]
+    anomalies = anomaly_detector.stats()
+    yield 'sensor_anomalies_active', 'gauge', 'Active sensor anomalies', [({}, anomalies['active'])]
+    yield 'sensor_anomalies_detected_total', 'counter', 'Anomalous readings detected', [({}, anomalies['detected'])]
+    yield 'sensor_anomaly_sensors_tracked', 'gauge', 'Sensors with an anomaly baseline', [
+        ({}, anomalies['sensorsTracked'])
+    ]
+    
+    caches = {
+        'marketplace_responses': response_cache.stats(),
+        'crop_recommendations': recommender.cache_stats(),
+        'fertilizer_plans': advisor.cache_stats()
+    }
+    for field, metric_type in (('hits', 'counter'), ('misses', 'counter'), ('evictions', 'counter'), ('size', 'gauge')):
+        suffix = '_total' if metric_type == 'counter' else ''
+        yield f'cache_{field}{suffix}', metric_type, f'Cache {field}', [
+            ({'cache': cache}, stats[field]) for cache, stats in caches.items()
+        ]
+
+def init_db():
+    """
+    Create missing database tables and the product search index
+
+    Also adds the sensor reading key to sensor_data tables created before
+    it existed, which create_all() cannot do.
+    """
+    db.create_all()
+    ingestor.ensure_unique_key()
+    product_search.ensure_index()
 
 def create_app():
     """Create and configure Flask application"""
     app = Flask(__name__)
     app.config.from_object(Config)
     
-    # Initialize database
+    # orjson-backed jsonify()/request.get_json() (stdlib json if not installed)
+    app.json = FastJSONProvider(app)
+    
+    # Initialize database with the pooled/WAL engine profile
+    if 'SQLALCHEMY_ENGINE_OPTIONS' not in app.config:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine, app.config)
     
     # Enable CORS
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
+    # Request/DB instrumentation, exported at /api/metrics
+    request_metrics.init_app(app)
+    request_metrics.register_collector(_service_metrics)
+    
     # Register blueprints
     app.register_blueprint(crops_bp, url_prefix=f'/api/{app.config["API_VERSION"]}/crops')
+    app.register_blueprint(fertilizer_bp, url_prefix=f'/api/{app.config["API_VERSION"]}/fertilizer')
     app.register_blueprint(iot_bp, url_prefix=f'/api/{app.config["API_VERSION"]}/iot')
     app.register_blueprint(marketplace_bp, url_prefix=f'/api/{app.config["API_VERSION"]}/marketplace')
     app.register_blueprint(predictions_bp, url_prefix=f'/api/{app.config["API_VERSION"]}/predict')
@@ -34,9 +105,17 @@ def create_app():
     def health():
         return {'status': 'healthy', 'version': app.config['API_VERSION']}
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create database tables and the product search index"""
+        init_db()
+        click.echo('Database initialized.')
+    
+    # Schema creation is normally left to `flask init-db`, so starting a
+    # worker does not touch the database
+    if app.config['AUTO_CREATE_SCHEMA']:
+        with app.app_context():
+            init_db()
     
     return app
 
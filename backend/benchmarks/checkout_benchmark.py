@@ -0,0 +1,184 @@
+"""
+Load test for POST /api/v1/marketplace/checkout on one popular product
+
+Worker processes (each with several buyer threads, like gunicorn workers
+with threads) all buy the same listing at once:
+
+    sellout    the product starts with --stock units; buyers keep buying
+               until it is gone. Units sold must equal the starting
+               stock and the final stock must be exactly 0 (no oversell).
+    sustained  the product has effectively unlimited stock; reports
+               checkouts per second for every second of the run, so a
+               throughput collapse under contention is visible.
+
+Usage (from backend/):
+    python benchmarks/checkout_benchmark.py
+    python benchmarks/checkout_benchmark.py --processes 4 --threads 16 --stock 5000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from run_benchmarks import BENCHMARK_DIR, create_benchmark_app, percentile
+
+UNLIMITED_STOCK = 10 ** 12
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Load test the checkout endpoint on one hot product')
+    parser.add_argument('--processes', type=int, default=4, help='worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='buyer threads per process')
+    parser.add_argument('--stock', type=int, default=2000, help='starting stock in the sellout phase')
+    parser.add_argument('--max-quantity', type=int, default=3, help='units per checkout (1..n)')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds of the sustained phase')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=os.path.join(BENCHMARK_DIR, 'checkout_results.json'))
+    return parser.parse_args(argv)
+
+def _setup(database_path, stock):
+    app = create_benchmark_app(database_path)
+    from app import init_db
+    from models.database import db, Product
+    with app.app_context():
+        init_db()
+        product = Product(name='Harvest Day Mangoes', description='promotion', price=5.0, stock=stock,
+                          category='Fruits', farmer='Benchmark')
+        db.session.add(product)
+        db.session.commit()
+        return product.id
+
+def _final_stock(database_path, product_id):
+    app = create_benchmark_app(database_path)
+    from models.database import db, Product
+    with app.app_context():
+        return db.session.get(Product, product_id).stock
+
+def _buyer_process(database_path, product_id, worker, args, duration, barrier, results):
+    app = create_benchmark_app(database_path)
+    report = {'latencies': [], 'sold': 0, 'checkouts': 0, 'rejected': 0, 'errors': 0, 'perSecond': Counter()}
+    lock = threading.Lock()
+    sold_out = threading.Event()
+
+    def buy(thread):
+        client = app.test_client()
+        rng = random.Random(args.seed + worker * 1000 + thread)
+        latencies, per_second = [], Counter()
+        sold = checkouts = rejected = errors = 0
+        while time.monotonic() < deadline and not sold_out.is_set():
+            quantity = rng.randint(1, args.max_quantity)
+            started = time.perf_counter()
+            response = client.post('/api/v1/marketplace/checkout', json={
+                'items': [{'productId': product_id, 'quantity': quantity}]
+            })
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code == 200:
+                sold += quantity
+                checkouts += 1
+                per_second[int(time.monotonic() - begin)] += 1
+            elif response.status_code == 409:
+                rejected += 1
+                if response.get_json()['items'][0].get('availableStock') == 0:
+                    sold_out.set()
+            else:
+                errors += 1
+        with lock:
+            report['latencies'].extend(latencies)
+            report['perSecond'].update(per_second)
+            report['sold'] += sold
+            report['checkouts'] += checkouts
+            report['rejected'] += rejected
+            report['errors'] += errors
+
+    barrier.wait()
+    begin = time.monotonic()
+    deadline = begin + duration if duration else float('inf')
+    threads = [threading.Thread(target=buy, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    report['perSecond'] = dict(report['perSecond'])
+    results.put(report)
+
+def run_phase(ctx, args, stock, duration):
+    with tempfile.TemporaryDirectory() as workdir:
+        database_path = os.path.join(workdir, 'checkout.db')
+        with ctx.Pool(1) as pool:
+            product_id = pool.apply(_setup, (database_path, stock))
+
+        barrier = ctx.Barrier(args.processes)
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=_buyer_process,
+                        args=(database_path, product_id, i, args, duration, barrier, results))
+            for i in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        reports = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+
+        with ctx.Pool(1) as pool:
+            final_stock = pool.apply(_final_stock, (database_path, product_id))
+
+    latencies = sorted(ms for report in reports for ms in report['latencies'])
+    per_second = Counter()
+    for report in reports:
+        per_second.update({int(second): count for second, count in report['perSecond'].items()})
+    # Whole seconds only; the last one is usually partial
+    full_seconds = [per_second[s] for s in range(int(duration))] if duration else []
+    return {
+        'startingStock': stock,
+        'finalStock': final_stock,
+        'unitsSold': sum(report['sold'] for report in reports),
+        'checkouts': sum(report['checkouts'] for report in reports),
+        'rejected': sum(report['rejected'] for report in reports),
+        'errors': sum(report['errors'] for report in reports),
+        'requests': len(latencies),
+        'p50': round(percentile(latencies, 0.50), 3),
+        'p95': round(percentile(latencies, 0.95), 3),
+        'p99': round(percentile(latencies, 0.99), 3),
+        'checkoutsPerSecond': full_seconds
+    }
+
+def main(argv=None):
+    args = parse_args(argv)
+    ctx = multiprocessing.get_context('spawn')
+    buyers = args.processes * args.threads
+    print(f'{buyers} concurrent buyers ({args.processes} processes x {args.threads} threads) on one product')
+
+    sellout = run_phase(ctx, args, args.stock, duration=None)
+    oversold = sellout['unitsSold'] - sellout['startingStock']
+    consistent = sellout['finalStock'] == 0 and oversold == 0
+    print(f"sellout    stock {sellout['startingStock']} -> {sellout['finalStock']}, sold {sellout['unitsSold']} "
+          f"in {sellout['checkouts']} checkouts, {sellout['rejected']} rejected, {sellout['errors']} errors  "
+          f"p95 {sellout['p95']:.2f}ms  {'OK' if consistent else 'OVERSOLD' if oversold > 0 else 'MISMATCH'}")
+
+    sustained = run_phase(ctx, args, UNLIMITED_STOCK, duration=args.duration)
+    rates = sustained['checkoutsPerSecond'] or [0]
+    print(f"sustained  {sum(rates) / len(rates):.1f} checkouts/s (per second: min {min(rates)}, max {max(rates)})  "
+          f"p50 {sustained['p50']:.2f}ms  p95 {sustained['p95']:.2f}ms  p99 {sustained['p99']:.2f}ms  "
+          f"errors {sustained['errors']}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'meta': {
+                'timestamp': datetime.utcnow().isoformat(),
+                'parameters': {k: v for k, v in vars(args).items() if k != 'output'}
+            },
+            'results': {'sellout': sellout, 'sustained': sustained}
+        }, f, indent=2)
+    print(f'Results written to {args.output}')
+    return 0 if consistent and not sellout['errors'] and not sustained['errors'] else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Read/write concurrency benchmark for the SQLite engine profile
+
+Starts reader and writer processes against one seeded SQLite file, the
+way several gunicorn workers share it. Readers page through marketplace
+listings (response cache disabled, so every request reads the database)
+while writers post sensor batches and create products. Each engine
+profile runs twice, once with readers alone and once with writers
+active, so the table shows how much writes slow reads down.
+
+Profiles:
+    legacy   rollback journal, synchronous=FULL, default cache, no mmap,
+             5 s busy timeout (what pysqlite does with no engine options)
+    default  the configured profile from config.py (WAL unless overridden)
+
+Usage (from backend/):
+    python benchmarks/concurrency_benchmark.py
+    python benchmarks/concurrency_benchmark.py --readers 8 --writers 2 --duration 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from run_benchmarks import BENCHMARK_DIR, CATEGORIES, WORDS, create_benchmark_app, percentile, seed_database
+
+PROFILES = {
+    'legacy': {
+        'SQLITE_JOURNAL_MODE': 'delete',
+        'SQLITE_SYNCHRONOUS': 'full',
+        'SQLITE_CACHE_SIZE_KB': '2000',
+        'SQLITE_MMAP_SIZE': '0',
+        'DB_BUSY_TIMEOUT_MS': '5000'
+    },
+    'default': {}
+}
+SORTS = ['name', 'price-low', 'price-high', 'rating']
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Measure read latency while writers are active')
+    parser.add_argument('--profiles', default='legacy,default', help=f'comma-separated: {", ".join(PROFILES)}')
+    parser.add_argument('--readers', type=int, default=4, help='reader processes')
+    parser.add_argument('--writers', type=int, default=2, help='writer processes')
+    parser.add_argument('--duration', type=float, default=5.0, help='seconds per phase')
+    parser.add_argument('--batch-size', type=int, default=500, help='readings per writer request')
+    parser.add_argument('--products', type=int, default=5000, help='products to seed')
+    parser.add_argument('--sensors', type=int, default=50, help='fleet sensors to seed')
+    parser.add_argument('--hours', type=int, default=24, help='hours of sensor history to seed')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=os.path.join(BENCHMARK_DIR, 'concurrency_results.json'))
+    return parser.parse_args(argv)
+
+def _seed(database_path, args):
+    app = create_benchmark_app(database_path)
+    from app import init_db
+    with app.app_context():
+        init_db()
+    seed_database(app, args)
+    from routes.iot import ingest_queue
+    ingest_queue.drain()
+
+def _reader(database_path, worker, duration, barrier, results):
+    client = create_benchmark_app(database_path).test_client()
+    rng = random.Random(worker)
+    latencies = []
+    errors = 0
+    barrier.wait()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        params = {'sortBy': rng.choice(SORTS), 'page': rng.randint(1, 50), 'limit': 20}
+        if rng.random() < 0.5:
+            params['category'] = rng.choice(CATEGORIES)
+        started = time.perf_counter()
+        status = client.get('/api/v1/marketplace/products', query_string=params).status_code
+        latencies.append((time.perf_counter() - started) * 1000)
+        errors += status >= 500
+    results.put({'role': 'reader', 'latencies': latencies, 'errors': errors})
+
+def _writer(database_path, worker, duration, batch_size, barrier, results):
+    client = create_benchmark_app(database_path).test_client()
+    rng = random.Random(1000 + worker)
+    written = 0
+    errors = 0
+    step = 0
+    barrier.wait()
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        step += 1
+        stamp = datetime(2001, 1, 1) + timedelta(hours=worker * 100000 + step)
+        readings = [{
+            'sensorId': f'load-{worker}-{i}', 'temperature': 24.0, 'humidity': 60.0,
+            'soilMoisture': 70.0, 'waterUsage': 100.0, 'timestamp': stamp.isoformat()
+        } for i in range(batch_size)]
+        response = client.post('/api/v1/iot/readings?durability=flush', json=readings)
+        errors += response.status_code >= 500
+        written += response.status_code < 300 and batch_size
+        response = client.post('/api/v1/marketplace/products', json={
+            'name': f'Load {rng.choice(WORDS)}', 'description': 'concurrency benchmark', 'price': 10.0,
+            'stock': 5, 'category': rng.choice(CATEGORIES)
+        })
+        errors += response.status_code >= 500
+    from routes.iot import ingest_queue
+    ingest_queue.drain()
+    results.put({'role': 'writer', 'written': written, 'errors': errors})
+
+def run_phase(ctx, database_path, args, writers):
+    barrier = ctx.Barrier(args.readers + writers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_reader, args=(database_path, i, args.duration, barrier, results))
+        for i in range(args.readers)
+    ] + [
+        ctx.Process(target=_writer, args=(database_path, i, args.duration, args.batch_size, barrier, results))
+        for i in range(writers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = sorted(ms for r in reports if r['role'] == 'reader' for ms in r['latencies'])
+    return {
+        'readers': args.readers,
+        'writers': writers,
+        'reads': len(latencies),
+        'readsPerSecond': round(len(latencies) / args.duration, 1),
+        'p50': round(percentile(latencies, 0.50), 3),
+        'p95': round(percentile(latencies, 0.95), 3),
+        'p99': round(percentile(latencies, 0.99), 3),
+        'max': round(latencies[-1], 3) if latencies else 0.0,
+        'readErrors': sum(r['errors'] for r in reports if r['role'] == 'reader'),
+        'rowsWrittenPerSecond': round(sum(r['written'] for r in reports if r['role'] == 'writer') / args.duration, 1),
+        'writeErrors': sum(r['errors'] for r in reports if r['role'] == 'writer')
+    }
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Fresh interpreters, so each process builds its own engine from the environment
+    ctx = multiprocessing.get_context('spawn')
+    os.environ['MARKETPLACE_CACHE_SIZE'] = '0'
+
+    results = {}
+    for profile in args.profiles.split(','):
+        saved = {key: os.environ.get(key) for key in PROFILES[profile]}
+        os.environ.update(PROFILES[profile])
+        try:
+            with tempfile.TemporaryDirectory() as workdir:
+                database_path = os.path.join(workdir, 'concurrency.db')
+                seeder = ctx.Process(target=_seed, args=(database_path, args))
+                seeder.start()
+                seeder.join()
+                for phase, writers in (('readOnly', 0), ('mixed', args.writers)):
+                    stats = run_phase(ctx, database_path, args, writers)
+                    results[f'{profile}.{phase}'] = stats
+                    print(f"{profile + '.' + phase:20s} {stats['readsPerSecond']:>8.1f} reads/s  "
+                          f"p50 {stats['p50']:>8.2f}ms  p95 {stats['p95']:>8.2f}ms  p99 {stats['p99']:>8.2f}ms  "
+                          f"max {stats['max']:>8.1f}ms  errors {stats['readErrors']}/{stats['writeErrors']}  "
+                          f"writes {stats['rowsWrittenPerSecond']:>8.1f} rows/s")
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'meta': {
+                'timestamp': datetime.utcnow().isoformat(),
+                'parameters': {k: v for k, v in vars(args).items() if k != 'output'}
+            },
+            'results': results
+        }, f, indent=2)
+    print(f'Results written to {args.output}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
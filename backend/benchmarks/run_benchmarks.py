@@ -0,0 +1,362 @@
+"""
+Performance benchmarks for the AgriNova360 API
+
+Runs every blueprint through the Flask test client (no network) against a
+freshly seeded temporary SQLite database, plus microbenchmarks of the
+service classes. Results are written as JSON and compared against a stored
+baseline; the run fails if any benchmark regresses past the threshold,
+and also (exit code 2) if there is no baseline to compare with.
+benchmarks/baseline.json is a reference run with the default parameters;
+re-record it on the machine that runs the comparison.
+
+Usage (from backend/):
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --threshold 0.25
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.join(BACKEND_DIR, 'benchmarks')
+
+CATEGORIES = ['Grains', 'Vegetables', 'Fruits', 'Dairy', 'Spices', 'Preserves']
+WORDS = ['Organic', 'Fresh', 'Basmati', 'Heirloom', 'Tomato', 'Wheat', 'Mango', 'Chili',
+         'Rice', 'Onion', 'Honey', 'Turmeric', 'Millet', 'Ghee', 'Potato', 'Spinach']
+SOIL_TYPES = ['Loamy', 'Clay', 'Sandy', 'Silty']
+CROPS = ['Wheat', 'Corn', 'Tomatoes', 'Potatoes', 'Rice', 'Barley']
+FERTILIZER_CROPS = ['Wheat', 'Corn', 'Tomatoes', 'Potatoes']
+CHAT_MESSAGES = ['How do I grow wheat?', 'Best crop for dry land', 'tomato care', 'hello',
+                 'How do I control aphids?', 'my soil is too acidic']
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Run API and service benchmarks')
+    parser.add_argument('--products', type=int, default=2000, help='products to seed')
+    parser.add_argument('--sensors', type=int, default=200, help='fleet sensors to seed')
+    parser.add_argument('--hours', type=int, default=72, help='hours of sensor history to seed')
+    parser.add_argument('--iterations', type=int, default=200, help='timed calls per benchmark')
+    parser.add_argument('--warmup', type=int, default=10, help='untimed calls per benchmark')
+    parser.add_argument('--batch-size', type=int, default=100, help='items per batch-endpoint call')
+    parser.add_argument('--catalog-size', type=int, default=5000, help='crop varieties in the large-catalog benchmark')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', default=None, help='comma-separated name prefixes to run')
+    parser.add_argument('--output', default=os.path.join(BENCHMARK_DIR, 'results.json'))
+    parser.add_argument('--baseline', default=os.path.join(BENCHMARK_DIR, 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help='exit 0 instead of 2 when there is no baseline to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown vs baseline as a fraction (0.25 = 25%%)')
+    parser.add_argument('--metric', default='p95', choices=['p50', 'p95', 'p99', 'mean'],
+                        help='latency statistic compared against the baseline')
+    return parser.parse_args(argv)
+
+def create_benchmark_app(database_path):
+    """Import the app against a throwaway database"""
+    # Config reads the environment at import time
+    os.environ['DATABASE_URL'] = f'sqlite:///{database_path}'
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app, init_db
+    app = create_app()
+    with app.app_context():
+        init_db()
+    return app
+
+def seed_database(app, args):
+    """Fill the database with products and a simulated fleet history"""
+    from sqlalchemy import insert
+    from models.database import db, Product
+    from simulate_sensors import FleetSimulator
+    from routes.iot import ingestor
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        products = [{
+            'name': f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}',
+            'description': ' '.join(rng.choice(WORDS).lower() for _ in range(12)),
+            'price': round(rng.uniform(5, 150), 2),
+            'stock': rng.randint(0, 500),
+            'category': rng.choice(CATEGORIES),
+            'image': '🌾',
+            'farmer': f'Farmer {rng.randint(1, 200)}',
+            'rating': round(rng.uniform(3, 5), 1),
+            'reviews': rng.randint(0, 300)
+        } for i in range(args.products)]
+        db.session.execute(insert(Product), products)
+        db.session.commit()
+
+        fleet = FleetSimulator(size=args.sensors, seed=args.seed, id_prefix='bench')
+        ingestor.ingest(fleet.iter_readings(hours=args.hours))
+
+    return fleet.sensor_ids
+
+def http_cases(client, sensor_ids, args):
+    """(name, callable) pairs, one HTTP request per call"""
+    rng = random.Random(args.seed)
+    api = '/api/v1'
+    counter = {'reading': 0}
+
+    def get(path, **params):
+        return lambda: client.get(path, query_string={k: v() if callable(v) else v for k, v in params.items()}).status_code
+
+    def post(path, body):
+        return lambda: client.post(path, json=body()).status_code
+
+    def crop_query():
+        return {'soilType': rng.choice(SOIL_TYPES), 'temperature': round(rng.uniform(5, 40), 1),
+                'humidity': round(rng.uniform(30, 95), 1)}
+
+    def new_readings():
+        # A distinct timestamp per reading, so every one is inserted rather
+        # than skipped as a duplicate
+        readings = []
+        for _ in range(args.batch_size):
+            counter['reading'] += 1
+            readings.append({'sensorId': rng.choice(sensor_ids), 'temperature': 24.0, 'humidity': 60.0,
+                             'soilMoisture': 70.0, 'waterUsage': 100.0,
+                             'timestamp': (datetime(2000, 1, 1) + timedelta(minutes=counter['reading'])).isoformat()})
+        return readings
+
+    def product_csv():
+        lines = ['name,description,price,stock,category,farmer']
+        lines += [f'Imported {rng.choice(WORDS)},bulk import,{rng.uniform(5, 150):.2f},{rng.randint(0, 500)},'
+                  f'{rng.choice(CATEGORIES)},Cooperative' for _ in range(args.batch_size)]
+        return '\n'.join(lines) + '\n'
+
+    def yield_columns():
+        n = args.batch_size
+        return {
+            'cropType': [rng.choice(CROPS) for _ in range(n)],
+            'fieldSize': [round(rng.uniform(0.5, 20), 1) for _ in range(n)],
+            'temperature': [round(rng.uniform(5, 40), 1) for _ in range(n)],
+            'humidity': [round(rng.uniform(30, 95), 1) for _ in range(n)],
+            'soilMoisture': [round(rng.uniform(35, 95), 1) for _ in range(n)],
+            'season': 'Kharif'
+        }
+
+    product_count = max(args.products, 1)
+    return [
+        ('crops.recommend', get(f'{api}/crops/recommend', soilType=lambda: rng.choice(SOIL_TYPES),
+                                temperature=lambda: round(rng.uniform(5, 40), 1),
+                                humidity=lambda: round(rng.uniform(30, 95), 1))),
+        ('crops.recommend_batch', post(f'{api}/crops/recommend/batch',
+                                       lambda: {'queries': [crop_query() for _ in range(args.batch_size)]})),
+        ('crops.list', get(f'{api}/crops/list')),
+        ('fertilizer.recommend', get(f'{api}/fertilizer/recommend', cropType=lambda: rng.choice(FERTILIZER_CROPS),
+                                     soilType=lambda: rng.choice(SOIL_TYPES),
+                                     soilPh=lambda: round(rng.uniform(5, 8.5), 1))),
+        ('fertilizer.recommend_batch', post(f'{api}/fertilizer/recommend/batch', lambda: {
+            'fields': [{'cropType': rng.choice(FERTILIZER_CROPS), 'soilType': rng.choice(SOIL_TYPES),
+                        'soilPh': round(rng.uniform(5, 8.5), 1)} for _ in range(args.batch_size)]})),
+        ('app.metrics', get('/api/metrics')),
+        ('iot.sensors', get(f'{api}/iot/sensors')),
+        ('iot.sensor', get(f'{api}/iot/sensors/sensor-001')),
+        ('iot.history_24h', lambda: client.get(f'{api}/iot/sensors/{rng.choice(sensor_ids)}/history?hours=24').status_code),
+        ('iot.history_30d', lambda: client.get(f'{api}/iot/sensors/{rng.choice(sensor_ids)}/history?hours=720').status_code),
+        ('iot.export_csv', lambda: client.get(f'{api}/iot/export', query_string={
+            'sensorId': rng.choice(sensor_ids), 'format': 'csv'}).status_code),
+        ('iot.ingest_batch', post(f'{api}/iot/readings', new_readings)),
+        ('iot.ingest_batch_enqueue', post(f'{api}/iot/readings?durability=enqueue', new_readings)),
+        ('marketplace.list', get(f'{api}/marketplace/products', page=lambda: rng.randint(1, 20))),
+        ('marketplace.list_cursor', get(f'{api}/marketplace/products', sortBy='price-low', cursor='')),
+        ('marketplace.search', get(f'{api}/marketplace/products', search=lambda: rng.choice(WORDS)[:4])),
+        ('marketplace.product', lambda: client.get(f'{api}/marketplace/products/{rng.randint(1, product_count)}').status_code),
+        ('marketplace.create', post(f'{api}/marketplace/products', lambda: {
+            'name': f'Bench {rng.choice(WORDS)}', 'description': 'benchmark product', 'price': 10.0,
+            'stock': 5, 'category': rng.choice(CATEGORIES)})),
+        ('marketplace.import_csv', lambda: client.post(f'{api}/marketplace/products/import', data=product_csv(),
+                                                       content_type='text/csv').status_code),
+        ('predictions.yield', post(f'{api}/predict/yield', lambda: {
+            'cropType': rng.choice(CROPS), 'fieldSize': round(rng.uniform(0.5, 20), 1), 'season': 'Kharif',
+            'conditions': {'temperature': round(rng.uniform(5, 40), 1), 'humidity': round(rng.uniform(30, 95), 1),
+                           'soilMoisture': round(rng.uniform(35, 95), 1)}})),
+        ('predictions.yield_batch', post(f'{api}/predict/yield/batch', yield_columns)),
+        ('predictions.history', get(f'{api}/predict/yield/history', cropType='Wheat')),
+        ('chatbot.respond', post(f'{api}/chatbot/respond', lambda: {
+            'message': rng.choice(CHAT_MESSAGES)})),
+        ('chatbot.classify', post(f'{api}/chatbot/classify', lambda: {
+            'messages': [rng.choice(CHAT_MESSAGES) for _ in range(args.batch_size)]})),
+        ('chatbot.search', get(f'{api}/chatbot/search', q='drip irrigation for sandy soil', k=3)),
+    ]
+
+def synthetic_catalog(rng, size):
+    """Random crop varieties shaped like a regional catalog (benchmark data only)"""
+    catalog = {}
+    for i in range(size):
+        temp_min = rng.randint(0, 32)
+        hum_min = rng.randint(20, 80)
+        catalog[f'Variety {i:05d}'] = {
+            'soilTypes': rng.sample(SOIL_TYPES, rng.randint(1, 2)),
+            'tempRange': (temp_min, temp_min + rng.choice([3, 5, 8, 10])),
+            'humidityRange': (hum_min, hum_min + rng.randint(5, 25)),
+            'suitability': rng.choice(['Excellent', 'Good', 'Fair']),
+            'yield': rng.choice(['High', 'Medium', 'Low'])
+        }
+    return catalog
+
+def micro_cases(args):
+    """(name, callable) pairs calling service methods directly"""
+    from services.crop_recommender import CropRecommender
+    from services.fertilizer_advisor import FertilizerAdvisor
+    from services.yield_predictor import YieldPredictor
+
+    rng = random.Random(args.seed)
+    cached = CropRecommender()
+    uncached = CropRecommender(cache_size=0)
+    large = CropRecommender(cache_size=0)
+    large.crop_database = synthetic_catalog(rng, args.catalog_size)
+    predictor = YieldPredictor()
+    advisor = FertilizerAdvisor()
+    fields = [(rng.choice(FERTILIZER_CROPS), rng.choice(SOIL_TYPES), rng.uniform(5, 8.5)) for _ in range(args.batch_size)]
+    queries = [(rng.choice(SOIL_TYPES), rng.uniform(5, 40), rng.uniform(30, 95)) for _ in range(args.batch_size)]
+    n = args.batch_size
+    columns = (
+        [rng.choice(CROPS) for _ in range(n)], [rng.uniform(0.5, 20) for _ in range(n)],
+        [rng.uniform(5, 40) for _ in range(n)], [rng.uniform(30, 95) for _ in range(n)],
+        [rng.uniform(35, 95) for _ in range(n)]
+    )
+
+    def conditions():
+        return {'temperature': rng.uniform(5, 40), 'humidity': rng.uniform(30, 95), 'soilMoisture': rng.uniform(35, 95)}
+
+    return [
+        ('service.crop_recommend', lambda: uncached.get_recommendations(*rng.choice(queries))),
+        ('service.crop_recommend_cached', lambda: cached.get_recommendations(*rng.choice(queries))),
+        ('service.crop_recommend_large_catalog', lambda: large.get_recommendations(*rng.choice(queries))),
+        ('service.crop_recommend_batch', lambda: uncached.get_recommendations_batch(queries)),
+        ('service.fertilizer_batch', lambda: advisor.get_recommendations_batch(fields)),
+        ('service.yield_predict', lambda: predictor.predict(rng.choice(CROPS), 5.0, conditions(), 'Kharif')),
+        ('service.yield_predict_many', lambda: predictor.predict_many(*columns, seasons='Kharif')),
+    ]
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+def measure(call, iterations, warmup):
+    """Time `iterations` calls and summarize latency in milliseconds"""
+    errors = 0
+    for _ in range(warmup):
+        call()
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        status = call()
+        latencies.append((time.perf_counter_ns() - t0) / 1e6)
+        if isinstance(status, int) and status >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'iterations': iterations,
+        'errors': errors,
+        'throughput': round(iterations / elapsed, 2) if elapsed else 0.0,
+        'mean': round(sum(latencies) / len(latencies), 4),
+        'p50': round(percentile(latencies, 0.50), 4),
+        'p95': round(percentile(latencies, 0.95), 4),
+        'p99': round(percentile(latencies, 0.99), 4)
+    }
+
+def compare(results, baseline, metric, threshold):
+    """
+    Compare a run against a baseline
+
+    Returns:
+        list: (name, baseline value, current value, ratio, regressed) rows
+    """
+    rows = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base or not base.get(metric):
+            continue
+        ratio = stats[metric] / base[metric]
+        rows.append((name, base[metric], stats[metric], ratio, ratio > 1 + threshold))
+    return rows
+
+def run(cases, args, results):
+    prefixes = tuple(args.only.split(',')) if args.only else None
+    for name, call in cases:
+        if prefixes and not name.startswith(prefixes):
+            continue
+        stats = measure(call, args.iterations, args.warmup)
+        results[name] = stats
+        print(f"{name:36s} {stats['throughput']:>10.1f}/s  p50 {stats['p50']:>8.3f}ms  "
+              f"p95 {stats['p95']:>8.3f}ms  p99 {stats['p99']:>8.3f}ms  errors {stats['errors']}")
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = create_benchmark_app(os.path.join(workdir, 'benchmark.db'))
+        print(f'Seeding {args.products} products and {args.sensors} sensors x {args.hours}h ...')
+        sensor_ids = seed_database(app, args)
+
+        results = {}
+        run(http_cases(app.test_client(), sensor_ids, args), args, results)
+        run(micro_cases(args), args, results)
+
+        # Flush queued readings while the temporary database still exists
+        from routes.iot import ingest_queue
+        ingest_queue.drain()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline', 'save_baseline', 'allow_missing_baseline')}
+        },
+        'results': results
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Results written to {args.output}')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'ERROR: no baseline at {args.baseline}; nothing was checked for regressions. '
+              f'Run with --save-baseline to create one', file=sys.stderr)
+        return 0 if args.allow_missing_baseline else 2
+
+    with open(args.baseline) as f:
+        stored = json.load(f)
+    baseline = stored.get('results', {})
+    # --only just selects which benchmarks run; any other difference changes the workload
+    recorded = {k: v for k, v in stored.get('meta', {}).get('parameters', {}).items() if k != 'only'}
+    if recorded != {k: v for k, v in report['meta']['parameters'].items() if k != 'only'}:
+        print('WARNING: baseline was recorded with different parameters; comparisons may be meaningless',
+              file=sys.stderr)
+
+    regressions = 0
+    print(f'\nComparison against baseline ({args.metric}, threshold +{args.threshold:.0%}):')
+    for name, base, current, ratio, regressed in compare(results, baseline, args.metric, args.threshold):
+        regressions += regressed
+        flag = 'REGRESSION' if regressed else 'ok'
+        print(f'{name:36s} {base:>9.3f}ms -> {current:>9.3f}ms  x{ratio:5.2f}  {flag}')
+
+    if regressions:
+        print(f'{regressions} benchmark(s) regressed by more than {args.threshold:.0%}')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
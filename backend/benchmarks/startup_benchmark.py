@@ -0,0 +1,156 @@
+"""
+Cold-start benchmark for the AgriNova360 API
+
+Starts a fresh interpreter per run (as an autoscaled or serverless worker
+would) and times three phases: importing app, create_app(), and serving
+the first request. Each run is traced with `python -X importtime`, and
+the slowest imports are reported grouped by top-level package, so a new
+eager import of a heavy library shows up by name. Results are compared
+against a stored baseline like run_benchmarks.py.
+
+Usage (from backend/):
+    python benchmarks/startup_benchmark.py --save-baseline
+    python benchmarks/startup_benchmark.py --runs 10 --top 15
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+
+from run_benchmarks import BACKEND_DIR, BENCHMARK_DIR, compare
+
+PHASES = ('import', 'createApp', 'firstRequest', 'total')
+
+# Runs inside the child interpreter; prints phase timings as JSON
+CHILD = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+status = app.test_client().get('/api/health').status_code
+served = time.perf_counter()
+print(json.dumps({
+    'import': (imported - started) * 1000,
+    'createApp': (created - imported) * 1000,
+    'firstRequest': (served - created) * 1000,
+    'total': (served - started) * 1000,
+    'status': status
+}))
+"""
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Measure API cold-start time')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to start')
+    parser.add_argument('--top', type=int, default=10, help='packages listed in the import breakdown')
+    parser.add_argument('--output', default=os.path.join(BENCHMARK_DIR, 'startup_results.json'))
+    parser.add_argument('--baseline', default=os.path.join(BENCHMARK_DIR, 'startup_baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown vs baseline as a fraction (0.25 = 25%%)')
+    return parser.parse_args(argv)
+
+def parse_importtime(stderr):
+    """Self time in ms per top-level package from -X importtime output"""
+    packages = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(self_us) / 1000
+    return packages
+
+def start_once(database_path):
+    """One cold start in a child interpreter: (phase timings, import breakdown)"""
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database_path}')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f'App failed to start:\n{completed.stderr[-2000:]}')
+    timings = json.loads(completed.stdout.strip().splitlines()[-1])
+    return timings, parse_importtime(completed.stderr)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    runs = []
+    packages = defaultdict(list)
+    with tempfile.TemporaryDirectory() as workdir:
+        # One untimed start warms the OS file cache and writes bytecode
+        start_once(os.path.join(workdir, 'startup.db'))
+        for _ in range(args.runs):
+            timings, breakdown = start_once(os.path.join(workdir, 'startup.db'))
+            runs.append(timings)
+            for package, ms in breakdown.items():
+                packages[package].append(ms)
+
+    results = {}
+    for phase in PHASES:
+        values = sorted(run[phase] for run in runs)
+        results[f'startup.{phase}'] = {
+            'runs': len(values),
+            'mean': round(statistics.fmean(values), 3),
+            'p50': round(statistics.median(values), 3),
+            'max': round(values[-1], 3)
+        }
+        print(f"startup.{phase:14s} p50 {results[f'startup.{phase}']['p50']:>9.1f}ms  "
+              f"max {results[f'startup.{phase}']['max']:>9.1f}ms")
+
+    imports = sorted(
+        ((package, statistics.median(values)) for package, values in packages.items()),
+        key=lambda item: item[1], reverse=True
+    )
+    print(f'\nSlowest imports (self time per top-level package, median of {args.runs} runs):')
+    for package, ms in imports[:args.top]:
+        print(f'  {package:30s} {ms:>9.1f}ms')
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': {'runs': args.runs}
+        },
+        'results': results,
+        'imports': {package: round(ms, 3) for package, ms in imports}
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nResults written to {args.output}')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Baseline saved to {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline found; run with --save-baseline to create one')
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f).get('results', {})
+
+    regressions = 0
+    print(f'\nComparison against baseline (p50, threshold +{args.threshold:.0%}):')
+    for name, base, current, ratio, regressed in compare(results, baseline, 'p50', args.threshold):
+        regressions += regressed
+        flag = 'REGRESSION' if regressed else 'ok'
+        print(f'{name:36s} {base:>9.3f}ms -> {current:>9.3f}ms  x{ratio:5.2f}  {flag}')
+    if regressions:
+        print(f'{regressions} phase(s) regressed by more than {args.threshold:.0%}')
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
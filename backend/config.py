@@ -9,10 +9,106 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///agrinova.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Database engine profile (see services/db_engine.py)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', 15000))
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'wal')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'normal')
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 65536))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    
     # CORS settings
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5173').split(',')
     
     # API settings
     API_VERSION = 'v1'
     DEBUG = os.environ.get('FLASK_ENV') == 'development'
+    
+    # Create missing tables on every start instead of via `flask init-db`
+    AUTO_CREATE_SCHEMA = os.environ.get('AUTO_CREATE_SCHEMA', 'false').lower() in ('1', 'true', 'yes')
+    
+    # Crop recommendation settings
+    CROP_CATALOG_PATH = os.environ.get('CROP_CATALOG_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'crops.json'
+    )
+    CROP_RECOMMENDATION_CACHE_SIZE = int(os.environ.get('CROP_RECOMMENDATION_CACHE_SIZE', 4096))
+    CROP_BATCH_MAX_QUERIES = int(os.environ.get('CROP_BATCH_MAX_QUERIES', 50000))
+    
+    # Chatbot settings
+    CHATBOT_INTENTS_PATH = os.environ.get('CHATBOT_INTENTS_PATH') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'chatbot_intents.json'
+    )
+    CHATBOT_BATCH_MAX_MESSAGES = int(os.environ.get('CHATBOT_BATCH_MAX_MESSAGES', 10000))
+    KNOWLEDGE_BASE_DIR = os.environ.get('KNOWLEDGE_BASE_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'data', 'knowledge_base'
+    )
+    KNOWLEDGE_BASE_INDEX_DIR = os.environ.get('KNOWLEDGE_BASE_INDEX_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'kb_index'
+    )
+    # Knowledge-base answers below this cosine similarity fall back to the generic reply
+    CHATBOT_KB_MIN_SCORE = float(os.environ.get('CHATBOT_KB_MIN_SCORE', 0.1))
+    CHATBOT_KB_TOP_K = int(os.environ.get('CHATBOT_KB_TOP_K', 3))
+    
+    # Fertilizer advisor settings
+    FERTILIZER_CACHE_SIZE = int(os.environ.get('FERTILIZER_CACHE_SIZE', 4096))
+    FERTILIZER_BATCH_MAX_FIELDS = int(os.environ.get('FERTILIZER_BATCH_MAX_FIELDS', 50000))
+    
+    # Marketplace settings
+    MARKETPLACE_CACHE_SIZE = int(os.environ.get('MARKETPLACE_CACHE_SIZE', 1024))
+    # Replaced on every catalog write so all workers on the host drop their
+    # cached listings (empty string: invalidate only the writing worker)
+    MARKETPLACE_CACHE_SHARED_PATH = os.environ.get(
+        'MARKETPLACE_CACHE_SHARED_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'marketplace_cache.generation')
+    ) or None
+    MARKETPLACE_CHECKOUT_MAX_ITEMS = int(os.environ.get('MARKETPLACE_CHECKOUT_MAX_ITEMS', 200))
+    MARKETPLACE_IMPORT_CHUNK_SIZE = int(os.environ.get('MARKETPLACE_IMPORT_CHUNK_SIZE', 1000))
+    MARKETPLACE_IMPORT_MAX_ROWS = int(os.environ.get('MARKETPLACE_IMPORT_MAX_ROWS', 100000))
+    
+    # Yield prediction settings
+    YIELD_MODEL_DIR = os.environ.get('YIELD_MODEL_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'instance', 'models'
+    )
+    YIELD_BATCH_MAX_FIELDS = int(os.environ.get('YIELD_BATCH_MAX_FIELDS', 50000))
+    
+    # Sensor ingestion settings
+    SENSOR_INGEST_CHUNK_SIZE = int(os.environ.get('SENSOR_INGEST_CHUNK_SIZE', 500))
+    SENSOR_INGEST_MAX_READINGS = int(os.environ.get('SENSOR_INGEST_MAX_READINGS', 50000))
+    
+    # Write-behind ingest queue: "flush" acknowledges a request once its
+    # readings are committed, "enqueue" as soon as they are queued
+    SENSOR_INGEST_DURABILITY = os.environ.get('SENSOR_INGEST_DURABILITY', 'flush')
+    SENSOR_INGEST_QUEUE_MAX_READINGS = int(os.environ.get('SENSOR_INGEST_QUEUE_MAX_READINGS', 200000))
+    SENSOR_INGEST_BATCH_SIZE = int(os.environ.get('SENSOR_INGEST_BATCH_SIZE', 2000))
+    SENSOR_INGEST_FLUSH_INTERVAL = float(os.environ.get('SENSOR_INGEST_FLUSH_INTERVAL', 0.5))
+    SENSOR_INGEST_FLUSH_TIMEOUT = float(os.environ.get('SENSOR_INGEST_FLUSH_TIMEOUT', 30))
+    SENSOR_INGEST_DRAIN_SECONDS = float(os.environ.get('SENSOR_INGEST_DRAIN_SECONDS', 30))
+    # Seconds clients are told to wait (Retry-After) when the queue is full
+    SENSOR_INGEST_RETRY_AFTER = int(os.environ.get('SENSOR_INGEST_RETRY_AFTER', 5))
+    
+    # Live sensor stream settings
+    SENSOR_STREAM_MAX_PENDING = int(os.environ.get('SENSOR_STREAM_MAX_PENDING', 1000))
+    SENSOR_STREAM_HEARTBEAT_SECONDS = float(os.environ.get('SENSOR_STREAM_HEARTBEAT_SECONDS', 15))
+    SENSOR_STREAM_POLL_SECONDS = float(os.environ.get('SENSOR_STREAM_POLL_SECONDS', 5))
+    
+    # Rows fetched and encoded per chunk by the sensor history export
+    SENSOR_EXPORT_CHUNK_SIZE = int(os.environ.get('SENSOR_EXPORT_CHUNK_SIZE', 50000))
+    
+    # Minimum number of buckets a history response should contain; the
+    # coarsest rollup (hourly/daily) meeting it is used
+    SENSOR_HISTORY_MIN_POINTS = int(os.environ.get('SENSOR_HISTORY_MIN_POINTS', 24))
+    
+    # Streaming anomaly detection: readings further than Z_THRESHOLD
+    # standard deviations from a sensor's own EWMA baseline are spikes,
+    # CUSUM sums above CUSUM_H are level shifts
+    SENSOR_ANOMALY_ALPHA = float(os.environ.get('SENSOR_ANOMALY_ALPHA', 0.05))
+    SENSOR_ANOMALY_WARMUP = int(os.environ.get('SENSOR_ANOMALY_WARMUP', 30))
+    SENSOR_ANOMALY_Z_THRESHOLD = float(os.environ.get('SENSOR_ANOMALY_Z_THRESHOLD', 4.0))
+    SENSOR_ANOMALY_CUSUM_K = float(os.environ.get('SENSOR_ANOMALY_CUSUM_K', 0.5))
+    SENSOR_ANOMALY_CUSUM_H = float(os.environ.get('SENSOR_ANOMALY_CUSUM_H', 8.0))
+    SENSOR_ANOMALY_MIN_STD = float(os.environ.get('SENSOR_ANOMALY_MIN_STD', 0.5))
+    SENSOR_ANOMALY_CLEAR_AFTER = int(os.environ.get('SENSOR_ANOMALY_CLEAR_AFTER', 3))
 
@@ -6,6 +6,12 @@ db = SQLAlchemy()
 class Product(db.Model):
     """Product model for marketplace"""
     __tablename__ = 'products'
+    __table_args__ = (
+        # (sort key, id) indexes let cursor pagination seek straight to a page
+        db.Index('ix_products_name_id', 'name', 'id'),
+        db.Index('ix_products_price_id', 'price', 'id'),
+        db.Index('ix_products_rating_id', 'rating', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -39,6 +45,10 @@ class Product(db.Model):
 class SensorData(db.Model):
     """IoT Sensor data model"""
     __tablename__ = 'sensor_data'
+    __table_args__ = (
+        # Gateways retry uploads, so a reading is identified by sensor and timestamp
+        db.UniqueConstraint('sensor_id', 'timestamp', name='uq_sensor_data_sensor_timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     sensor_id = db.Column(db.String(50), nullable=False)
@@ -59,3 +69,62 @@ class SensorData(db.Model):
             'timestamp': self.timestamp.isoformat() if self.timestamp else None
         }
 
+
+class SensorRollupMixin:
+    """Shared columns for per-sensor aggregate tables (min/max/sum/count per bucket)"""
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sensor_id = db.Column(db.String(50), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    temperature_min = db.Column(db.Float, nullable=False)
+    temperature_max = db.Column(db.Float, nullable=False)
+    temperature_sum = db.Column(db.Float, nullable=False)
+    humidity_min = db.Column(db.Float, nullable=False)
+    humidity_max = db.Column(db.Float, nullable=False)
+    humidity_sum = db.Column(db.Float, nullable=False)
+    soil_moisture_min = db.Column(db.Float, nullable=False)
+    soil_moisture_max = db.Column(db.Float, nullable=False)
+    soil_moisture_sum = db.Column(db.Float, nullable=False)
+    water_usage_min = db.Column(db.Float, nullable=False)
+    water_usage_max = db.Column(db.Float, nullable=False)
+    water_usage_sum = db.Column(db.Float, nullable=False)
+    
+    def to_dict(self):
+        count = self.count or 1
+        return {
+            'sensorId': self.sensor_id,
+            'timestamp': self.bucket_start.isoformat(),
+            'resolution': self.RESOLUTION,
+            'count': self.count,
+            'temperature': round(self.temperature_sum / count, 2),
+            'temperatureMin': self.temperature_min,
+            'temperatureMax': self.temperature_max,
+            'humidity': round(self.humidity_sum / count, 2),
+            'humidityMin': self.humidity_min,
+            'humidityMax': self.humidity_max,
+            'soilMoisture': round(self.soil_moisture_sum / count, 2),
+            'soilMoistureMin': self.soil_moisture_min,
+            'soilMoistureMax': self.soil_moisture_max,
+            'waterUsage': round(self.water_usage_sum / count, 2),
+            'waterUsageMin': self.water_usage_min,
+            'waterUsageMax': self.water_usage_max
+        }
+
+class SensorHourlyRollup(SensorRollupMixin, db.Model):
+    """Hourly aggregates of sensor_data, maintained on ingestion"""
+    __tablename__ = 'sensor_rollup_hourly'
+    __table_args__ = (
+        db.UniqueConstraint('sensor_id', 'bucket_start', name='uq_sensor_rollup_hourly_bucket'),
+    )
+    
+    RESOLUTION = 'hour'
+
+class SensorDailyRollup(SensorRollupMixin, db.Model):
+    """Daily aggregates of sensor_data, maintained on ingestion"""
+    __tablename__ = 'sensor_rollup_daily'
+    __table_args__ = (
+        db.UniqueConstraint('sensor_id', 'bucket_start', name='uq_sensor_rollup_daily_bucket'),
+    )
+    
+    RESOLUTION = 'day'
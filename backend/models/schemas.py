@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Crop Recommendation Schemas
 class CropRecommendationRequest(BaseModel):
@@ -9,10 +9,12 @@ class CropRecommendationRequest(BaseModel):
     humidity: float = Field(..., description="Humidity percentage")
 
 class CropRecommendation(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     crop: str
     suitability: str
     reason: str
-    yield: str
+    yield_: str = Field(..., alias='yield')  # "yield" is a Python keyword
     score: float
 
 # IoT Sensor Schemas
@@ -26,15 +28,52 @@ class SensorReading(BaseModel):
     status: str
     lastUpdate: datetime
 
+class SensorReadingCreate(BaseModel):
+    model_config = ConfigDict(allow_inf_nan=False)
+
+    sensorId: str = Field(..., min_length=1, max_length=50)
+    temperature: float
+    humidity: float = Field(..., ge=0, le=100)
+    soilMoisture: float = Field(..., ge=0, le=100)
+    waterUsage: float = Field(0, ge=0)
+    timestamp: datetime
+
+    @field_validator('timestamp')
+    @classmethod
+    def to_naive_utc(cls, value: datetime) -> datetime:
+        """Store timestamps as naive UTC, matching datetime.utcnow() defaults"""
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 # Marketplace Schemas
 class ProductCreate(BaseModel):
-    name: str
+    model_config = ConfigDict(allow_inf_nan=False, str_strip_whitespace=True)
+
+    # Lengths match the products table columns
+    name: str = Field(..., min_length=1, max_length=100)
     description: str
-    price: float
-    stock: int
-    category: str
-    image: Optional[str] = "🌾"
-    farmer: Optional[str] = "Unknown"
+    price: float = Field(..., ge=0)
+    stock: int = Field(..., ge=0)
+    category: str = Field(..., min_length=1, max_length=50)
+    image: str = Field("🌾", max_length=10)
+    farmer: str = Field("Unknown", max_length=100)
+
+    @field_validator('image', 'farmer', mode='before')
+    @classmethod
+    def null_to_default(cls, value, info):
+        """Treat an explicit null like a missing optional field"""
+        if value is None:
+            return cls.model_fields[info.field_name].default
+        return value
+
+class CheckoutItem(BaseModel):
+    productId: int = Field(..., ge=1)
+    quantity: int = Field(..., ge=1)
+
+class CheckoutRequest(BaseModel):
+    items: List[CheckoutItem] = Field(..., min_length=1)
+    allOrNothing: bool = True
 
 class ProductResponse(BaseModel):
     id: int
@@ -1,7 +1,21 @@
 from flask import Blueprint, request, jsonify
-import openai  # Placeholder - can be replaced with custom logic
+from config import Config
+from services.crop_recommender import CropRecommender
+from services.fertilizer_advisor import advisor
+from services.intent_matcher import IntentMatcher
+from services.knowledge_base import KnowledgeBase, crop_documents, fertilizer_documents, load_corpus
 
 chatbot_bp = Blueprint('chatbot', __name__)
+intent_matcher = IntentMatcher.from_file(Config.CHATBOT_INTENTS_PATH)
+
+def _knowledge_base_documents():
+    return (
+        load_corpus(Config.KNOWLEDGE_BASE_DIR)
+        + crop_documents(CropRecommender(cache_size=0, catalog_path=Config.CROP_CATALOG_PATH).crop_database)
+        + fertilizer_documents(advisor)
+    )
+
+knowledge_base = KnowledgeBase(Config.KNOWLEDGE_BASE_INDEX_DIR, _knowledge_base_documents)
 
 @chatbot_bp.route('/respond', methods=['POST'])
 def respond():
@@ -14,7 +28,8 @@ def respond():
     - context: str - Additional context (optional)
     
     Returns:
-    - JSON object with bot response and confidence score
+    - JSON object with bot response, matched intent and confidence score;
+      answers from the knowledge base also list their sources
     """
     try:
         data = request.get_json()
@@ -25,12 +40,32 @@ def respond():
         if not message:
             return jsonify({'error': 'Message is required'}), 400
         
-        # TODO: Integrate with OpenAI API or custom NLP model
-        # For now, return a mock response
-        response = generate_response(message, conversation_history, context)
+        # Answer from the intent table first
+        match = intent_matcher.classify(message)
+        if match['intent'] != intent_matcher.fallback['intent']:
+            return jsonify({
+                'response': match['response'],
+                'intent': match['intent'],
+                'confidence': 0.85,
+                'context': context
+            }), 200
+        
+        # No intent matched: answer with the closest knowledge-base passage
+        passages = knowledge_base.search(message, k=Config.CHATBOT_KB_TOP_K, min_score=Config.CHATBOT_KB_MIN_SCORE)
+        if passages:
+            return jsonify({
+                'response': passages[0]['text'],
+                'intent': 'knowledge_base',
+                'confidence': passages[0]['score'],
+                'sources': [
+                    {'title': p['title'], 'source': p['source'], 'score': p['score']} for p in passages
+                ],
+                'context': context
+            }), 200
         
         return jsonify({
-            'response': response,
+            'response': match['response'],
+            'intent': match['intent'],
             'confidence': 0.85,
             'context': context
         }), 200
@@ -38,21 +73,56 @@ def respond():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def generate_response(message, history, context):
-    """
-    Generate chatbot response (placeholder - replace with actual AI model)
+@chatbot_bp.route('/classify', methods=['POST'])
+def classify():
     """
-    message_lower = message.lower()
+    Classify many messages in one call
     
-    # Simple keyword-based responses
-    if any(word in message_lower for word in ['wheat', 'grain']):
-        return 'Based on your query, wheat grows well in arid regions with well-drained loamy soil. It requires moderate temperature (15-25°C) and moderate humidity (50-70%).'
-    elif any(word in message_lower for word in ['tomato', 'tomatoes']):
-        return 'Based on your query, tomatoes grow well in warm climates with loamy soil. They need temperatures between 20-28°C and moderate humidity around 60-75%.'
-    elif any(word in message_lower for word in ['corn', 'maize']):
-        return 'Based on your query, corn grows well in warm regions with loamy or clay soil. Optimal temperature is 20-30°C with high humidity (60-80%).'
-    elif any(word in message_lower for word in ['arid', 'desert', 'dry']):
-        return 'Based on your query, crops that grow well in arid regions include wheat, barley, millet, and certain varieties of corn. These crops are drought-resistant and can thrive with minimal water.'
-    else:
-        return 'Based on your query, this crop grows well in arid regions. For more specific information, please provide details about the crop type, soil conditions, or climate you\'re interested in.'
+    Request Body:
+    - messages: array - User messages (strings)
+    
+    Returns:
+    - JSON object with one {intent, response, matched} result per message, in order
+    - 413 if there are more than CHATBOT_BATCH_MAX_MESSAGES messages
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        messages = data.get('messages')
+        
+        if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+            return jsonify({'error': 'messages must be an array of strings'}), 400
+        if len(messages) > Config.CHATBOT_BATCH_MAX_MESSAGES:
+            return jsonify({
+                'error': f'At most {Config.CHATBOT_BATCH_MAX_MESSAGES} messages per request'
+            }), 413
+        
+        return jsonify({'results': intent_matcher.classify_many(messages)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
+@chatbot_bp.route('/search', methods=['GET'])
+def search_knowledge_base():
+    """
+    Search the agronomy knowledge base
+    
+    Query Parameters:
+    - q: str - Question or keywords
+    - k: int - Number of passages to return (default 3, max 20)
+    
+    Returns:
+    - JSON object with passages ranked by cosine similarity
+    """
+    try:
+        query = request.args.get('q', '').strip()
+        k = request.args.get('k', 3, type=int)
+        
+        if not query:
+            return jsonify({'error': 'q is required'}), 400
+        if k is None or not 1 <= k <= 20:
+            return jsonify({'error': 'k must be between 1 and 20'}), 400
+        
+        return jsonify({'results': knowledge_base.search(query, k=k)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,8 +1,13 @@
+from numbers import Number
 from flask import Blueprint, request, jsonify
+from config import Config
 from services.crop_recommender import CropRecommender
 
 crops_bp = Blueprint('crops', __name__)
-recommender = CropRecommender()
+recommender = CropRecommender(
+    cache_size=Config.CROP_RECOMMENDATION_CACHE_SIZE,
+    catalog_path=Config.CROP_CATALOG_PATH
+)
 
 @crops_bp.route('/recommend', methods=['GET'])
 def recommend_crops():
@@ -45,6 +50,61 @@ def recommend_crops():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@crops_bp.route('/recommend/batch', methods=['POST'])
+def recommend_crops_batch():
+    """
+    Get crop recommendations for many field conditions in one request
+    
+    Request Body:
+    - queries: array - Field conditions, each with
+        - soilType: str (Loamy, Clay, Sandy, Silty)
+        - temperature: float (in Celsius)
+        - humidity: float (percentage)
+    
+    Returns:
+    - JSON object with one {query, recommendations} entry per query, in order
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        queries = data.get('queries')
+        
+        if not isinstance(queries, list) or not queries:
+            return jsonify({'error': 'queries must be a non-empty array'}), 400
+        if len(queries) > Config.CROP_BATCH_MAX_QUERIES:
+            return jsonify({
+                'error': f'Too many queries: at most {Config.CROP_BATCH_MAX_QUERIES} per request'
+            }), 413
+        
+        conditions = []
+        for index, query in enumerate(queries):
+            if not isinstance(query, dict):
+                return jsonify({'error': f'queries[{index}] must be an object'}), 400
+            soil_type = query.get('soilType')
+            temperature = query.get('temperature')
+            humidity = query.get('humidity')
+            if (not isinstance(soil_type, str) or not soil_type
+                    or not isinstance(temperature, Number) or isinstance(temperature, bool)
+                    or not isinstance(humidity, Number) or isinstance(humidity, bool)):
+                return jsonify({
+                    'error': f'queries[{index}] missing required parameters: soilType, temperature, humidity'
+                }), 400
+            conditions.append((soil_type, float(temperature), float(humidity)))
+        
+        recommendations = recommender.get_recommendations_batch(conditions)
+        
+        return jsonify({
+            'results': [
+                {
+                    'recommendations': recs,
+                    'query': {'soilType': soil_type, 'temperature': temperature, 'humidity': humidity}
+                }
+                for (soil_type, temperature, humidity), recs in zip(conditions, recommendations)
+            ]
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @crops_bp.route('/list', methods=['GET'])
 def list_crops():
     """Get list of all available crops"""
@@ -54,3 +114,11 @@ def list_crops():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+
+@crops_bp.route('/cache/stats', methods=['GET'])
+def recommendation_cache_stats():
+    """Get hit/miss/eviction counters for the recommendation cache"""
+    try:
+        return jsonify(recommender.cache_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,102 @@
+from numbers import Number
+from flask import Blueprint, request, jsonify
+from config import Config
+from services.fertilizer_advisor import advisor
+
+fertilizer_bp = Blueprint('fertilizer', __name__)
+
+@fertilizer_bp.route('/recommend', methods=['GET'])
+def recommend_fertilizer():
+    """
+    Get a fertilizer plan for a crop
+    
+    Query Parameters:
+    - cropType: str - Type of crop
+    - soilType: str - Type of soil
+    - soilPh: float (optional) - Soil pH
+    
+    Returns:
+    - JSON object with nutrient requirements, recommended fertilizers,
+      application schedule and soil notes
+    """
+    try:
+        crop_type = request.args.get('cropType', type=str)
+        soil_type = request.args.get('soilType', type=str)
+        soil_ph = request.args.get('soilPh', type=float)
+        
+        if not crop_type or not soil_type:
+            return jsonify({
+                'error': 'Missing required parameters: cropType, soilType'
+            }), 400
+        if 'soilPh' in request.args and soil_ph is None:
+            return jsonify({'error': 'soilPh must be a number'}), 400
+        
+        plan = advisor.get_recommendations(crop_type, soil_type, soil_ph)
+        if 'error' in plan:
+            return jsonify(plan), 404
+        return jsonify(plan), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@fertilizer_bp.route('/recommend/batch', methods=['POST'])
+def recommend_fertilizer_batch():
+    """
+    Get fertilizer plans for many fields in one request
+    
+    Request Body:
+    - fields: array - One entry per field, each with
+        - cropType: str
+        - soilType: str
+        - soilPh: float (optional)
+    
+    Returns:
+    - JSON object with one plan per field, in order; crops without
+      fertilizer data get an {error} entry
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        fields = data.get('fields')
+        
+        if not isinstance(fields, list) or not fields:
+            return jsonify({'error': 'fields must be a non-empty array'}), 400
+        if len(fields) > Config.FERTILIZER_BATCH_MAX_FIELDS:
+            return jsonify({
+                'error': f'Too many fields: at most {Config.FERTILIZER_BATCH_MAX_FIELDS} per request'
+            }), 413
+        
+        inputs = []
+        for index, field in enumerate(fields):
+            if not isinstance(field, dict):
+                return jsonify({'error': f'fields[{index}] must be an object'}), 400
+            crop_type = field.get('cropType')
+            soil_type = field.get('soilType')
+            soil_ph = field.get('soilPh')
+            if not isinstance(crop_type, str) or not crop_type or not isinstance(soil_type, str) or not soil_type:
+                return jsonify({
+                    'error': f'fields[{index}] missing required parameters: cropType, soilType'
+                }), 400
+            if soil_ph is not None and (not isinstance(soil_ph, Number) or isinstance(soil_ph, bool)):
+                return jsonify({'error': f'fields[{index}].soilPh must be a number'}), 400
+            inputs.append((crop_type, soil_type, soil_ph))
+        
+        return jsonify({'results': advisor.get_recommendations_batch(inputs)}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@fertilizer_bp.route('/crops', methods=['GET'])
+def list_fertilizer_crops():
+    """Get list of crops with fertilizer data"""
+    try:
+        return jsonify({'crops': advisor.get_all_crops()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@fertilizer_bp.route('/cache/stats', methods=['GET'])
+def fertilizer_cache_stats():
+    """Get hit/miss/eviction counters for the fertilizer plan cache"""
+    try:
+        return jsonify(advisor.cache_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,8 +1,62 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from config import Config
+from models.database import db
+from services.anomaly_detector import METRICS as ANOMALY_METRICS, AnomalyDetector
+from services.bulk_io import NDJSON_MIMETYPES, iter_ndjson
+from services.ingest_queue import IngestQueue, QueueFull
+from services.sensor_export import EXPORT_FORMATS, ExportUnavailable, SensorExporter, parse_timestamp
+from services.sensor_ingest import SensorIngestor
+from services.sensor_rollups import RESOLUTIONS, SensorRollups
+from services.sensor_stream import SensorStreamHub
 from simulate_sensors import SensorSimulator
 
 iot_bp = Blueprint('iot', __name__)
 sensor_simulator = SensorSimulator()
+rollups = SensorRollups(min_points=Config.SENSOR_HISTORY_MIN_POINTS)
+stream_hub = SensorStreamHub(max_pending=Config.SENSOR_STREAM_MAX_PENDING)
+anomaly_detector = AnomalyDetector(
+    alpha=Config.SENSOR_ANOMALY_ALPHA,
+    warmup=Config.SENSOR_ANOMALY_WARMUP,
+    z_threshold=Config.SENSOR_ANOMALY_Z_THRESHOLD,
+    cusum_k=Config.SENSOR_ANOMALY_CUSUM_K,
+    cusum_h=Config.SENSOR_ANOMALY_CUSUM_H,
+    min_std=Config.SENSOR_ANOMALY_MIN_STD,
+    clear_after=Config.SENSOR_ANOMALY_CLEAR_AFTER
+)
+ingestor = SensorIngestor(
+    chunk_size=Config.SENSOR_INGEST_CHUNK_SIZE,
+    max_readings=Config.SENSOR_INGEST_MAX_READINGS,
+    rollups=rollups,
+    stream=stream_hub,
+    anomalies=anomaly_detector
+)
+ingest_queue = IngestQueue(
+    ingestor.write_rows,
+    max_pending=Config.SENSOR_INGEST_QUEUE_MAX_READINGS,
+    batch_size=Config.SENSOR_INGEST_BATCH_SIZE,
+    flush_interval=Config.SENSOR_INGEST_FLUSH_INTERVAL,
+    drain_timeout=Config.SENSOR_INGEST_DRAIN_SECONDS
+)
+exporter = SensorExporter(chunk_size=Config.SENSOR_EXPORT_CHUNK_SIZE)
+
+def _sensor_id_args():
+    """sensorId query values, comma-separated and/or repeated"""
+    return [
+        sensor_id.strip()
+        for value in request.args.getlist('sensorId')
+        for sensor_id in value.split(',')
+        if sensor_id.strip()
+    ]
+
+def _simulated_readings():
+    """Feed for the stream hub: one simulator pass shared by all clients"""
+    for reading in sensor_simulator.get_all_sensors():
+        fingerprint = (
+            reading['temperature'], reading['humidity'],
+            reading['soilMoisture'], reading['waterUsage'], reading['status']
+        )
+        yield reading['id'], reading, fingerprint
 
 @iot_bp.route('/sensors', methods=['GET'])
 def get_sensors():
@@ -18,6 +72,66 @@ def get_sensors():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@iot_bp.route('/sensors/stream', methods=['GET'])
+def stream_sensors():
+    """
+    Stream sensor readings as they change
+    
+    Sends the latest reading of every matching sensor on connect, then
+    only new or changed readings. Undelivered updates are coalesced per
+    sensor; if a client falls too far behind, a "dropped" event tells it
+    to resync with GET /sensors.
+    
+    Query Parameters:
+    - sensorId: str (optional) - Comma-separated sensor IDs to follow
+    - format: str (default: sse) - sse (text/event-stream) or ndjson
+    
+    Returns:
+    - Long-lived text/event-stream or application/x-ndjson response
+    """
+    try:
+        sensor_ids = _sensor_id_args()
+        stream_format = request.args.get('format', default='sse', type=str)
+        if stream_format not in ('sse', 'ndjson'):
+            return jsonify({'error': 'format must be sse or ndjson'}), 400
+        
+        stream_hub.start_feed(_simulated_readings, Config.SENSOR_STREAM_POLL_SECONDS)
+        subscription = stream_hub.subscribe(sensor_ids)
+        snapshot = stream_hub.snapshot(sensor_ids)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    if stream_format == 'sse':
+        def encode(event, payload):
+            return f'event: {event}\ndata: {json.dumps(payload)}\n\n'
+        heartbeat = ': keep-alive\n\n'
+        mimetype = 'text/event-stream'
+    else:
+        def encode(event, payload):
+            return json.dumps({'event': event, 'data': payload}) + '\n'
+        heartbeat = '\n'
+        mimetype = 'application/x-ndjson'
+    
+    def generate():
+        try:
+            for reading in snapshot:
+                yield encode('reading', reading)
+            while True:
+                readings, dropped = subscription.drain(Config.SENSOR_STREAM_HEARTBEAT_SECONDS)
+                if dropped:
+                    yield encode('dropped', {'dropped': dropped})
+                if not readings and not dropped:
+                    yield heartbeat
+                for reading in readings:
+                    yield encode('reading', reading)
+        finally:
+            stream_hub.unsubscribe(subscription)
+    
+    return Response(generate(), mimetype=mimetype, headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @iot_bp.route('/sensors/<sensor_id>', methods=['GET'])
 def get_sensor_by_id(sensor_id):
     """
@@ -45,14 +159,198 @@ def get_sensor_history(sensor_id):
     
     Query Parameters:
     - hours: int (default: 24) - Number of hours of history
+    - resolution: str (optional) - Rollup to read (hour, day); defaults to
+      the coarsest one that still gives SENSOR_HISTORY_MIN_POINTS buckets
     
     Returns:
-    - JSON array of historical sensor readings
+    - JSON array of historical sensor readings (min/max/avg per bucket)
     """
     try:
         hours = request.args.get('hours', default=24, type=int)
-        history = sensor_simulator.get_history(sensor_id, hours)
-        return jsonify({'history': history}), 200
+        resolution = request.args.get('resolution', type=str)
+        
+        if hours is None or hours < 1:
+            return jsonify({'error': 'hours must be a positive integer'}), 400
+        if resolution and resolution not in RESOLUTIONS:
+            return jsonify({
+                'error': f'resolution must be one of: {", ".join(RESOLUTIONS)}'
+            }), 400
+        
+        resolution, history = rollups.get_history(sensor_id, hours, resolution)
+        
+        # Simulated sensors have no stored readings yet
+        if not history and sensor_simulator.get_sensor(sensor_id):
+            resolution = 'simulated'
+            history = sensor_simulator.get_history(sensor_id, hours)
+        
+        return jsonify({'history': history, 'resolution': resolution}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@iot_bp.route('/export', methods=['GET'])
+def export_readings():
+    """
+    Export stored sensor readings for bulk analysis
+    
+    The file is streamed in chunks straight from a database cursor, so
+    any range can be exported with constant memory.
+    
+    Query Parameters:
+    - sensorId: str (optional) - Comma-separated sensor IDs (default: all)
+    - start: ISO 8601 datetime (optional) - Inclusive lower bound
+    - end: ISO 8601 datetime (optional) - Exclusive upper bound
+    - format: str (default: csv) - csv, parquet or arrow (Arrow IPC stream)
+    
+    Returns:
+    - Streamed file download ordered by sensorId and timestamp
+    - 400 if start is after end
+    """
+    try:
+        sensor_ids = _sensor_id_args()
+        export_format = request.args.get('format', default='csv', type=str)
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f'format must be one of {", ".join(EXPORT_FORMATS)}'}), 400
+        try:
+            start = parse_timestamp(request.args.get('start'))
+            end = parse_timestamp(request.args.get('end'))
+        except ValueError:
+            return jsonify({'error': 'start and end must be ISO 8601 datetimes'}), 400
+        if start is not None and end is not None and start > end:
+            return jsonify({'error': 'start must not be after end'}), 400
+        
+        exporter.check_format(export_format)
+    except ExportUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    return Response(
+        stream_with_context(exporter.export(export_format, sensor_ids, start, end)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=sensor-data.{extension}'}
+    )
+
+@iot_bp.route('/readings', methods=['POST'])
+def ingest_readings():
+    """
+    Bulk-ingest sensor readings pushed by field gateways
+    
+    Request Body (application/json or application/x-ndjson):
+    - JSON array of readings, an object with a "readings" array,
+      or one JSON reading per line (NDJSON)
+        - sensorId: str
+        - temperature: float
+        - humidity: float
+        - soilMoisture: float
+        - waterUsage: float (optional)
+        - timestamp: ISO 8601 datetime
+    
+    Query Parameters:
+    - durability: str (default: flush) - flush acknowledges once the
+      readings are committed; enqueue as soon as they are queued for the
+      background writer (inserted/duplicates are then unknown, see queued)
+    
+    Readings already stored for the same sensorId and timestamp are
+    skipped, so a gateway can safely resend a batch after a failure.
+    
+    Returns:
+    - JSON object with received/accepted/inserted/queued/duplicates/rejected
+      counts and per-reading validation errors
+    - 503 with Retry-After when the ingest queue is full
+    """
+    try:
+        durability = request.args.get('durability', default=Config.SENSOR_INGEST_DURABILITY, type=str)
+        if durability not in ('flush', 'enqueue'):
+            return jsonify({'error': 'durability must be flush or enqueue'}), 400
+        
+        if request.mimetype in NDJSON_MIMETYPES:
+            items = iter_ndjson(request.stream)
+        else:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):
+                data = data.get('readings')
+            if not isinstance(data, list):
+                return jsonify({
+                    'error': 'Expected a JSON array of readings or NDJSON body'
+                }), 400
+            if len(data) > ingestor.max_readings:
+                return jsonify({
+                    'error': f'Too many readings: at most {ingestor.max_readings} per request'
+                }), 413
+            items = data
+        
+        ingest_queue.start(current_app._get_current_object())
+        wait = durability == 'flush'
+        try:
+            summary = ingestor.ingest(items, write=lambda rows: ingest_queue.submit(
+                rows, wait=wait, timeout=Config.SENSOR_INGEST_FLUSH_TIMEOUT
+            ))
+        except QueueFull as e:
+            response = jsonify({'error': f'{e}; retry later'})
+            response.headers['Retry-After'] = str(Config.SENSOR_INGEST_RETRY_AFTER)
+            return response, 503
+        
+        if summary['truncated']:
+            return jsonify(summary), 413
+        if summary['rejected'] and not summary['accepted']:
+            return jsonify(summary), 400
+        return jsonify(summary), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@iot_bp.route('/ingest/stats', methods=['GET'])
+def ingest_queue_stats():
+    """
+    Get ingest queue depth and flush statistics
+    
+    Returns:
+    - JSON object with queue depth, counters and flush latency (ms)
+    """
+    try:
+        return jsonify(ingest_queue.stats()), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@iot_bp.route('/anomalies', methods=['GET'])
+def get_anomalies():
+    """
+    Get active sensor anomalies
+    
+    Each ingested reading is compared with its sensor's own rolling
+    baseline. A reading far outside it is a "spike"; a smaller deviation
+    that persists is a "shift". An anomaly is cleared once its metric is
+    back to normal for a few readings.
+    
+    Query Parameters:
+    - sensorId: str (optional) - Comma-separated sensor IDs, may be repeated
+      (default: all)
+    - metric: str (optional) - temperature, humidity, soilMoisture or waterUsage
+    - limit: int - Maximum anomalies returned (default: 100)
+    
+    Returns:
+    - JSON object with anomalies (newest reading first), total matching
+      and detector statistics
+    """
+    try:
+        sensor_ids = _sensor_id_args()
+        metric = request.args.get('metric', type=str)
+        limit = request.args.get('limit', default=100, type=int)
+        
+        metrics = [name for _, name in ANOMALY_METRICS]
+        if metric and metric not in metrics:
+            return jsonify({'error': f'metric must be one of: {", ".join(metrics)}'}), 400
+        if limit is None or limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        
+        anomalies, total = anomaly_detector.active(sensor_ids, metric or None, limit)
+        return jsonify({
+            'anomalies': anomalies,
+            'total': total,
+            'stats': anomaly_detector.stats()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,38 +1,86 @@
 from flask import Blueprint, request, jsonify
+from pydantic import ValidationError
+from config import Config
 from models.database import db, Product
+from models.schemas import CheckoutRequest, ProductCreate
+from services.bulk_io import CSV_MIMETYPES, NDJSON_MIMETYPES, format_validation_error, iter_csv, iter_ndjson
+from services.inventory import InventoryService
+from services.json_provider import RowEncoder
+from services.product_import import ProductImporter
+from services.keyset import InvalidCursor, decode_cursor, encode_cursor, order_by_key, seek_after
+from services.product_search import ProductSearch
+from services.response_cache import ResponseCache
 
 marketplace_bp = Blueprint('marketplace', __name__)
+product_search = ProductSearch()
+response_cache = ResponseCache(
+    max_size=Config.MARKETPLACE_CACHE_SIZE,
+    shared_path=Config.MARKETPLACE_CACHE_SHARED_PATH
+)
+response_cache.invalidate_on_commit(Product)
+inventory = InventoryService()
+importer = ProductImporter(
+    chunk_size=Config.MARKETPLACE_IMPORT_CHUNK_SIZE,
+    max_rows=Config.MARKETPLACE_IMPORT_MAX_ROWS
+)
+# Same keys as Product.to_dict(), selected as plain columns
+product_rows = RowEncoder([
+    ('id', Product.id),
+    ('name', Product.name),
+    ('description', Product.description),
+    ('price', Product.price),
+    ('stock', Product.stock),
+    ('category', Product.category),
+    ('image', Product.image),
+    ('farmer', Product.farmer),
+    ('rating', Product.rating),
+    ('reviews', Product.reviews),
+    ('createdAt', Product.created_at),
+    ('updatedAt', Product.updated_at)
+])
 
 @marketplace_bp.route('/products', methods=['GET'])
+@response_cache.cached
 def get_products():
     """
     Get marketplace products with filtering and pagination
     
     Query Parameters:
-    - search: str - Search term for product name
+    - search: str - Search term matched against name, description, category
+      and farmer (word prefixes, e.g. "tom" matches "Tomatoes")
     - category: str - Filter by category
     - priceRange: str - Price range filter (under-30, 30-50, 50-100, over-100)
-    - sortBy: str - Sort option (name, price-low, price-high, rating)
+    - sortBy: str - Sort option (relevance, name, price-low, price-high, rating);
+      defaults to relevance when searching, otherwise name
     - page: int - Page number (default: 1)
     - limit: int - Items per page (default: 20)
+    - cursor: str - Opt into cursor pagination; pass an empty value for the
+      first page, then the nextCursor of the previous response ("page" is ignored)
+    - includeTotal: bool - In cursor mode, also count all matches (default: false)
     
     Returns:
     - JSON object with products array and pagination info
+      (cursor mode: nextCursor, null on the last page)
+    
+    Responses are cached server-side and carry an ETag; send it back in
+    If-None-Match to get 304 Not Modified until the catalog changes.
     """
     try:
         search = request.args.get('search', type=str)
         category = request.args.get('category', type=str)
         price_range = request.args.get('priceRange', type=str)
-        sort_by = request.args.get('sortBy', default='name', type=str)
+        sort_by = request.args.get('sortBy', default='relevance' if search else 'name', type=str)
         page = request.args.get('page', default=1, type=int)
         limit = request.args.get('limit', default=20, type=int)
+        cursor = request.args.get('cursor', type=str)
         
         # Build query
         query = Product.query
         
         # Apply filters
+        rank = None
         if search:
-            query = query.filter(Product.name.ilike(f'%{search}%'))
+            query, rank = product_search.apply(query, search)
         if category and category != 'all':
             query = query.filter(Product.category == category)
         if price_range and price_range != 'all':
@@ -45,19 +93,57 @@ def get_products():
             elif price_range == 'over-100':
                 query = query.filter(Product.price > 100)
         
-        # Apply sorting
-        if sort_by == 'price-low':
-            query = query.order_by(Product.price.asc())
+        # Apply sorting; id breaks ties so every row has a stable position
+        if sort_by == 'relevance' and rank is not None:
+            sort_column, descending, nullable = rank, False, False
+        elif sort_by == 'price-low':
+            sort_column, descending, nullable = Product.price, False, False
         elif sort_by == 'price-high':
-            query = query.order_by(Product.price.desc())
+            sort_column, descending, nullable = Product.price, True, False
         elif sort_by == 'rating':
-            query = query.order_by(Product.rating.desc())
+            sort_column, descending, nullable = Product.rating, True, True
         else:
-            query = query.order_by(Product.name.asc())
+            sort_by = 'name'
+            sort_column, descending, nullable = Product.name, False, False
+        
+        if cursor is not None:
+            if limit < 1:
+                return jsonify({'error': 'limit must be a positive integer'}), 400
+            try:
+                position = decode_cursor(cursor, sort_by)
+            except InvalidCursor as e:
+                return jsonify({'error': str(e)}), 400
+            
+            total = query.order_by(None).count() if request.args.get('includeTotal') == 'true' else None
+            
+            if position is not None:
+                query = seek_after(query, sort_column, Product.id, position, descending, nullable)
+            query = order_by_key(query, sort_column, Product.id, descending, nullable)
+            
+            # One extra row tells us whether another page exists
+            rows = query.with_entities(*product_rows.columns, sort_column).limit(limit + 1).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            
+            next_cursor = None
+            if has_more:
+                last_row = rows[-1]
+                next_cursor = encode_cursor(sort_by, last_row[-1], last_row.id)
+            
+            response = {
+                'products': product_rows.encode(rows),
+                'limit': limit,
+                'nextCursor': next_cursor
+            }
+            if total is not None:
+                response['total'] = total
+            return jsonify(response), 200
+        
+        query = order_by_key(query, sort_column, Product.id, descending, nullable)
         
         # Pagination
-        pagination = query.paginate(page=page, per_page=limit, error_out=False)
-        products = [product.to_dict() for product in pagination.items]
+        pagination = query.with_entities(*product_rows.columns).paginate(page=page, per_page=limit, error_out=False)
+        products = product_rows.encode(pagination.items)
         
         return jsonify({
             'products': products,
@@ -71,6 +157,7 @@ def get_products():
         return jsonify({'error': str(e)}), 500
 
 @marketplace_bp.route('/products/<int:product_id>', methods=['GET'])
+@response_cache.cached
 def get_product(product_id):
     """
     Get single product by ID
@@ -82,8 +169,10 @@ def get_product(product_id):
     - JSON object with product details
     """
     try:
-        product = Product.query.get_or_404(product_id)
-        return jsonify(product.to_dict()), 200
+        row = Product.query.with_entities(*product_rows.columns).filter(Product.id == product_id).first()
+        if row is None:
+            return jsonify({'error': 'Product not found'}), 404
+        return jsonify(product_rows.encode_one(row)), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -95,33 +184,128 @@ def create_product():
     Request Body:
     - name: str
     - description: str
-    - price: float
-    - stock: int
+    - price: float (at least 0)
+    - stock: int (at least 0)
     - category: str
     - image: str (optional)
+    - farmer: str (optional)
     
     Returns:
     - JSON object with created product
+    - 400 with the validation errors, as for /products/import
     """
     try:
-        data = request.get_json()
-        
-        product = Product(
-            name=data['name'],
-            description=data['description'],
-            price=data['price'],
-            stock=data['stock'],
-            category=data.get('category', 'Other'),
-            image=data.get('image', '🌾'),
-            farmer=data.get('farmer', 'Unknown')
-        )
+        try:
+            fields = ProductCreate.model_validate(request.get_json(silent=True) or {})
+        except ValidationError as e:
+            return jsonify({'error': format_validation_error(e)}), 400
+        
+        product = Product(**fields.model_dump())
         
         db.session.add(product)
         db.session.commit()
         
-        return jsonify(product.to_dict()), 201
+        return jsonify(product_rows.encode_object(product)), 201
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+@marketplace_bp.route('/products/import', methods=['POST'])
+def import_products():
+    """
+    Bulk-import products (for cooperatives onboarding a whole inventory)
+    
+    Request Body (text/csv, application/x-ndjson or application/json):
+    - CSV with a header row, one product per line (NDJSON), or a JSON
+      array of products, each with the fields of POST /products:
+        - name: str
+        - description: str
+        - price: float
+        - stock: int
+        - category: str
+        - image: str (optional)
+        - farmer: str (optional)
+    
+    CSV and NDJSON uploads are read and inserted in chunks as they
+    arrive; every chunk is committed on its own.
+    
+    Returns:
+    - JSON object with received/accepted/inserted/rejected counts and
+      {index, error} for every rejected record (index 0 = first record)
+    """
+    try:
+        if request.mimetype in CSV_MIMETYPES:
+            items = iter_csv(request.stream)
+        elif request.mimetype in NDJSON_MIMETYPES:
+            items = iter_ndjson(request.stream)
+        else:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):
+                data = data.get('products')
+            if not isinstance(data, list):
+                return jsonify({
+                    'error': 'Expected a CSV, NDJSON or JSON array of products'
+                }), 400
+            if len(data) > importer.max_rows:
+                return jsonify({
+                    'error': f'Too many products: at most {importer.max_rows} per request'
+                }), 413
+            items = data
+        
+        summary = importer.import_products(items)
+        
+        if summary['truncated']:
+            return jsonify(summary), 413
+        if summary['rejected'] and not summary['accepted']:
+            return jsonify(summary), 400
+        return jsonify(summary), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@marketplace_bp.route('/checkout', methods=['POST'])
+def checkout():
+    """
+    Reserve stock for an order
+    
+    Request Body:
+    - items: array - Line items, each with
+        - productId: int
+        - quantity: int (at least 1)
+    - allOrNothing: bool - Reserve nothing unless every item is in stock
+      (default: true); with false, the available items are still reserved
+    
+    Returns:
+    - JSON object with success flag and per-item status (reserved,
+      insufficient_stock, not_found, not_applied) and reservedItems; 409
+      when nothing was reserved, 200 whenever some stock was committed
+    """
+    try:
+        try:
+            order = CheckoutRequest.model_validate(request.get_json(silent=True) or {})
+        except ValidationError as e:
+            return jsonify({'error': format_validation_error(e)}), 400
+        if len(order.items) > Config.MARKETPLACE_CHECKOUT_MAX_ITEMS:
+            return jsonify({
+                'error': f'Too many items: at most {Config.MARKETPLACE_CHECKOUT_MAX_ITEMS} per checkout'
+            }), 413
+        
+        result = inventory.checkout(
+            [(item.productId, item.quantity) for item in order.items],
+            all_or_nothing=order.allOrNothing
+        )
+        # A partial checkout (allOrNothing false) has committed its reservations
+        return jsonify(result), 200 if result['success'] or result['reservedItems'] else 409
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@marketplace_bp.route('/cache/stats', methods=['GET'])
+def response_cache_stats():
+    """Get hit/miss/eviction counters for the product response cache"""
+    try:
+        return jsonify(response_cache.stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
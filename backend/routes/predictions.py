@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
+from config import Config
 from services.yield_predictor import YieldPredictor
 
 predictions_bp = Blueprint('predictions', __name__)
-predictor = YieldPredictor()
+predictor = YieldPredictor(model_dir=Config.YIELD_MODEL_DIR)
 
 @predictions_bp.route('/yield', methods=['POST'])
 def predict_yield():
@@ -20,7 +21,9 @@ def predict_yield():
     - season: str - Growing season
     
     Returns:
-    - JSON object with yield prediction and recommendations
+    - JSON object with yield prediction and recommendations, plus the
+      modelVersion that answered ("rules" without a trained model) and
+      its inferenceMs
     """
     try:
         data = request.get_json()
@@ -47,6 +50,70 @@ def predict_yield():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@predictions_bp.route('/yield/batch', methods=['POST'])
+def predict_yield_batch():
+    """
+    Predict crop yields for many fields in one request
+    
+    Request Body (columnar - one array entry per field):
+    - cropType: array of str - Type of crop
+    - fieldSize: array of float - Field size in hectares
+    - temperature: array of float (optional)
+    - humidity: array of float (optional)
+    - soilMoisture: array of float (optional)
+    - season: str or array of str (optional) - Growing season
+    
+    Returns:
+    - JSON object with one prediction per field, in input order, and the
+      modelVersion and inferenceMs of the batched inference
+    - 400 with per-row {index, error} entries if any field is invalid
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        
+        crop_types = data.get('cropType')
+        field_sizes = data.get('fieldSize')
+        
+        if not isinstance(crop_types, list) or not isinstance(field_sizes, list) or not crop_types:
+            return jsonify({
+                'error': 'cropType and fieldSize must be non-empty arrays'
+            }), 400
+        if len(crop_types) > Config.YIELD_BATCH_MAX_FIELDS:
+            return jsonify({
+                'error': f'Too many fields: at most {Config.YIELD_BATCH_MAX_FIELDS} per request'
+            }), 413
+        
+        columns = {name: data.get(name) for name in ('temperature', 'humidity', 'soilMoisture')}
+        season = data.get('season')
+        lengths = {len(crop_types), len(field_sizes)}
+        lengths.update(len(col) for col in list(columns.values()) + [season] if isinstance(col, list))
+        if len(lengths) != 1:
+            return jsonify({'error': 'All input arrays must have the same length'}), 400
+        
+        errors = predictor.validate_columns(
+            crop_types, field_sizes, columns['temperature'], columns['humidity'], columns['soilMoisture']
+        )
+        if errors:
+            return jsonify({'error': 'Invalid input', 'errors': errors[:100]}), 400
+        
+        try:
+            predictions, model_info = predictor.predict_many(
+                crop_types=crop_types,
+                field_sizes=field_sizes,
+                temperatures=columns['temperature'],
+                humidities=columns['humidity'],
+                soil_moistures=columns['soilMoisture'],
+                seasons=season,
+                return_info=True
+            )
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid input: {e}'}), 400
+        
+        return jsonify({'predictions': predictions, 'count': len(predictions), **model_info}), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @predictions_bp.route('/yield/history', methods=['GET'])
 def get_yield_history():
     """
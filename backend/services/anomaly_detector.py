@@ -0,0 +1,201 @@
+import math
+import threading
+from array import array
+from datetime import datetime, timezone
+
+# (column in ingested rows, metric name in responses)
+METRICS = (
+    ('temperature', 'temperature'),
+    ('humidity', 'humidity'),
+    ('soil_moisture', 'soilMoisture'),
+    ('water_usage', 'waterUsage')
+)
+
+class AnomalyDetector:
+    """
+    Streaming per-sensor anomaly detection for ingested readings
+
+    Every sensor gets a slot in a set of flat arrays (8 bytes per value,
+    ~170 bytes per sensor), so tens of thousands of sensors fit in a few
+    MB and each reading updates its sensor's state in constant time; the
+    database is never re-read. Per metric the detector keeps:
+
+    - an exponentially weighted mean and variance of the sensor's own
+      values of that metric. Values are averaged with equal weights
+      (Welford) until there are 1/alpha of them; from then on each new
+      value weighs `alpha`. Metrics are counted separately, since a
+      reading may leave some of them out.
+    - two-sided CUSUM sums of the standardized deviations, which pick up
+      a sustained shift too small to trip the per-reading threshold.
+
+    A reading is a "spike" when it lies more than `z_threshold` standard
+    deviations from the sensor's baseline, and a "shift" when a CUSUM sum
+    exceeds `cusum_h`. Nothing is flagged, and the CUSUM sums stay at
+    zero, until a metric has more than `warmup` values. Spikes are
+    clamped to the threshold before they update the baseline, so a
+    single bad reading does not widen it. An anomaly stays active until
+    `clear_after` consecutive readings of its metric are within one
+    standard deviation of the baseline again.
+
+    State is kept per process and starts empty, like the response cache;
+    with several workers each one sees the readings it wrote.
+    """
+
+    def __init__(self, alpha=0.05, warmup=30, z_threshold=4.0, cusum_k=0.5, cusum_h=8.0,
+                 min_std=0.5, clear_after=3):
+        self.alpha = alpha
+        self.warmup = warmup
+        self.z_threshold = z_threshold
+        self.cusum_k = cusum_k
+        self.cusum_h = cusum_h
+        self.min_std = min_std
+        self.clear_after = clear_after
+
+        self._slots = {}
+        self._last_seen = array('d')
+        # Per metric: values seen, and [mean, variance, CUSUM high, CUSUM low]
+        self._counts = {column: array('q') for column, _ in METRICS}
+        self._state = {column: [array('d') for _ in range(4)] for column, _ in METRICS}
+        self._active = {}
+        self._detected = 0
+        self._stale = 0
+        self._lock = threading.Lock()
+
+    def _slot(self, sensor_id):
+        slot = self._slots.get(sensor_id)
+        if slot is None:
+            slot = self._slots[sensor_id] = len(self._last_seen)
+            self._last_seen.append(-math.inf)
+            for counts in self._counts.values():
+                counts.append(0)
+            for arrays in self._state.values():
+                for values in arrays:
+                    values.append(0.0)
+        return slot
+
+    def observe(self, rows):
+        """
+        Update sensor baselines with newly stored readings
+
+        Call with committed rows only (duplicates excluded), oldest first
+        within a sensor; rows are sorted by timestamp here, and readings
+        older than the newest one already seen for their sensor (late
+        backfills) are skipped.
+
+        Args:
+            rows: list - Column dicts with sensor_id, timestamp and metric values
+
+        Returns:
+            list: Anomalies raised by these readings
+        """
+        raised = []
+        with self._lock:
+            for row in sorted(rows, key=lambda row: row['timestamp']):
+                slot = self._slot(row['sensor_id'])
+                # Timestamps are naive UTC; a plain .timestamp() would read them
+                # as local time and misorder readings around DST changes
+                seen = row['timestamp'].replace(tzinfo=timezone.utc).timestamp()
+                if seen < self._last_seen[slot]:
+                    self._stale += 1
+                    continue
+                self._last_seen[slot] = seen
+                for column, metric in METRICS:
+                    value = row[column]
+                    if value is not None:
+                        anomaly = self._update(slot, row, column, metric, value)
+                        if anomaly is not None:
+                            raised.append(anomaly)
+            self._detected += len(raised)
+        return raised
+
+    def _update(self, slot, row, column, metric, value):
+        """Fold one metric value into the sensor's state; O(1)"""
+        mean, variance, high, low = self._state[column]
+        counts = self._counts[column]
+        n = counts[slot] = counts[slot] + 1
+        if n == 1:
+            mean[slot] = value
+            return None
+
+        std = math.sqrt(variance[slot])
+        if std < self.min_std:
+            std = self.min_std
+        z = (value - mean[slot]) / std
+        kind = None
+        if n > self.warmup:
+            # Plain comparisons instead of max(): this runs for every value
+            up = high[slot] + z - self.cusum_k
+            down = low[slot] - z - self.cusum_k
+            high[slot] = up if up > 0.0 else 0.0
+            low[slot] = down if down > 0.0 else 0.0
+            if abs(z) > self.z_threshold:
+                kind = 'spike'
+                # Clamp before learning so one outlier does not widen the baseline
+                value = mean[slot] + math.copysign(self.z_threshold * std, z)
+            elif high[slot] > self.cusum_h or low[slot] > self.cusum_h:
+                kind = 'shift'
+            if kind is not None:
+                # Start looking for the next change from the new level
+                high[slot] = low[slot] = 0.0
+
+        # Equal weights (Welford) until 1/alpha values, exponential afterwards
+        weight = 1.0 / n if n * self.alpha < 1 else self.alpha
+        delta = value - mean[slot]
+        expected = mean[slot]
+        mean[slot] += weight * delta
+        variance[slot] = (1 - weight) * (variance[slot] + weight * delta * delta)
+
+        key = (row['sensor_id'], metric)
+        if kind is None:
+            active = self._active.get(key) if self._active else None
+            if active is not None:
+                # Back within one standard deviation of the (adapting) baseline
+                active['normalStreak'] = active['normalStreak'] + 1 if abs(z) < 1 else 0
+                if active['normalStreak'] >= self.clear_after:
+                    del self._active[key]
+            return None
+
+        anomaly = {
+            'sensorId': row['sensor_id'],
+            'metric': metric,
+            'kind': kind,
+            'direction': 'high' if z > 0 else 'low',
+            'value': row[column],
+            'expected': round(expected, 2),
+            'zScore': round(z, 2),
+            'timestamp': row['timestamp'],
+            'detectedAt': datetime.utcnow()
+        }
+        self._active[key] = dict(anomaly, normalStreak=0)
+        return anomaly
+
+    def active(self, sensor_ids=None, metric=None, limit=None):
+        """
+        Currently active anomalies, most recent reading first
+
+        Args:
+            sensor_ids: iterable - Only these sensors (default: all)
+            metric: str - Only this metric (temperature, humidity, ...)
+            limit: int - Maximum number returned
+
+        Returns:
+            tuple: (list of anomaly dicts, total number matching)
+        """
+        wanted = frozenset(sensor_ids) if sensor_ids else None
+        with self._lock:
+            matches = [
+                {key: value for key, value in anomaly.items() if key != 'normalStreak'}
+                for (sensor_id, name), anomaly in self._active.items()
+                if (wanted is None or sensor_id in wanted) and (metric is None or name == metric)
+            ]
+        matches.sort(key=lambda anomaly: anomaly['timestamp'], reverse=True)
+        return matches[:limit] if limit is not None else matches, len(matches)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sensorsTracked': len(self._slots),
+                'active': len(self._active),
+                'detected': self._detected,
+                'staleReadings': self._stale
+            }
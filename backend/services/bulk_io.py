@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from itertools import islice
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+CSV_MIMETYPES = ('text/csv', 'application/csv')
+
+class InvalidRecord:
+    """Placeholder for an input record that could not be decoded"""
+    
+    def __init__(self, error):
+        self.error = error
+
+def iter_ndjson(stream):
+    """
+    Decode newline-delimited JSON from a binary stream one line at a time
+    
+    Blank lines are skipped. Lines that are not valid JSON are yielded as
+    InvalidRecord so callers can report them alongside validation errors
+    instead of aborting the whole upload.
+    """
+    for line in iter(stream.readline, b''):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield InvalidRecord(f'Invalid JSON: {e}')
+
+def iter_csv(stream):
+    """
+    Decode a UTF-8 CSV upload with a header row one record at a time
+    
+    Each record becomes a dict keyed by the header; empty cells are left
+    out so schema defaults apply. Records with more cells than the header
+    are yielded as InvalidRecord. A malformed file (bad encoding, broken
+    quoting) ends the upload with one InvalidRecord, since the reader
+    cannot resynchronize after it.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        for record in csv.DictReader(text):
+            if None in record:
+                yield InvalidRecord(f'Expected {len(record) - 1} fields, got more')
+                continue
+            yield {key: value for key, value in record.items() if value not in ('', None)}
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield InvalidRecord(f'Invalid CSV: {e}')
+    finally:
+        text.detach()
+
+def chunked(iterable, size):
+    """Yield lists of at most `size` items from an iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def format_validation_error(error):
+    """Flatten a pydantic ValidationError into a single readable message"""
+    return '; '.join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'record'}: {err['msg']}"
+        for err in error.errors()
+    )
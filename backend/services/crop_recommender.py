@@ -1,56 +1,147 @@
+import csv
+import json
+from bisect import bisect_left, bisect_right
+from config import Config
+from services.lru_cache import LRUCache
+
+# Column order of CSV catalogs; soilTypes is separated by semicolons
+CSV_COLUMNS = ['name', 'soilTypes', 'tempMin', 'tempMax', 'humidityMin', 'humidityMax', 'suitability', 'yield']
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and '.' not in text else value
+
+def load_crop_catalog(path):
+    """
+    Load crop varieties from a JSON or CSV file
+    
+    JSON files hold a list of {name, soilTypes, tempRange, humidityRange,
+    suitability, yield} objects; CSV files use CSV_COLUMNS as header.
+    
+    Args:
+        path: str - Catalog file (.json or .csv)
+    
+    Returns:
+        dict: Crop name -> crop data, in file order
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            entries = [
+                {
+                    'name': row['name'],
+                    'soilTypes': [soil.strip() for soil in row['soilTypes'].split(';') if soil.strip()],
+                    'tempRange': (_number(row['tempMin']), _number(row['tempMax'])),
+                    'humidityRange': (_number(row['humidityMin']), _number(row['humidityMax'])),
+                    'suitability': row['suitability'],
+                    'yield': row['yield']
+                }
+                for row in csv.DictReader(f)
+            ]
+        else:
+            entries = json.load(f)
+    
+    catalog = {}
+    for entry in entries:
+        name = entry['name']
+        if name in catalog:
+            raise ValueError(f'Duplicate crop in catalog {path}: {name}')
+        catalog[name] = {
+            'soilTypes': list(entry['soilTypes']),
+            'tempRange': tuple(entry['tempRange']),
+            'humidityRange': tuple(entry['humidityRange']),
+            'suitability': entry['suitability'],
+            'yield': entry['yield']
+        }
+    return catalog
+
+class CropCatalog(dict):
+    """
+    Crop database dict that counts its own modifications
+    
+    The version lets CropRecommender drop cached results and arrays
+    whenever a crop is added, replaced or removed. Replace an entry
+    (catalog['Wheat'] = {...}) rather than mutating it in place, which
+    cannot be detected.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+    
+    def _modified(self):
+        self.version += 1
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._modified()
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._modified()
+    
+    def __ior__(self, other):
+        result = super().__ior__(other)
+        self._modified()
+        return result
+    
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._modified()
+    
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self._modified()
+        return super().setdefault(key, default)
+    
+    def pop(self, *args):
+        result = super().pop(*args)
+        self._modified()
+        return result
+    
+    def popitem(self):
+        result = super().popitem()
+        self._modified()
+        return result
+    
+    def clear(self):
+        super().clear()
+        self._modified()
+
 class CropRecommender:
     """Service for crop recommendations based on environmental conditions"""
     
-    def __init__(self):
-        self.crop_database = {
-            'Wheat': {
-                'soilTypes': ['Loamy'],
-                'tempRange': (15, 25),
-                'humidityRange': (50, 70),
-                'suitability': 'Excellent',
-                'yield': 'High'
-            },
-            'Corn': {
-                'soilTypes': ['Loamy', 'Clay'],
-                'tempRange': (20, 30),
-                'humidityRange': (60, 80),
-                'suitability': 'Excellent',
-                'yield': 'High'
-            },
-            'Tomatoes': {
-                'soilTypes': ['Loamy'],
-                'tempRange': (20, 28),
-                'humidityRange': (60, 75),
-                'suitability': 'Excellent',
-                'yield': 'High'
-            },
-            'Potatoes': {
-                'soilTypes': ['Sandy', 'Loamy'],
-                'tempRange': (15, 22),
-                'humidityRange': (50, 70),
-                'suitability': 'Good',
-                'yield': 'Medium-High'
-            },
-            'Rice': {
-                'soilTypes': ['Clay'],
-                'tempRange': (20, 35),
-                'humidityRange': (70, 90),
-                'suitability': 'Excellent',
-                'yield': 'High'
-            },
-            'Barley': {
-                'soilTypes': ['Loamy', 'Sandy'],
-                'tempRange': (10, 20),
-                'humidityRange': (40, 60),
-                'suitability': 'Good',
-                'yield': 'Medium'
-            }
-        }
+    # Upper bound on queries x crops scored per NumPy pass in batch mode
+    BATCH_CELLS = 1_000_000
+    
+    # Catalogs up to this size are scanned directly; the index lookup
+    # costs more than scoring a handful of crops
+    INDEX_MIN_CROPS = 64
+    
+    # Value ranges per axis in the lookup index (see _get_index)
+    INDEX_BUCKETS = 256
+    
+    def __init__(self, cache_size=4096, catalog_path=None):
+        self._cache = LRUCache(cache_size)
+        self._catalog_state = None
+        self.crop_database = load_crop_catalog(catalog_path or Config.CROP_CATALOG_PATH)
+    
+    @property
+    def crop_database(self):
+        return self._crop_database
+    
+    @crop_database.setter
+    def crop_database(self, crops):
+        self._crop_database = CropCatalog(crops)
+        self._catalog_state = None
     
     def get_recommendations(self, soil_type, temperature, humidity):
         """
         Get crop recommendations based on conditions
         
+        Only the candidates from the lookup index are scored (see
+        _candidates), and results are memoized per quantized (soil type,
+        temperature, humidity) key, see _cache_key.
+        
         Args:
             soil_type: str - Type of soil
             temperature: float - Temperature in Celsius
@@ -59,26 +150,170 @@ class CropRecommender:
         Returns:
             list: Array of recommended crops with suitability scores
         """
-        recommendations = []
+        self._check_catalog()
+        key = self._cache_key(soil_type, temperature, humidity)
         
-        for crop_name, crop_data in self.crop_database.items():
-            score = self._calculate_suitability_score(
-                crop_data, soil_type, temperature, humidity
-            )
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = tuple(self._compute_recommendations(soil_type, temperature, humidity))
+            self._cache.put(key, cached)
+        
+        # Hand out copies so callers cannot alter the cached entries
+        return [dict(recommendation) for recommendation in cached]
+    
+    def cache_stats(self):
+        """Hit/miss/eviction counters for the recommendation cache"""
+        self._check_catalog()
+        return self._cache.stats()
+    
+    def _check_catalog(self):
+        """Drop cached results and arrays if crop_database changed"""
+        state = self._crop_database.version
+        if state != self._catalog_state:
+            self._cache.clear()
+            self._arrays = None
+            self._breakpoints = None
+            self._index = None
+            self._catalog_state = state
+    
+    def _cache_key(self, soil_type, temperature, humidity):
+        """
+        Canonical cache key for a query
+        
+        Scores only change where a reading crosses one of the catalogue's
+        range bounds or partial-match bounds. Each value is therefore
+        replaced by the interval of sorted bounds it falls into (values
+        exactly on a bound get their own cell), so every query sharing a
+        key produces exactly the same recommendations.
+        """
+        temp_bounds, hum_bounds = self._get_breakpoints()
+        return (soil_type, self._cell(temp_bounds, temperature), self._cell(hum_bounds, humidity))
+    
+    def _get_breakpoints(self):
+        """Sorted temperature and humidity bounds used by the scoring rules"""
+        if self._breakpoints is None:
+            temp_bounds = set()
+            hum_bounds = set()
+            for crop_data in self.crop_database.values():
+                temp_min, temp_max = crop_data['tempRange']
+                temp_mid = (temp_min + temp_max) / 2
+                temp_bounds.update((temp_min, temp_max, temp_mid - 5, temp_mid + 5))
+                hum_min, hum_max = crop_data['humidityRange']
+                hum_mid = (hum_min + hum_max) / 2
+                hum_bounds.update((hum_min, hum_max, hum_mid - 10, hum_mid + 10))
+            self._breakpoints = (sorted(temp_bounds), sorted(hum_bounds))
+        return self._breakpoints
+    
+    @staticmethod
+    def _cell(bounds, value):
+        """Index of the open interval or bound that value falls on"""
+        i = bisect_left(bounds, value)
+        if i < len(bounds) and bounds[i] == value:
+            return 2 * i + 1
+        return 2 * i
+    
+    def _compute_recommendations(self, soil_type, temperature, humidity):
+        """Score and rank the index candidates for one set of conditions"""
+        import numpy as np
+        
+        arrays = self._get_arrays()
+        candidates = self._candidates(soil_type, temperature, humidity)
+        soil_row = arrays['soil_index'].get(soil_type, len(arrays['soil_index']))
+        
+        match = self._match(
+            arrays, np.array([soil_row]), np.array([[temperature]], dtype=float),
+            np.array([[humidity]], dtype=float), candidates
+        )
+        return self._rank(arrays, [(soil_type, temperature, humidity)], match, candidates)[0]
+    
+    def _candidates(self, soil_type, temperature, humidity):
+        """
+        Sorted indexes of the crops that can score above 0.5
+        
+        A score above 0.5 needs either a soil match plus any temperature
+        or humidity credit (0.4 + 0.15), or full temperature and humidity
+        matches without the soil (0.3 + 0.3). Both sets are read from the
+        index buckets the temperature and humidity fall in, so the cost
+        depends on the number of candidates rather than on the catalog
+        size.
+        """
+        import numpy as np
+        
+        arrays = self._get_arrays()
+        crop_count = len(arrays['names'])
+        if crop_count <= self.INDEX_MIN_CROPS:
+            return np.arange(crop_count)
+        
+        index = self._get_index()
+        temp_ranked, temp_full = index['temp'][bisect_right(index['temp_edges'], temperature)]
+        hum_ranked, hum_full = index['hum'][bisect_right(index['hum_edges'], humidity)]
+        
+        # Full matches head each ranked list
+        candidates = np.intersect1d(temp_ranked[:temp_full], hum_ranked[:hum_full], assume_unique=True)
+        soil_row = arrays['soil_index'].get(soil_type)
+        if soil_row is not None:
+            credited = np.union1d(temp_ranked, hum_ranked)
+            candidates = np.union1d(candidates, credited[arrays['soil_matrix'][soil_row][credited]])
+        return candidates
+    
+    def _get_index(self):
+        """
+        Lookup index compiled from crop_database, built once per catalog version
+        
+        Temperature and humidity are each split into at most INDEX_BUCKETS
+        value ranges (see _bucket_lists). Per range the index holds the
+        crops that get credit anywhere in it, ranked by that credit: full
+        matches first, then partial ones. Memory is bounded by
+        INDEX_BUCKETS x catalog size per axis, whatever the number of
+        distinct range bounds or soil types.
+        """
+        if self._index is None:
+            arrays = self._get_arrays()
+            temp_bounds, hum_bounds = self._get_breakpoints()
             
-            if score > 0.5:  # Only recommend if suitability > 50%
-                recommendations.append({
-                    'crop': crop_name,
-                    'suitability': crop_data['suitability'],
-                    'reason': self._generate_reason(crop_name, crop_data, soil_type, temperature, humidity),
-                    'yield': crop_data['yield'],
-                    'score': round(score, 2)
-                })
+            temp_edges, temp_lists = self._bucket_lists(
+                temp_bounds, arrays['temp_min'], arrays['temp_max'], arrays['temp_mid'], 5
+            )
+            hum_edges, hum_lists = self._bucket_lists(
+                hum_bounds, arrays['hum_min'], arrays['hum_max'], arrays['hum_mid'], 10
+            )
+            self._index = {
+                'temp_edges': temp_edges,
+                'temp': temp_lists,
+                'hum_edges': hum_edges,
+                'hum': hum_lists
+            }
+        return self._index
+    
+    def _bucket_lists(self, bounds, low, high, mid, tolerance):
+        """
+        Bucket edges, and (ranked crop indexes, full match count) per bucket
         
-        # Sort by score (highest first)
-        recommendations.sort(key=lambda x: x['score'], reverse=True)
+        Edges are taken from the sorted range bounds. Bucket k holds the
+        values v with edges[k - 1] <= v < edges[k], unbounded at both
+        ends, so bisect_right(edges, v) finds it. A crop is listed when its
+        range or partial-match window overlaps the bucket, which can only
+        add candidates; exact scores are computed for every candidate. The
+        window gets a tiny slack so float rounding at mid +/- tolerance
+        cannot drop one either.
+        """
+        import numpy as np
+        
+        step = max(1, -(-len(bounds) // (self.INDEX_BUCKETS - 1)))
+        edges = bounds[::step]
+        starts = np.array([-np.inf] + edges)[:, None]
+        ends = np.array(edges + [np.inf])[:, None]
         
-        return recommendations
+        slack = tolerance + 1e-9
+        full = (low < ends) & (high >= starts)
+        near = (mid - slack < ends) & (mid + slack >= starts)
+        
+        lists = []
+        for full_row, near_row in zip(full, near):
+            full_crops = np.flatnonzero(full_row)
+            partial_crops = np.flatnonzero(near_row & ~full_row)
+            lists.append((np.concatenate((full_crops, partial_crops)), len(full_crops)))
+        return edges, lists
     
     def _calculate_suitability_score(self, crop_data, soil_type, temperature, humidity):
         """Calculate suitability score (0-1) for a crop"""
@@ -104,19 +339,163 @@ class CropRecommender:
         
         return score
     
-    def _generate_reason(self, crop_name, crop_data, soil_type, temperature, humidity):
-        """Generate human-readable reason for recommendation"""
+    def get_recommendations_batch(self, queries):
+        """
+        Get crop recommendations for many field conditions at once
+        
+        Scores every (query, crop) pair as one NumPy matrix operation using
+        range-bound arrays built from crop_database. Scores and ranking are
+        identical to calling get_recommendations for each query.
+        
+        Args:
+            queries: list - (soil_type, temperature, humidity) tuples
+        
+        Returns:
+            list: One recommendation list per query, in input order
+        """
+        self._check_catalog()
+        arrays = self._get_arrays()
+        crop_count = len(arrays['names'])
+        rows_per_pass = max(1, self.BATCH_CELLS // max(crop_count, 1))
+        
+        results = []
+        for start in range(0, len(queries), rows_per_pass):
+            results.extend(self._score_batch(arrays, queries[start:start + rows_per_pass]))
+        return results
+    
+    def _get_arrays(self):
+        """Range-bound arrays for crop_database, built once"""
+        import numpy as np
+        
+        if self._arrays is None:
+            names = list(self.crop_database.keys())
+            crops = [self.crop_database[name] for name in names]
+            
+            soil_types = sorted({soil for crop in crops for soil in crop['soilTypes']})
+            soil_index = {soil: i for i, soil in enumerate(soil_types)}
+            # Extra all-False row for soil types no crop lists
+            soil_matrix = np.zeros((len(soil_types) + 1, len(crops)), dtype=bool)
+            for j, crop in enumerate(crops):
+                for soil in crop['soilTypes']:
+                    soil_matrix[soil_index[soil], j] = True
+            
+            temp = np.array([crop['tempRange'] for crop in crops], dtype=float).reshape(-1, 2)
+            hum = np.array([crop['humidityRange'] for crop in crops], dtype=float).reshape(-1, 2)
+            
+            self._arrays = {
+                'names': names,
+                'crops': crops,
+                'soil_index': soil_index,
+                'soil_matrix': soil_matrix,
+                'temp_min': temp[:, 0],
+                'temp_max': temp[:, 1],
+                'temp_mid': (temp[:, 0] + temp[:, 1]) / 2,
+                'hum_min': hum[:, 0],
+                'hum_max': hum[:, 1],
+                'hum_mid': (hum[:, 0] + hum[:, 1]) / 2
+            }
+        return self._arrays
+    
+    @staticmethod
+    def _match(arrays, soil_rows, temps, hums, crops=slice(None)):
+        """
+        Scores and match flags of queries (rows) against crops (columns)
+        
+        Args:
+            soil_rows: array - soil_matrix row per query
+            temps, hums: array - Query values as a column vector
+            crops: Crop indexes to score (default: all)
+        
+        Returns:
+            tuple: (scores, soil_ok, temp_ok, hum_ok) matrices
+        """
+        import numpy as np
+        
+        soil_ok = arrays['soil_matrix'][soil_rows][:, crops]
+        temp_ok = (arrays['temp_min'][crops] <= temps) & (temps <= arrays['temp_max'][crops])
+        temp_near = np.abs(temps - arrays['temp_mid'][crops]) <= 5
+        hum_ok = (arrays['hum_min'][crops] <= hums) & (hums <= arrays['hum_max'][crops])
+        hum_near = np.abs(hums - arrays['hum_mid'][crops]) <= 10
+        
+        # Same weights, and the same order of additions, as _calculate_suitability_score
+        scores = np.where(soil_ok, 0.4, 0.0)
+        scores = scores + np.where(temp_ok, 0.3, np.where(temp_near, 0.15, 0.0))
+        scores = scores + np.where(hum_ok, 0.3, np.where(hum_near, 0.15, 0.0))
+        return scores, soil_ok, temp_ok, hum_ok
+    
+    def _score_batch(self, arrays, queries):
+        """Score one slice of queries against every crop"""
+        import numpy as np
+        
+        unknown_soil = len(arrays['soil_index'])
+        soil_rows = np.array([arrays['soil_index'].get(q[0], unknown_soil) for q in queries], dtype=np.intp)
+        temps = np.array([q[1] for q in queries], dtype=float)[:, None]
+        hums = np.array([q[2] for q in queries], dtype=float)[:, None]
+        
+        return self._rank(arrays, queries, self._match(arrays, soil_rows, temps, hums))
+    
+    def _rank(self, arrays, queries, match, crops=None):
+        """
+        Recommendation lists from _match results
+        
+        Args:
+            queries: list - (soil_type, temperature, humidity) per row
+            match: tuple - Output of _match
+            crops: array - Crop index of each column, ascending (default: all)
+        
+        Returns:
+            list: One recommendation list per query
+        """
+        import numpy as np
+        
+        scores, soil_ok, temp_ok, hum_ok = match
+        # Stable sort on the rounded score keeps crop_database order for ties
+        order = np.argsort(-np.round(scores, 2), axis=1, kind='stable')
+        recommended = scores > 0.5
+        
+        names = arrays['names']
+        crops_data = arrays['crops']
+        # Reasons depend only on the crop, soil type and three match flags
+        reasons = {}
+        results = []
+        crop_indexes = None if crops is None else crops.tolist()
+        for i, query in enumerate(queries):
+            soil_type = query[0]
+            ranked = order[i][recommended[i][order[i]]].tolist()
+            # Plain lists: indexing NumPy rows per element is slow
+            row_scores = scores[i].tolist()
+            row_flags = (soil_ok[i].tolist(), temp_ok[i].tolist(), hum_ok[i].tolist())
+            recommendations = []
+            for k in ranked:
+                j = k if crop_indexes is None else crop_indexes[k]
+                crop_data = crops_data[j]
+                key = (j, soil_type, row_flags[0][k], row_flags[1][k], row_flags[2][k])
+                reason = reasons.get(key)
+                if reason is None:
+                    reason = reasons[key] = self._format_reason(names[j], crop_data, soil_type, *key[2:])
+                recommendations.append({
+                    'crop': names[j],
+                    'suitability': crop_data['suitability'],
+                    'reason': reason,
+                    'yield': crop_data['yield'],
+                    'score': round(row_scores[k], 2)
+                })
+            results.append(recommendations)
+        return results
+    
+    def _format_reason(self, crop_name, crop_data, soil_type, soil_ok, temp_ok, hum_ok):
+        """Build the reason string from precomputed match flags"""
         reasons = []
         
-        if soil_type in crop_data['soilTypes']:
+        if soil_ok:
             reasons.append(f"optimal {soil_type} soil")
         
-        temp_min, temp_max = crop_data['tempRange']
-        if temp_min <= temperature <= temp_max:
+        if temp_ok:
+            temp_min, temp_max = crop_data['tempRange']
             reasons.append(f"ideal temperature range ({temp_min}-{temp_max}°C)")
         
-        hum_min, hum_max = crop_data['humidityRange']
-        if hum_min <= humidity <= hum_max:
+        if hum_ok:
+            hum_min, hum_max = crop_data['humidityRange']
             reasons.append(f"suitable humidity ({hum_min}-{hum_max}%)")
         
         if reasons:
@@ -0,0 +1,105 @@
+import os
+import weakref
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+SQLITE_JOURNAL_MODES = {'delete', 'truncate', 'persist', 'memory', 'wal', 'off'}
+SQLITE_SYNCHRONOUS_MODES = {'off', 'normal', 'full', 'extra'}
+
+# Engines whose pooled connections must not be reused by a forked child
+_engines = weakref.WeakSet()
+
+def _dispose_after_fork():
+    # A pre-forking server (gunicorn --preload) would otherwise hand the
+    # parent's open sockets/file handles to every worker
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+def _is_sqlite_memory(url):
+    return url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory'
+
+def engine_options(database_uri, config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database
+
+    Pool sizing applies to every dialect with a connection pool; the
+    pre-ping and recycle settings guard against connections a Postgres
+    server or proxy closed while idle. Postgres also gets a lock_timeout
+    so a blocked statement fails instead of hanging a worker.
+
+    Args:
+        database_uri: str - SQLAlchemy database URL
+        config: mapping - Application config (DB_* keys)
+
+    Returns:
+        dict: Keyword arguments for create_engine()
+    """
+    url = make_url(database_uri)
+    backend = url.get_backend_name()
+
+    if backend == 'sqlite' and _is_sqlite_memory(url):
+        # Flask-SQLAlchemy gives in-memory databases a single shared connection
+        return {}
+
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT']
+    }
+    if backend == 'postgresql':
+        options['pool_pre_ping'] = True
+        options['pool_recycle'] = config['DB_POOL_RECYCLE']
+        if url.get_driver_name() in ('psycopg2', 'psycopg'):
+            options['connect_args'] = {'options': f"-c lock_timeout={config['DB_BUSY_TIMEOUT_MS']}"}
+    return options
+
+def sqlite_pragmas(config):
+    """
+    PRAGMA statements run on every new SQLite connection
+
+    WAL lets readers keep reading a consistent snapshot while one writer
+    commits, instead of the rollback journal's whole-file lock; with WAL,
+    synchronous=NORMAL stays corruption-safe and only fsyncs at
+    checkpoints. The busy timeout makes a second writer wait for the lock
+    rather than fail with "database is locked".
+    """
+    journal_mode = config['SQLITE_JOURNAL_MODE'].lower()
+    synchronous = config['SQLITE_SYNCHRONOUS'].lower()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f'Unsupported SQLITE_JOURNAL_MODE: {journal_mode}')
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f'Unsupported SQLITE_SYNCHRONOUS: {synchronous}')
+
+    return [
+        f"PRAGMA busy_timeout = {int(config['DB_BUSY_TIMEOUT_MS'])}",
+        f'PRAGMA journal_mode = {journal_mode}',
+        f'PRAGMA synchronous = {synchronous}',
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size = {-int(config['SQLITE_CACHE_SIZE_KB'])}",
+        f"PRAGMA mmap_size = {int(config['SQLITE_MMAP_SIZE'])}",
+        'PRAGMA temp_store = memory'
+    ]
+
+def configure_engine(engine, config):
+    """
+    Apply the connection-level profile to an engine created by Flask-SQLAlchemy
+
+    Call before the engine hands out its first connection.
+    """
+    _engines.add(engine)
+    if engine.dialect.name != 'sqlite':
+        return
+
+    statements = sqlite_pragmas(config)
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
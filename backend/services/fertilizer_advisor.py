@@ -1,33 +1,127 @@
+from types import MappingProxyType
+from config import Config
+from services.lru_cache import LRUCache
+
+class ReadOnlyDict(dict):
+    """
+    dict that refuses changes once built
+
+    Plans are shared by every caller, so changing one in place would leak
+    into later responses. Being a dict, it is still written natively by
+    orjson and the stdlib encoder; a MappingProxyType would need the JSON
+    provider's default() for every object. copy() returns a plain dict.
+    """
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f'{type(self).__name__} is read-only')
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+def _freeze(value):
+    """Read-only copy of nested dicts and lists (ReadOnlyDict and tuples)"""
+    if isinstance(value, dict):
+        return ReadOnlyDict({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# Crop -> nutrient needs and recommended fertilizers (read-only)
+FERTILIZER_REQUIREMENTS = _freeze({
+    'Wheat': {
+        'nitrogen': 'high',
+        'phosphorus': 'medium',
+        'potassium': 'medium',
+        'recommended': ['Urea', 'DAP', 'Potash']
+    },
+    'Corn': {
+        'nitrogen': 'very high',
+        'phosphorus': 'high',
+        'potassium': 'medium',
+        'recommended': ['Urea', 'Superphosphate', 'Potash']
+    },
+    'Tomatoes': {
+        'nitrogen': 'medium',
+        'phosphorus': 'high',
+        'potassium': 'very high',
+        'recommended': ['NPK 10-20-20', 'Potash', 'Compost']
+    },
+    'Potatoes': {
+        'nitrogen': 'medium',
+        'phosphorus': 'high',
+        'potassium': 'high',
+        'recommended': ['NPK 15-15-15', 'Potash', 'Organic Manure']
+    }
+})
+
+# Crop -> application steps, served as they are (read-only)
+APPLICATION_SCHEDULES = _freeze({
+    'Wheat': [
+        {'stage': 'Pre-planting', 'fertilizer': 'DAP', 'amount': '100-120 kg/ha'},
+        {'stage': 'Tillering', 'fertilizer': 'Urea', 'amount': '50-60 kg/ha'},
+        {'stage': 'Flowering', 'fertilizer': 'Urea', 'amount': '30-40 kg/ha'}
+    ],
+    'Corn': [
+        {'stage': 'Pre-planting', 'fertilizer': 'DAP', 'amount': '150-180 kg/ha'},
+        {'stage': 'V6 stage', 'fertilizer': 'Urea', 'amount': '100-120 kg/ha'},
+        {'stage': 'Tasseling', 'fertilizer': 'Urea', 'amount': '50-60 kg/ha'}
+    ],
+    'Tomatoes': [
+        {'stage': 'Transplanting', 'fertilizer': 'NPK 10-20-20', 'amount': '200-250 kg/ha'},
+        {'stage': 'Flowering', 'fertilizer': 'Potash', 'amount': '100-150 kg/ha'},
+        {'stage': 'Fruiting', 'fertilizer': 'Potash', 'amount': '50-75 kg/ha'}
+    ]
+})
+DEFAULT_SCHEDULE = _freeze([
+    {'stage': 'General', 'fertilizer': 'Balanced NPK', 'amount': 'As per soil test'}
+])
+
+SOIL_NOTES = MappingProxyType({
+    'Clay': 'Clay soil retains nutrients well - reduce application rates by 10-15%',
+    'Sandy': 'Sandy soil requires more frequent applications due to low retention'
+})
+# Soil pH buckets: index 0 = not given, 1 = acidic, 2 = neutral, 3 = alkaline
+PH_NOTES = (
+    None,
+    'Acidic soil detected - consider lime application',
+    None,
+    'Alkaline soil - use acid-forming fertilizers'
+)
+
 class FertilizerAdvisor:
-    """Service for fertilizer recommendations based on crop and soil conditions"""
+    """
+    Service for fertilizer recommendations based on crop and soil conditions
+    
+    The crop plans and soil/pH notes are compiled once into read-only
+    tables, and complete responses are memoized per (crop, soil type, pH
+    bucket), so repeated inputs return the same objects without
+    rebuilding anything. Responses are read-only as well (ReadOnlyDict
+    and tuples); copy one with dict() to change it.
+    """
     
-    def __init__(self):
-        self.fertilizer_requirements = {
-            'Wheat': {
-                'nitrogen': 'high',
-                'phosphorus': 'medium',
-                'potassium': 'medium',
-                'recommended': ['Urea', 'DAP', 'Potash']
-            },
-            'Corn': {
-                'nitrogen': 'very high',
-                'phosphorus': 'high',
-                'potassium': 'medium',
-                'recommended': ['Urea', 'Superphosphate', 'Potash']
-            },
-            'Tomatoes': {
-                'nitrogen': 'medium',
-                'phosphorus': 'high',
-                'potassium': 'very high',
-                'recommended': ['NPK 10-20-20', 'Potash', 'Compost']
-            },
-            'Potatoes': {
-                'nitrogen': 'medium',
-                'phosphorus': 'high',
-                'potassium': 'high',
-                'recommended': ['NPK 15-15-15', 'Potash', 'Organic Manure']
-            }
-        }
+    def __init__(self, cache_size=4096):
+        self.fertilizer_requirements = FERTILIZER_REQUIREMENTS
+        self._cache = LRUCache(cache_size)
+        
+        # Crop -> the soil-independent part of a recommendation
+        self._plans = MappingProxyType({
+            crop_type: ReadOnlyDict({
+                'requirements': ReadOnlyDict({
+                    'nitrogen': crop_data.get('nitrogen'),
+                    'phosphorus': crop_data.get('phosphorus'),
+                    'potassium': crop_data.get('potassium')
+                }),
+                'recommendedFertilizers': crop_data.get('recommended', ()),
+                'applicationSchedule': APPLICATION_SCHEDULES.get(crop_type, DEFAULT_SCHEDULE)
+            })
+            for crop_type, crop_data in self.fertilizer_requirements.items()
+        })
+        # (soil note, pH bucket) -> notes
+        self._notes = MappingProxyType({
+            (soil_note, bucket): tuple(note for note in (soil_note, PH_NOTES[bucket]) if note)
+            for soil_note in (None, *SOIL_NOTES.values())
+            for bucket in range(len(PH_NOTES))
+        })
     
     def get_recommendations(self, crop_type, soil_type, soil_ph=None):
         """
@@ -39,68 +133,70 @@ class FertilizerAdvisor:
             soil_ph: float - Soil pH (optional)
         
         Returns:
-            dict: Fertilizer recommendations
+            ReadOnlyDict: Fertilizer recommendations
         """
-        crop_data = self.fertilizer_requirements.get(crop_type, {})
-        
-        if not crop_data:
-            return {
-                'error': f'No fertilizer data available for {crop_type}'
-            }
-        
-        recommendations = {
-            'crop': crop_type,
-            'soilType': soil_type,
-            'requirements': {
-                'nitrogen': crop_data.get('nitrogen'),
-                'phosphorus': crop_data.get('phosphorus'),
-                'potassium': crop_data.get('potassium')
-            },
-            'recommendedFertilizers': crop_data.get('recommended', []),
-            'applicationSchedule': self._get_application_schedule(crop_type),
-            'notes': self._get_notes(crop_type, soil_type, soil_ph)
-        }
-        
+        key = (crop_type, soil_type, self._ph_bucket(soil_ph))
+        recommendations = self._cache.get(key)
+        if recommendations is None:
+            recommendations = self._build(*key)
+            self._cache.put(key, recommendations)
         return recommendations
     
-    def _get_application_schedule(self, crop_type):
-        """Get fertilizer application schedule"""
-        schedules = {
-            'Wheat': [
-                {'stage': 'Pre-planting', 'fertilizer': 'DAP', 'amount': '100-120 kg/ha'},
-                {'stage': 'Tillering', 'fertilizer': 'Urea', 'amount': '50-60 kg/ha'},
-                {'stage': 'Flowering', 'fertilizer': 'Urea', 'amount': '30-40 kg/ha'}
-            ],
-            'Corn': [
-                {'stage': 'Pre-planting', 'fertilizer': 'DAP', 'amount': '150-180 kg/ha'},
-                {'stage': 'V6 stage', 'fertilizer': 'Urea', 'amount': '100-120 kg/ha'},
-                {'stage': 'Tasseling', 'fertilizer': 'Urea', 'amount': '50-60 kg/ha'}
-            ],
-            'Tomatoes': [
-                {'stage': 'Transplanting', 'fertilizer': 'NPK 10-20-20', 'amount': '200-250 kg/ha'},
-                {'stage': 'Flowering', 'fertilizer': 'Potash', 'amount': '100-150 kg/ha'},
-                {'stage': 'Fruiting', 'fertilizer': 'Potash', 'amount': '50-75 kg/ha'}
-            ]
-        }
+    def get_recommendations_batch(self, fields):
+        """
+        Get fertilizer recommendations for many fields
         
-        return schedules.get(crop_type, [
-            {'stage': 'General', 'fertilizer': 'Balanced NPK', 'amount': 'As per soil test'}
-        ])
-    
-    def _get_notes(self, crop_type, soil_type, soil_ph):
-        """Get additional notes based on soil conditions"""
-        notes = []
+        Args:
+            fields: list - (crop_type, soil_type, soil_ph) tuples
         
-        if soil_type == 'Clay':
-            notes.append('Clay soil retains nutrients well - reduce application rates by 10-15%')
-        elif soil_type == 'Sandy':
-            notes.append('Sandy soil requires more frequent applications due to low retention')
+        Returns:
+            list: One read-only recommendation per field, in input
+                  order; fields with the same inputs share one object
+        """
+        seen = {}
+        results = []
+        for crop_type, soil_type, soil_ph in fields:
+            key = (crop_type, soil_type, self._ph_bucket(soil_ph))
+            recommendations = seen.get(key)
+            if recommendations is None:
+                recommendations = seen[key] = self.get_recommendations(crop_type, soil_type, soil_ph)
+            results.append(recommendations)
+        return results
+    
+    def get_all_crops(self):
+        """Crops with fertilizer data"""
+        return list(self._plans)
+    
+    def cache_stats(self):
+        """Hit/miss/eviction counters for the response cache"""
+        return self._cache.stats()
+    
+    def _build(self, crop_type, soil_type, ph_bucket):
+        """Assemble a recommendation from the compiled tables"""
+        plan = self._plans.get(crop_type)
         
-        if soil_ph:
-            if soil_ph < 6.0:
-                notes.append('Acidic soil detected - consider lime application')
-            elif soil_ph > 7.5:
-                notes.append('Alkaline soil - use acid-forming fertilizers')
+        if plan is None:
+            return ReadOnlyDict({
+                'error': f'No fertilizer data available for {crop_type}'
+            })
         
-        return notes
+        return ReadOnlyDict({
+            'crop': crop_type,
+            'soilType': soil_type,
+            **plan,
+            'notes': self._notes[(SOIL_NOTES.get(soil_type), ph_bucket)]
+        })
+    
+    @staticmethod
+    def _ph_bucket(soil_ph):
+        """Index into PH_NOTES; a missing (or zero) pH adds no note"""
+        if not soil_ph:
+            return 0
+        if soil_ph < 6.0:
+            return 1
+        if soil_ph > 7.5:
+            return 3
+        return 2
 
+# Shared by the fertilizer routes and the chatbot knowledge base
+advisor = FertilizerAdvisor(cache_size=Config.FERTILIZER_CACHE_SIZE)
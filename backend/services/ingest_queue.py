@@ -0,0 +1,222 @@
+import atexit
+import threading
+import time
+from collections import deque
+
+class QueueFull(Exception):
+    """Raised when a batch does not fit in the ingest queue (or it is shut down)"""
+
+class _Ticket:
+    """One submitted batch; lets the submitter wait for its flush"""
+
+    def __init__(self, rows, wait):
+        self.rows = rows
+        self.wait = wait
+        self.enqueued_at = time.monotonic()
+        self.inserted = 0
+        self.error = None
+        self.done = threading.Event()
+
+class IngestQueue:
+    """
+    Bounded write-behind buffer in front of sensor inserts
+
+    Requests hand validated rows to submit() and a single worker thread
+    writes them in batches: as soon as batch_size readings are waiting,
+    after flush_interval seconds, or immediately when a submitter is
+    waiting for its flush. Batches from concurrent requests are combined
+    into one INSERT and one commit, so ingest throughput is no longer
+    capped by the database's commit rate.
+
+    The queue holds at most max_pending readings; submit() raises
+    QueueFull beyond that so callers can push back on clients instead of
+    buffering without limit. Pending readings are flushed at interpreter
+    exit (or on drain()).
+    """
+
+    def __init__(self, writer, max_pending=200000, batch_size=2000, flush_interval=0.5, drain_timeout=30):
+        """
+        Args:
+            writer: callable - Writes a list of rows in one transaction and
+                    returns the rows actually inserted (SensorIngestor.write_rows)
+            max_pending: int - Readings the queue may hold
+            batch_size: int - Readings that trigger a flush
+            flush_interval: float - Longest time (s) a reading waits for a flush
+            drain_timeout: float - Time allowed to flush pending readings at exit
+        """
+        self.writer = writer
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drain_timeout = drain_timeout
+        self._tickets = deque()
+        self._pending = 0
+        self._waiters = 0
+        self._condition = threading.Condition()
+        self._worker = None
+        self._app = None
+        self._closed = False
+        self._stats = {
+            'enqueued': 0,
+            'flushed': 0,
+            'inserted': 0,
+            'rejected': 0,
+            'flushes': 0,
+            'failedFlushes': 0,
+            'lostReadings': 0,
+            'flushSeconds': 0.0,
+            'maxFlushSeconds': 0.0,
+            'lastFlushSeconds': 0.0
+        }
+
+    def start(self, app):
+        """Start the worker thread (idempotent); `app` provides the DB context"""
+        with self._condition:
+            if self._worker is not None:
+                return
+            self._app = app
+            self._worker = threading.Thread(target=self._run, name='sensor-ingest-queue', daemon=True)
+            self._worker.start()
+        atexit.register(self.drain)
+
+    def submit(self, rows, wait=False, timeout=None):
+        """
+        Queue validated rows for writing
+
+        Args:
+            rows: list - Column dicts as produced by SensorIngestor.validate()
+            wait: bool - Block until the rows are committed
+            timeout: float - Longest time to block when waiting
+
+        Returns:
+            int or None: Rows inserted (duplicates excluded) when waiting and
+                         the flush finished in time, None otherwise
+
+        Raises:
+            QueueFull: The rows would exceed max_pending
+        """
+        if not rows:
+            return 0 if wait else None
+
+        ticket = _Ticket(rows, wait)
+        with self._condition:
+            if self._closed or self._pending + len(rows) > self.max_pending:
+                self._stats['rejected'] += len(rows)
+                raise QueueFull('Ingest queue is full')
+            self._tickets.append(ticket)
+            self._pending += len(rows)
+            self._stats['enqueued'] += len(rows)
+            if wait:
+                self._waiters += 1
+            self._condition.notify()
+
+        if not wait:
+            return None
+        if not ticket.done.wait(timeout):
+            return None
+        if ticket.error is not None:
+            raise ticket.error
+        return ticket.inserted
+
+    def drain(self, timeout=None):
+        """Stop accepting rows and flush everything still queued"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            worker = self._worker
+        if worker is not None:
+            worker.join(self.drain_timeout if timeout is None else timeout)
+
+    def depth(self):
+        """Readings waiting to be written"""
+        return self._pending
+
+    def stats(self):
+        with self._condition:
+            stats = dict(self._stats)
+            oldest = self._tickets[0].enqueued_at if self._tickets else None
+            depth = self._pending
+        flushes = stats.pop('flushes')
+        flush_seconds = stats.pop('flushSeconds')
+        return {
+            **{key: value for key, value in stats.items() if not key.endswith('Seconds')},
+            'depth': depth,
+            'maxPending': self.max_pending,
+            'batchSize': self.batch_size,
+            'flushes': flushes,
+            'meanFlushMs': round(flush_seconds / flushes * 1000, 3) if flushes else 0.0,
+            'maxFlushMs': round(stats['maxFlushSeconds'] * 1000, 3),
+            'lastFlushMs': round(stats['lastFlushSeconds'] * 1000, 3),
+            'oldestPendingMs': round((time.monotonic() - oldest) * 1000, 3) if oldest is not None else 0.0
+        }
+
+    def _next_batch(self):
+        """Block until a flush is due, then take whole tickets up to batch_size readings"""
+        with self._condition:
+            while True:
+                if self._tickets:
+                    age = time.monotonic() - self._tickets[0].enqueued_at
+                    if (self._pending >= self.batch_size or self._waiters
+                            or age >= self.flush_interval or self._closed):
+                        break
+                    self._condition.wait(self.flush_interval - age)
+                elif self._closed:
+                    return None
+                else:
+                    self._condition.wait()
+
+            batch = []
+            count = 0
+            while self._tickets and (not batch or count + len(self._tickets[0].rows) <= self.batch_size):
+                ticket = self._tickets.popleft()
+                batch.append(ticket)
+                count += len(ticket.rows)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._flush(batch)
+
+    def _flush(self, batch):
+        rows = [row for ticket in batch for row in ticket.rows]
+        started = time.perf_counter()
+        error = None
+        try:
+            with self._app.app_context():
+                inserted = self.writer(rows)
+        except Exception as e:
+            error = e
+            self._app.logger.exception('Sensor ingest flush of %d readings failed', len(rows))
+        elapsed = time.perf_counter() - started
+
+        if error is None:
+            # Attribute each new key to the first batch that carried it
+            new_keys = {(row['sensor_id'], row['timestamp']) for row in inserted}
+            for ticket in batch:
+                for row in ticket.rows:
+                    key = (row['sensor_id'], row['timestamp'])
+                    if key in new_keys:
+                        new_keys.discard(key)
+                        ticket.inserted += 1
+
+        with self._condition:
+            self._pending -= len(rows)
+            self._stats['flushes'] += 1
+            self._stats['flushSeconds'] += elapsed
+            self._stats['lastFlushSeconds'] = elapsed
+            self._stats['maxFlushSeconds'] = max(self._stats['maxFlushSeconds'], elapsed)
+            if error is None:
+                self._stats['flushed'] += len(rows)
+                self._stats['inserted'] += len(inserted)
+            else:
+                self._stats['failedFlushes'] += 1
+            for ticket in batch:
+                if ticket.wait:
+                    self._waiters -= 1
+                elif error is not None:
+                    self._stats['lostReadings'] += len(ticket.rows)
+                ticket.error = error
+                ticket.done.set()
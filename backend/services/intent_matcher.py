@@ -0,0 +1,100 @@
+import json
+import re
+
+class IntentMatcher:
+    """
+    Keyword intent classifier compiled into a single regular expression
+
+    Every keyword of every intent goes into one alternation with word
+    boundaries, so a message is scanned once no matter how many intents
+    exist. When several intents match, the highest priority wins and
+    ties go to the intent listed first in the table.
+    """
+
+    def __init__(self, intents, fallback):
+        """
+        Args:
+            intents: list - Dicts with intent, keywords, response and
+                     optional priority (default 0)
+            fallback: dict - intent and response used when nothing matches
+        """
+        self.intents = []
+        self.fallback = {'intent': fallback['intent'], 'response': fallback['response']}
+        # Normalized keyword -> indexes of the intents that list it
+        self._keywords = {}
+
+        for order, entry in enumerate(intents):
+            self.intents.append({
+                'intent': entry['intent'],
+                'response': entry['response'],
+                'priority': entry.get('priority', 0)
+            })
+            for keyword in entry['keywords']:
+                key = self._normalize(keyword)
+                if key:
+                    self._keywords.setdefault(key, []).append(order)
+
+        # Rank = (priority, -table order); max() picks the winner
+        self._ranks = [(intent['priority'], -order) for order, intent in enumerate(self.intents)]
+        # One capturing group per keyword; group n matches self._groups[n - 1]
+        self._groups = sorted(self._keywords, key=len, reverse=True)
+        self._pattern = self._compile(self._groups)
+
+    @classmethod
+    def from_file(cls, path):
+        """Build a matcher from a JSON intent table"""
+        with open(path, encoding='utf-8') as f:
+            table = json.load(f)
+        return cls(table['intents'], table['fallback'])
+
+    @staticmethod
+    def _normalize(text):
+        return ' '.join(text.lower().split())
+
+    @staticmethod
+    def _compile(keywords):
+        if not keywords:
+            return None
+        # Longest first so multi-word keywords ("sweet corn") win over their parts
+        alternatives = [
+            '(' + r'\s+'.join(re.escape(word) for word in keyword.split()) + ')'
+            for keyword in keywords
+        ]
+        return re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b', re.IGNORECASE)
+
+    def classify(self, message):
+        """
+        Find the best matching intent for a message
+
+        Args:
+            message: str - User's message
+
+        Returns:
+            dict: intent, response and the keywords that matched
+        """
+        best = None
+        matched = []
+
+        if self._pattern is not None:
+            for match in self._pattern.finditer(message):
+                # The group tells which keyword matched; the matched text can
+                # differ from it in case (e.g. Unicode case folding)
+                keyword = self._groups[match.lastindex - 1]
+                matched.append(keyword)
+                for index in self._keywords[keyword]:
+                    if best is None or self._ranks[index] > self._ranks[best]:
+                        best = index
+
+        if best is None:
+            return {'intent': self.fallback['intent'], 'response': self.fallback['response'], 'matched': []}
+
+        intent = self.intents[best]
+        return {
+            'intent': intent['intent'],
+            'response': intent['response'],
+            'matched': sorted(set(matched))
+        }
+
+    def classify_many(self, messages):
+        """Classify a list of messages; results are in input order"""
+        return [self.classify(message) for message in messages]
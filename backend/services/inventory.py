@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from sqlalchemy import select, update
+from models.database import db, Product
+
+class InventoryService:
+    """
+    Stock reservation for marketplace checkouts
+
+    Each line item is one conditional UPDATE ... SET stock = stock - n
+    WHERE id = ? AND stock >= n. The database checks and decrements in a
+    single statement, so concurrent buyers can never drive stock below
+    zero, no row is read into Python first, and only the rows being
+    bought are locked. Items are updated in product id order so two
+    multi-item checkouts always lock rows in the same order and cannot
+    deadlock each other.
+    """
+
+    def checkout(self, items, all_or_nothing=True):
+        """
+        Reserve stock for a set of line items in one transaction
+
+        Args:
+            items: list - (product_id, quantity) pairs; repeated products
+                   are combined
+            all_or_nothing: bool - Roll everything back if any item fails
+                            (otherwise the available items are kept)
+
+        Returns:
+            dict: success flag and one result per product, in product id
+                  order, with status reserved, insufficient_stock,
+                  not_found or not_applied (rolled back)
+        """
+        quantities = OrderedDict()
+        for product_id, quantity in sorted(items):
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+
+        returning = db.engine.dialect.update_returning
+        results = []
+        try:
+            for product_id, quantity in quantities.items():
+                stmt = (
+                    update(Product)
+                    .where(Product.id == product_id, Product.stock >= quantity)
+                    .values(stock=Product.stock - quantity)
+                    .execution_options(synchronize_session=False)
+                )
+                result = {'productId': product_id, 'quantity': quantity}
+                if returning:
+                    remaining = db.session.execute(stmt.returning(Product.stock)).scalar()
+                    reserved = remaining is not None
+                else:
+                    reserved = db.session.execute(stmt).rowcount == 1
+                    remaining = None
+
+                if reserved:
+                    result['status'] = 'reserved'
+                    if remaining is not None:
+                        result['remainingStock'] = remaining
+                else:
+                    available = db.session.execute(
+                        select(Product.stock).where(Product.id == product_id)
+                    ).scalar()
+                    if available is None:
+                        result['status'] = 'not_found'
+                    else:
+                        result['status'] = 'insufficient_stock'
+                        result['availableStock'] = available
+                results.append(result)
+
+            success = all(result['status'] == 'reserved' for result in results)
+            if all_or_nothing and not success:
+                db.session.rollback()
+                for result in results:
+                    if result['status'] == 'reserved':
+                        result['status'] = 'not_applied'
+                        result.pop('remainingStock', None)
+            else:
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {
+            'success': success,
+            'allOrNothing': all_or_nothing,
+            'reservedItems': sum(result['status'] == 'reserved' for result in results),
+            'items': results
+        }
@@ -0,0 +1,107 @@
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib encoder is used instead
+    orjson = None
+
+def _default(o):
+    # Timestamps are ISO 8601 everywhere in this API (see the models' to_dict)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson when it is installed
+
+    Responses keep Flask's shape: sorted keys, compact separators (two
+    space indentation in debug mode) and a trailing newline. Datetimes
+    and dates are written as ISO 8601 strings, so routes and row encoders
+    can pass them through without calling isoformat() per value.
+    Non-ASCII text is sent as UTF-8 instead of \\u escapes, which decodes
+    to the same values. Anything orjson rejects (e.g. integers beyond 64
+    bits) falls back to the stdlib encoder, as does everything when
+    orjson is not installed.
+    """
+
+    default = staticmethod(_default)
+
+    def _options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self._options()).decode()
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.loads(s)
+            except ValueError:
+                # The stdlib parser also accepts NaN/Infinity and huge integers
+                pass
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+class RowEncoder:
+    """
+    Turn selected column tuples straight into response dicts
+
+    Endpoints select just the columns they return instead of loading ORM
+    objects and calling to_dict() on each one; datetimes are left as they
+    are for the JSON provider to format.
+
+    Rows still become one dict each: orjson writes a dict in C, and
+    building it with dict(zip()) costs less than any per-value encoding
+    in Python (key templates joined around orjson.dumps of each value
+    measured about five times slower on a 1000-row page).
+
+    Args:
+        fields: list - (JSON key, column) pairs in select order
+    """
+
+    def __init__(self, fields):
+        self.keys = tuple(key for key, _ in fields)
+        self.columns = tuple(column for _, column in fields)
+
+    def encode(self, rows):
+        """
+        Args:
+            rows: iterable - Result rows starting with self.columns (extra
+                trailing values, such as a sort key, are ignored)
+
+        Returns:
+            list: One dict per row
+        """
+        keys = self.keys
+        return [dict(zip(keys, row)) for row in rows]
+
+    def encode_one(self, row):
+        """Encode a single result row"""
+        return dict(zip(self.keys, row))
+
+    def encode_object(self, obj):
+        """Encode a mapped object, e.g. one just inserted, without to_dict()"""
+        return {key: getattr(obj, column.key) for key, column in zip(self.keys, self.columns)}
@@ -0,0 +1,65 @@
+import base64
+import json
+from sqlalchemy import and_, or_, tuple_
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded or does not fit the query"""
+
+def encode_cursor(sort_by, key, row_id):
+    """Opaque, URL-safe cursor for the row a page ended on"""
+    payload = json.dumps([sort_by, key, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).rstrip(b'=').decode()
+
+def decode_cursor(cursor, sort_by):
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: str - Cursor from a previous page ('' for the first page)
+        sort_by: str - Sort option of the current request
+
+    Returns:
+        tuple: (sort key, row id) of the last row seen, or None for the first page
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, key, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor')
+    if cursor_sort != sort_by or not isinstance(row_id, int):
+        raise InvalidCursor('Cursor does not match the requested sortBy')
+    return key, row_id
+
+def order_by_key(query, column, id_column, descending=False, nullable=False):
+    """Order by (column, id) so every row has a unique position"""
+    if descending:
+        key_order, id_order = column.desc(), id_column.desc()
+    else:
+        key_order, id_order = column.asc(), id_column.asc()
+    if nullable:
+        key_order = key_order.nulls_last()
+    return query.order_by(key_order, id_order)
+
+def seek_after(query, column, id_column, position, descending=False, nullable=False):
+    """
+    Keep only rows that come after `position` in order_by_key order
+
+    This is a range condition on (column, id), so a composite index on
+    those columns turns each page into an index seek instead of skipping
+    OFFSET rows.
+    """
+    key, row_id = position
+    if key is None:
+        # Already in the NULL tail, which is ordered by id alone
+        after_id = id_column < row_id if descending else id_column > row_id
+        return query.filter(and_(column.is_(None), after_id))
+
+    if descending:
+        condition = tuple_(column, id_column) < (key, row_id)
+    else:
+        condition = tuple_(column, id_column) > (key, row_id)
+    if nullable:
+        condition = or_(condition, column.is_(None))
+    return query.filter(condition)
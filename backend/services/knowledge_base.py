@@ -0,0 +1,300 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are still atomic, just not serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout or vectorizer settings change
+INDEX_FORMAT = 1
+
+_ARRAYS = ('data', 'indices', 'indptr')
+
+def load_corpus(corpus_dir):
+    """
+    Split the markdown guides in corpus_dir into passages
+
+    Every "## " section becomes one passage titled "<guide>: <section>".
+    """
+    documents = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '*.md'))):
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        source = os.path.basename(path)
+        title_match = re.search(r'^# (.+)$', content, re.MULTILINE)
+        guide = title_match.group(1).strip() if title_match else source
+        for section in re.split(r'^## ', content, flags=re.MULTILINE)[1:]:
+            heading, _, body = section.partition('\n')
+            body = ' '.join(body.split())
+            if body:
+                documents.append({'title': f'{guide}: {heading.strip()}', 'text': body, 'source': source})
+    return documents
+
+def crop_documents(crop_database):
+    """One passage per crop from CropRecommender.crop_database"""
+    documents = []
+    for crop_name, crop in crop_database.items():
+        text = (
+            f"{crop_name} grows in {', '.join(crop['soilTypes'])} soil. "
+            f"It needs temperatures of {crop['tempRange'][0]}-{crop['tempRange'][1]}°C "
+            f"and humidity of {crop['humidityRange'][0]}-{crop['humidityRange'][1]}%. "
+            f"Suitability is {crop['suitability'].lower()} with {crop['yield'].lower()} yield."
+        )
+        documents.append({'title': f'{crop_name} growing conditions', 'text': text, 'source': 'crop_database'})
+    return documents
+
+def fertilizer_documents(fertilizer_advisor):
+    """One passage per crop from FertilizerAdvisor.fertilizer_requirements"""
+    documents = []
+    for crop_name in fertilizer_advisor.fertilizer_requirements:
+        plan = fertilizer_advisor.get_recommendations(crop_name, None)
+        requirements = plan['requirements']
+        schedule = '; '.join(
+            f"{step['stage']}: {step['fertilizer']} {step['amount']}" for step in plan['applicationSchedule']
+        )
+        text = (
+            f"{crop_name} fertilizer needs: nitrogen {requirements['nitrogen']}, "
+            f"phosphorus {requirements['phosphorus']}, potassium {requirements['potassium']}. "
+            f"Recommended fertilizers are {', '.join(plan['recommendedFertilizers'])}. "
+            f"Application schedule: {schedule}."
+        )
+        documents.append({'title': f'{crop_name} fertilizer plan', 'text': text, 'source': 'fertilizer_requirements'})
+    return documents
+
+class KnowledgeBase:
+    """
+    TF-IDF retrieval over agronomy passages
+
+    The fitted vectorizer and a term-major CSR copy of the TF-IDF matrix
+    are persisted in a per-fingerprint directory under index_dir. Later
+    starts memory-map the saved arrays instead of refitting; the index is
+    rebuilt only when the passages (or the scikit-learn version) change,
+    by one worker at a time, and published with a directory rename. If
+    index_dir is not writable the fitted index is kept in memory.
+    Scoring a query multiplies its few non-zero terms against their
+    posting rows, so the cost tracks the query, not the corpus.
+
+    NumPy, SciPy and scikit-learn are imported on first use, so creating
+    a KnowledgeBase adds nothing to application start-up.
+    """
+
+    def __init__(self, index_dir, documents_source):
+        """
+        Args:
+            index_dir: str - Directory holding the persisted index
+            documents_source: callable - Returns the list of passages
+                              ({title, text, source}); called on first use
+        """
+        self.index_dir = index_dir
+        self._documents_source = documents_source
+        self._documents = None
+        self._vectorizer = None
+        self._postings = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._postings is not None:
+            return
+        with self._lock:
+            if self._postings is not None:
+                return
+            documents = self._documents_source()
+            fingerprint = self._fingerprint(documents)
+            if self._load(fingerprint):
+                return
+            with self._build_lock():
+                # Another worker may have built it while we waited
+                if not self._load(fingerprint):
+                    self._build(documents, fingerprint)
+
+    @staticmethod
+    def _fingerprint(documents):
+        import sklearn
+
+        digest = hashlib.sha256()
+        digest.update(f'{INDEX_FORMAT}:{sklearn.__version__}:'.encode())
+        digest.update(json.dumps(documents, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _version_dir(self, fingerprint):
+        # Each corpus version gets its own directory, written once and never
+        # modified, so arrays other workers have memory-mapped stay intact
+        return os.path.join(self.index_dir, fingerprint[:32])
+
+    def _load(self, fingerprint):
+        import joblib
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        directory = self._version_dir(fingerprint)
+        try:
+            with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('fingerprint') != fingerprint:
+                return False
+            with open(os.path.join(directory, 'documents.json'), encoding='utf-8') as f:
+                documents = json.load(f)
+            vectorizer = joblib.load(os.path.join(directory, 'vectorizer.joblib'))
+            data, indices, indptr = (
+                np.load(os.path.join(directory, f'postings_{name}.npy'), mmap_mode='r') for name in _ARRAYS
+            )
+            postings = csr_matrix((data, indices, indptr), shape=tuple(manifest['shape']))
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        self._set_index(documents, vectorizer, postings)
+        return True
+
+    def _build(self, documents, fingerprint, replace=False):
+        import numpy as np
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        vectorizer = TfidfVectorizer(
+            stop_words='english', ngram_range=(1, 2), sublinear_tf=True, dtype=np.float32
+        )
+        # Rows are L2-normalized, so a dot product is the cosine similarity
+        matrix = vectorizer.fit_transform(f"{doc['title']} {doc['text']}" for doc in documents)
+        postings = matrix.T.tocsr()
+        postings.sort_indices()
+
+        try:
+            self._save(documents, fingerprint, vectorizer, postings, replace)
+        except OSError:
+            # e.g. a read-only filesystem: serve the fitted index from memory
+            logger.warning('Could not persist the knowledge base index to %s', self.index_dir, exc_info=True)
+
+        self._set_index(documents, vectorizer, postings)
+
+    def _save(self, documents, fingerprint, vectorizer, postings, replace):
+        """
+        Publish a fitted index as a new version directory
+
+        Files are written to a private temporary directory that is renamed
+        into place in one step, so other processes see either no index or
+        a complete one. Older versions are removed afterwards; processes
+        still mapping their files keep reading them until they reload.
+        """
+        import joblib
+        import numpy as np
+        import sklearn
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        final_dir = self._version_dir(fingerprint)
+        temp_dir = tempfile.mkdtemp(dir=self.index_dir, prefix='.build-')
+        try:
+            for name in _ARRAYS:
+                np.save(os.path.join(temp_dir, f'postings_{name}.npy'), getattr(postings, name))
+            joblib.dump(vectorizer, os.path.join(temp_dir, 'vectorizer.joblib'))
+            with open(os.path.join(temp_dir, 'documents.json'), 'w', encoding='utf-8') as f:
+                json.dump(documents, f)
+            with open(os.path.join(temp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'fingerprint': fingerprint,
+                    'shape': list(postings.shape),
+                    'documents': len(documents),
+                    'sklearnVersion': sklearn.__version__
+                }, f)
+
+            if replace and os.path.isdir(final_dir):
+                retired = tempfile.mkdtemp(dir=self.index_dir, prefix='.old-')
+                os.replace(final_dir, os.path.join(retired, 'index'))
+            try:
+                os.rename(temp_dir, final_dir)
+            except OSError:
+                # Another process published the same version first
+                if not os.path.isdir(final_dir):
+                    raise
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+        keep = os.path.basename(final_dir)
+        for entry in os.listdir(self.index_dir):
+            path = os.path.join(self.index_dir, entry)
+            if entry != keep and not entry.startswith(('.build-', '.lock')) and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    @contextmanager
+    def _build_lock(self):
+        """Serialize index builds across worker processes (best effort)"""
+        if fcntl is None:
+            yield
+            return
+        try:
+            os.makedirs(self.index_dir, exist_ok=True)
+            lock_file = open(os.path.join(self.index_dir, '.lock'), 'a')
+        except OSError:
+            yield
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _set_index(self, documents, vectorizer, postings):
+        self._documents = documents
+        self._vectorizer = vectorizer
+        self._postings = postings
+
+    def rebuild(self):
+        """Refit and persist the index from the current passages"""
+        with self._lock, self._build_lock():
+            documents = self._documents_source()
+            self._build(documents, self._fingerprint(documents), replace=True)
+
+    def search(self, query, k=3, min_score=0.0):
+        """
+        Find the passages most similar to a query
+
+        Args:
+            query: str - Free text question
+            k: int - Maximum number of passages to return
+            min_score: float - Drop passages with a lower cosine similarity
+
+        Returns:
+            list: {title, text, source, score} dicts, best match first
+        """
+        import numpy as np
+
+        self._ensure_loaded()
+        query_vector = self._vectorizer.transform([query])
+        if query_vector.nnz == 0 or k <= 0:
+            return []
+
+        scores = (query_vector @ self._postings).toarray().ravel()
+        if k < scores.size:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(scores.size)
+        # Best score first, ties in corpus order
+        candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+
+        results = []
+        for index in candidates:
+            score = float(scores[index])
+            if score <= 0 or score < min_score:
+                break
+            document = self._documents[index]
+            results.append({
+                'title': document['title'],
+                'text': document['text'],
+                'source': document['source'],
+                'score': round(score, 4)
+            })
+        return results
+
+    def stats(self):
+        self._ensure_loaded()
+        return {'documents': len(self._documents), 'terms': self._postings.shape[0]}
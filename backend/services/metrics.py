@@ -0,0 +1,253 @@
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Database queries issued by one request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class _Metric:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _header(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.TYPE}']
+
+class Counter(_Metric):
+    """Monotonic count per label combination"""
+
+    TYPE = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header() + [
+            f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}' for key, value in values
+        ]
+
+class Gauge(Counter):
+    """Value that can go up and down per label combination"""
+
+    TYPE = 'gauge'
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+    def set(self, labels=(), value=0):
+        with self._lock:
+            self._values[labels] = value
+
+class Histogram(_Metric):
+    """Bucketed observations per label combination (cumulative on export)"""
+
+    TYPE = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels, value):
+        # Per-bucket (non-cumulative) counts; the last slot is +Inf
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        lines = self._header()
+        bounds = self.buckets + (float('inf'),)
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {cumulative}')
+        return lines
+
+class RequestMetrics:
+    """
+    Request and database instrumentation exported in Prometheus text format
+
+    init_app() installs before/after/teardown hooks that record, per
+    blueprint and route rule, a latency histogram, status-code counters
+    and an in-flight gauge, plus the number and total time of database
+    queries each request issued. The hot path is a few perf_counter()
+    calls and one short lock per series.
+
+    Latency is measured until the view returns; for streaming responses
+    that excludes the time spent sending the body.
+    """
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'Time spent handling a request',
+            ('blueprint', 'route', 'method')
+        )
+        self.requests = Counter(
+            'http_requests_total', 'Requests handled, by status code',
+            ('blueprint', 'route', 'method', 'status')
+        )
+        self.in_flight = Gauge(
+            'http_requests_in_flight', 'Requests currently being handled', ('blueprint',)
+        )
+        self.request_queries = Histogram(
+            'http_request_db_queries', 'Database queries issued per request',
+            ('blueprint', 'route'), buckets=QUERY_COUNT_BUCKETS
+        )
+        self.request_db_duration = Histogram(
+            'http_request_db_duration_seconds', 'Database time spent per request',
+            ('blueprint', 'route')
+        )
+        self.queries = Counter(
+            'db_queries_total', 'Database queries executed', ('context',)
+        )
+        self.query_duration = Counter(
+            'db_query_duration_seconds_total', 'Time spent executing database queries', ('context',)
+        )
+        self._metrics = [
+            self.request_duration, self.requests, self.in_flight,
+            self.request_queries, self.request_db_duration, self.queries, self.query_duration
+        ]
+        self._collectors = []
+        self._engine_hooks = False
+
+    def init_app(self, app, path='/api/metrics'):
+        """Install request hooks on `app` and serve the metrics at `path`"""
+        if app.extensions.get('request_metrics') is self:
+            return
+        app.extensions['request_metrics'] = self
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule(path, 'metrics', self.export)
+        self._install_engine_hooks()
+
+    def register_collector(self, collector):
+        """
+        Add metrics computed at scrape time
+
+        Args:
+            collector: callable - Returns an iterable of
+                       (name, type, help, [(labels dict, value), ...]);
+                       registering the same collector again is a no-op
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def export(self):
+        return Response(self.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        # A repeated family makes the whole exposition invalid, so keep the first
+        seen = {metric.name for metric in self._metrics}
+        for collector in self._collectors:
+            for name, metric_type, help_text, samples in collector():
+                if name in seen:
+                    continue
+                seen.add(name)
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} {metric_type}')
+                for labels, value in samples:
+                    names = tuple(labels)
+                    label_text = _format_labels(names, [labels[n] for n in names])
+                    lines.append(f'{name}{label_text} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _route():
+        rule = request.url_rule
+        return (request.blueprint or 'app', rule.rule if rule is not None else 'unmatched')
+
+    def _before_request(self):
+        blueprint, route = self._route()
+        g.metrics_request = [time.perf_counter(), blueprint, route, 500, 0, 0.0]
+        self.in_flight.inc((blueprint,))
+
+    def _after_request(self, response):
+        state = g.get('metrics_request')
+        if state is not None:
+            state[3] = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        state = g.pop('metrics_request', None)
+        if state is None:
+            return
+        started, blueprint, route, status, queries, db_seconds = state
+        elapsed = time.perf_counter() - started
+        method = request.method
+
+        self.in_flight.dec((blueprint,))
+        self.request_duration.observe((blueprint, route, method), elapsed)
+        self.requests.inc((blueprint, route, method, str(status)))
+        self.request_queries.observe((blueprint, route), queries)
+        self.request_db_duration.observe((blueprint, route), db_seconds)
+
+    def _install_engine_hooks(self):
+        if self._engine_hooks:
+            return
+        self._engine_hooks = True
+
+        @event.listens_for(Engine, 'before_cursor_execute')
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+        @event.listens_for(Engine, 'after_cursor_execute')
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['metrics_query_start'].pop()
+            state = g.get('metrics_request') if has_request_context() else None
+            if state is not None:
+                state[4] += 1
+                state[5] += elapsed
+                context_label = ('request',)
+            else:
+                context_label = ('background',)
+            self.queries.inc(context_label)
+            self.query_duration.inc(context_label, elapsed)
+
+        @event.listens_for(Engine, 'handle_error')
+        def _handle_error(exception_context):
+            # A failed statement never reaches after_cursor_execute
+            conn = exception_context.connection
+            if conn is not None and conn.info.get('metrics_query_start'):
+                conn.info['metrics_query_start'].pop()
@@ -0,0 +1,109 @@
+from pydantic import ValidationError
+from sqlalchemy import insert
+from models.database import db, Product
+from models.schemas import ProductCreate
+from services.bulk_io import InvalidRecord, chunked, format_validation_error
+
+class ProductImporter:
+    """Service for bulk-loading marketplace listings from CSV or NDJSON uploads"""
+
+    MAX_REPORTED_ERRORS = 1000
+
+    def __init__(self, chunk_size=1000, max_rows=100000):
+        self.chunk_size = chunk_size
+        self.max_rows = max_rows
+
+    def import_products(self, items):
+        """
+        Validate and store an upload of products
+
+        Records are pulled from `items` one chunk at a time, validated with
+        ProductCreate, and each chunk's valid rows are written with a single
+        batched INSERT and committed, so memory use is bounded by the
+        chunk size. Chunks committed before a later failure stay imported.
+
+        Args:
+            items: iterable - Raw product dicts (or InvalidRecord placeholders)
+
+        Returns:
+            dict: Counts of received, accepted, inserted and rejected records
+                  plus {index, error} entries for rejected records
+        """
+        summary = {
+            'received': 0,
+            'accepted': 0,
+            'inserted': 0,
+            'rejected': 0,
+            'truncated': False,
+            'errors': []
+        }
+
+        index = 0
+        for chunk in chunked(items, self.chunk_size):
+            if index + len(chunk) > self.max_rows:
+                chunk = chunk[:self.max_rows - index]
+                summary['truncated'] = True
+
+            rows, errors = self.validate(chunk, start_index=index)
+            index += len(chunk)
+
+            summary['received'] += len(chunk)
+            summary['accepted'] += len(rows)
+            summary['rejected'] += len(errors)
+            room = self.MAX_REPORTED_ERRORS - len(summary['errors'])
+            if room > 0:
+                summary['errors'].extend(errors[:room])
+
+            if rows:
+                summary['inserted'] += self.write_rows(rows)
+
+            if summary['truncated']:
+                break
+
+        return summary
+
+    def validate(self, items, start_index=0):
+        """
+        Validate raw product records in a single pass
+
+        Args:
+            items: list - Raw product dicts
+            start_index: int - Position of the first item in the upload
+
+        Returns:
+            tuple: (rows ready for insertion, list of {index, error} dicts)
+        """
+        rows = []
+        errors = []
+
+        for offset, item in enumerate(items):
+            if isinstance(item, InvalidRecord):
+                errors.append({'index': start_index + offset, 'error': item.error})
+                continue
+            try:
+                product = ProductCreate.model_validate(item)
+            except ValidationError as e:
+                errors.append({'index': start_index + offset, 'error': format_validation_error(e)})
+                continue
+
+            rows.append(product.model_dump())
+
+        return rows, errors
+
+    def write_rows(self, rows):
+        """
+        Insert validated rows in one batched statement and commit
+
+        Args:
+            rows: list - Column dicts as produced by validate()
+
+        Returns:
+            int: Number of rows inserted
+        """
+        try:
+            db.session.execute(insert(Product), rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(rows)
@@ -0,0 +1,145 @@
+import re
+from sqlalchemy import Float, Integer, or_, text
+from sqlalchemy.exc import OperationalError
+from models.database import db, Product
+
+# bm25() column weights, in the column order of the FTS table
+RANK_WEIGHTS = {'name': 10.0, 'description': 1.0, 'category': 4.0, 'farmer': 2.0}
+
+_COLUMNS = ', '.join(RANK_WEIGHTS)
+_NEW_VALUES = ', '.join(f'new.{column}' for column in RANK_WEIGHTS)
+_OLD_VALUES = ', '.join(f'old.{column}' for column in RANK_WEIGHTS)
+
+# External-content FTS5 table over products, kept in sync by triggers. The
+# update trigger only fires for indexed columns, so stock or rating changes
+# never touch the index.
+_SQLITE_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        {_COLUMNS}, content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, {_COLUMNS}) VALUES (new.id, {_NEW_VALUES});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD_VALUES});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF {_COLUMNS} ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, {_COLUMNS}) VALUES ('delete', old.id, {_OLD_VALUES});
+        INSERT INTO products_fts(rowid, {_COLUMNS}) VALUES (new.id, {_NEW_VALUES});
+    END"""
+]
+
+_INDEX_EXISTS = text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+
+class ProductSearch:
+    """Service for full-text product search over name, description, category and farmer"""
+
+    def __init__(self):
+        # Per database URL: True once the FTS index exists, False where it cannot
+        self._available = {}
+
+    def ensure_index(self):
+        """
+        Create the SQLite FTS5 index and its sync triggers if missing
+
+        A freshly created index is filled from the existing products.
+        Other databases (or SQLite builds without FTS5) fall back to
+        LIKE matching in apply().
+
+        Returns:
+            bool: True if the FTS index is available
+        """
+        engine = db.engine
+        url = str(engine.url)
+        if engine.dialect.name != 'sqlite':
+            self._available[url] = False
+            return False
+
+        try:
+            with engine.begin() as conn:
+                existed = conn.execute(_INDEX_EXISTS).first() is not None
+                for statement in _SQLITE_SCHEMA:
+                    conn.execute(text(statement))
+                if not existed:
+                    conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
+            self._available[url] = True
+        except OperationalError:
+            self._available[url] = False
+
+        return self._available[url]
+
+    def is_available(self):
+        """
+        Whether the current database has a usable FTS index
+
+        Only checks that the index table exists; creating and filling it
+        is left to ensure_index() (flask init-db), never to a request.
+        Until it exists searches use LIKE matching, and the check is
+        repeated so workers pick the index up once it is built.
+        """
+        engine = db.engine
+        url = str(engine.url)
+        available = self._available.get(url)
+        if available is None:
+            if engine.dialect.name != 'sqlite':
+                available = self._available[url] = False
+            else:
+                with engine.connect() as conn:
+                    available = conn.execute(_INDEX_EXISTS).first() is not None
+                if available:
+                    self._available[url] = True
+        return available
+
+    @staticmethod
+    def match_expression(term):
+        """
+        Turn free text into an FTS5 query
+
+        Every word must match as a prefix, which suits search-as-you-type
+        ("tom chut" matches "Tomato Chutney"). Words are quoted so FTS5
+        operators in user input are treated as plain text.
+        """
+        tokens = re.findall(r'\w+', term.lower())
+        if not tokens:
+            return None
+        return ' '.join(f'"{token}"*' for token in tokens)
+
+    def apply(self, query, term):
+        """
+        Restrict a Product query to search matches
+
+        Args:
+            query: Product query to filter
+            term: str - Search text from the user
+
+        Returns:
+            tuple: (filtered query, relevance column to order by ascending,
+                    or None when only LIKE matching is available)
+        """
+        expression = self.match_expression(term)
+
+        if expression is None:
+            return query.filter(Product.name.ilike(f'%{term}%')), None
+
+        if not self.is_available():
+            pattern = f'%{term}%'
+            return query.filter(or_(
+                Product.name.ilike(pattern),
+                Product.description.ilike(pattern),
+                Product.category.ilike(pattern),
+                Product.farmer.ilike(pattern)
+            )), None
+
+        weights = ', '.join(str(weight) for weight in RANK_WEIGHTS.values())
+        matches = (
+            text(
+                f'SELECT rowid AS product_id, bm25(products_fts, {weights}) AS rank '
+                'FROM products_fts WHERE products_fts MATCH :expression'
+            )
+            .bindparams(expression=expression)
+            .columns(product_id=Integer, rank=Float)
+            .subquery('search_matches')
+        )
+        # bm25() is lower for better matches
+        return query.join(matches, matches.c.product_id == Product.id), matches.c.rank
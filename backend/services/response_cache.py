@@ -0,0 +1,154 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from functools import wraps
+from itertools import chain
+from flask import Response, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from services.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Server-side cache for GET responses with strong ETags
+
+    Entries are keyed on the path and the normalized (sorted) query
+    string. Clients sending a matching If-None-Match get a bodyless 304.
+    invalidate_on_commit() clears the cache whenever a transaction that
+    touched a watched model commits.
+
+    Each worker process has its own cache. With `shared_path`, an
+    invalidation also replaces that file, and every lookup compares the
+    file's identity (inode and mtime, one stat() call) with the last one
+    seen, so a commit in any worker on the host clears the others too.
+    Workers on different hosts need a shared filesystem for this; without
+    one, disable the cache (max_size=0).
+    """
+
+    def __init__(self, max_size=1024, max_entry_bytes=1024 * 1024, shared_path=None):
+        self.max_entry_bytes = max_entry_bytes
+        self.shared_path = shared_path
+        self.generation = 0
+        self._cache = LRUCache(max_size)
+        self._lock = threading.Lock()
+        self._flag = f'response_cache_{id(self)}_dirty'
+        self._shared_token = self._read_shared_token()
+
+    def cached(self, view):
+        """Decorator for GET views whose output only depends on path, query and database"""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            if self.shared_path is not None:
+                self._sync_shared()
+            entry = self._cache.get(key)
+            response = None
+
+            if entry is None:
+                generation = self.generation
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                entry = (body, hashlib.blake2b(body, digest_size=16).hexdigest(), response.mimetype)
+                if len(body) <= self.max_entry_bytes:
+                    self._store(key, entry, generation)
+
+            body, etag, mimetype = entry
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            elif response is None:
+                response = Response(body, mimetype=mimetype)
+            response.set_etag(etag)
+            # Browsers may keep the body but must revalidate before reuse
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        return wrapper
+
+    def invalidate(self):
+        """Drop every cached response, in every worker sharing shared_path"""
+        with self._lock:
+            self.generation += 1
+            self._cache.clear()
+            if self.shared_path is not None:
+                self._shared_token = self._bump_shared()
+
+    def _read_shared_token(self):
+        if self.shared_path is None:
+            return None
+        try:
+            st = os.stat(self.shared_path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def _bump_shared(self):
+        """Atomically replace the shared file so its identity changes"""
+        directory = os.path.dirname(os.path.abspath(self.shared_path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.response-cache-')
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(self.generation))
+            os.replace(temp_path, self.shared_path)
+        except OSError:
+            logger.exception('Could not signal response cache invalidation via %s', self.shared_path)
+        return self._read_shared_token()
+
+    def _sync_shared(self):
+        """Clear the cache if another worker invalidated since the last lookup"""
+        token = self._read_shared_token()
+        if token != self._shared_token:
+            with self._lock:
+                if token != self._shared_token:
+                    self._shared_token = token
+                    self.generation += 1
+                    self._cache.clear()
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['generation'] = self.generation
+        return stats
+
+    def invalidate_on_commit(self, *models):
+        """
+        Invalidate after any commit that wrote one of `models`
+
+        Covers ORM unit-of-work changes (add/modify/delete) as well as
+        ORM-enabled bulk insert/update/delete statements, so future write
+        paths are picked up without extra calls. Rolled-back transactions
+        leave the cache alone.
+        """
+        flag = self._flag
+
+        @event.listens_for(Session, 'after_flush')
+        def _after_flush(session, flush_context):
+            if any(isinstance(obj, models) for obj in chain(session.new, session.dirty, session.deleted)):
+                session.info[flag] = True
+
+        @event.listens_for(Session, 'do_orm_execute')
+        def _do_orm_execute(state):
+            if state.is_insert or state.is_update or state.is_delete:
+                mapper = state.bind_mapper
+                if mapper is not None and issubclass(mapper.class_, models):
+                    state.session.info[flag] = True
+
+        @event.listens_for(Session, 'after_commit')
+        def _after_commit(session):
+            if session.info.pop(flag, False):
+                self.invalidate()
+
+        @event.listens_for(Session, 'after_rollback')
+        def _after_rollback(session):
+            session.info.pop(flag, None)
+
+    def _store(self, key, entry, generation):
+        # Skip responses built while a write was committing; they may be stale
+        with self._lock:
+            if generation == self.generation:
+                self._cache.put(key, entry)
@@ -0,0 +1,159 @@
+import csv
+import io
+from datetime import datetime, timezone
+from sqlalchemy import select
+from models.database import db, SensorData
+
+# (column, exported name) in file order
+EXPORT_COLUMNS = [
+    (SensorData.sensor_id, 'sensorId'),
+    (SensorData.timestamp, 'timestamp'),
+    (SensorData.temperature, 'temperature'),
+    (SensorData.humidity, 'humidity'),
+    (SensorData.soil_moisture, 'soilMoisture'),
+    (SensorData.water_usage, 'waterUsage')
+]
+
+# format -> (mimetype, file extension)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows')
+}
+
+class ExportUnavailable(Exception):
+    """Raised when the requested format needs pyarrow and it is not installed"""
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 query value into naive UTC (None if empty)"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are collected and handed out per chunk"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+class SensorExporter:
+    """
+    Streams stored sensor readings as CSV, Parquet or Arrow IPC
+
+    Rows are read with a server-side cursor in partitions of chunk_size
+    and each partition is encoded and handed to the client before the
+    next is fetched, so memory use depends on chunk_size rather than on
+    the size of the requested range. Parquet writes one row group per
+    partition.
+    """
+
+    def __init__(self, chunk_size=50000):
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def check_format(export_format):
+        """Raise ExportUnavailable early if the format's dependency is missing"""
+        if export_format in ('parquet', 'arrow'):
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                raise ExportUnavailable(f'{export_format} export requires pyarrow')
+
+    def statement(self, sensor_ids=None, start=None, end=None):
+        """SELECT for the export, ordered along the (sensor_id, timestamp) index"""
+        stmt = select(*(column for column, _ in EXPORT_COLUMNS))
+        if sensor_ids:
+            stmt = stmt.where(SensorData.sensor_id.in_(sensor_ids))
+        if start is not None:
+            stmt = stmt.where(SensorData.timestamp >= start)
+        if end is not None:
+            stmt = stmt.where(SensorData.timestamp < end)
+        return stmt.order_by(SensorData.sensor_id, SensorData.timestamp)
+
+    def iter_partitions(self, sensor_ids=None, start=None, end=None):
+        """Yield lists of row tuples, at most chunk_size rows each"""
+        with db.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=self.chunk_size).execute(
+                self.statement(sensor_ids, start, end)
+            )
+            for partition in result.partitions():
+                yield partition
+
+    def export(self, export_format, sensor_ids=None, start=None, end=None):
+        """
+        Encode the matching readings chunk by chunk
+
+        Args:
+            export_format: str - csv, parquet or arrow (IPC stream)
+            sensor_ids: list - Sensors to include (all if empty)
+            start: datetime - Inclusive lower bound on timestamp (optional)
+            end: datetime - Exclusive upper bound on timestamp (optional)
+
+        Returns:
+            generator: bytes chunks of the encoded file
+        """
+        partitions = self.iter_partitions(sensor_ids, start, end)
+        if export_format == 'csv':
+            return self._iter_csv(partitions)
+        return self._iter_arrow(partitions, export_format)
+
+    @staticmethod
+    def _iter_csv(partitions):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([name for _, name in EXPORT_COLUMNS])
+        for partition in partitions:
+            writer.writerows(
+                (sensor_id, timestamp.isoformat(), *values) for sensor_id, timestamp, *values in partition
+            )
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    @staticmethod
+    def _iter_arrow(partitions, export_format):
+        import pyarrow as pa
+
+        schema = pa.schema([
+            ('sensorId', pa.string()),
+            ('timestamp', pa.timestamp('us')),
+            ('temperature', pa.float64()),
+            ('humidity', pa.float64()),
+            ('soilMoisture', pa.float64()),
+            ('waterUsage', pa.float64())
+        ])
+        sink = _ChunkSink()
+        if export_format == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(sink, schema, compression='zstd')
+            write = writer.write_table
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+            write = writer.write_table
+
+        with writer:
+            for partition in partitions:
+                columns = list(zip(*partition))
+                write(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                yield sink.take()
+        yield sink.take()
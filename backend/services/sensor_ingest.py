@@ -0,0 +1,250 @@
+from pydantic import ValidationError
+from sqlalchemy import Index, delete, func, insert, inspect, select, tuple_
+from models.database import db, SensorData
+from models.schemas import SensorReadingCreate
+from services.bulk_io import InvalidRecord, chunked, format_validation_error
+
+# Identifies a reading; ON CONFLICT in write_rows() relies on it
+READING_KEY = ('sensor_id', 'timestamp')
+
+class SensorIngestor:
+    """Service for bulk-writing sensor readings pushed by field gateways"""
+
+    MAX_REPORTED_ERRORS = 100
+
+    def __init__(self, chunk_size=500, max_readings=50000, rollups=None, stream=None, anomalies=None):
+        self.chunk_size = chunk_size
+        self.max_readings = max_readings
+        self.rollups = rollups
+        self.stream = stream
+        self.anomalies = anomalies
+
+    def ensure_unique_key(self):
+        """
+        Add the unique (sensor_id, timestamp) index to an existing table
+
+        db.create_all() never alters a table that already exists, so
+        databases created before readings were deduplicated lack the
+        index that ON CONFLICT needs. Duplicate readings are deleted first
+        (the oldest row of each key is kept), then the rollups, if any,
+        are rebuilt from the remaining rows.
+
+        Returns:
+            bool: True if the index had to be added
+        """
+        connection = db.session.connection()
+        inspector = inspect(connection)
+        table = SensorData.__tablename__
+        unique_keys = [c['column_names'] for c in inspector.get_unique_constraints(table)]
+        unique_keys += [i['column_names'] for i in inspector.get_indexes(table) if i['unique']]
+        if list(READING_KEY) in unique_keys:
+            return False
+
+        try:
+            # Wrapped in a derived table, which MySQL needs to read the table it deletes from
+            keep = (
+                select(func.min(SensorData.id).label('id'))
+                .where(SensorData.timestamp.isnot(None))
+                .group_by(SensorData.sensor_id, SensorData.timestamp)
+                .subquery()
+            )
+            db.session.execute(
+                delete(SensorData)
+                .where(SensorData.timestamp.isnot(None), SensorData.id.not_in(select(keep.c.id)))
+                .execution_options(synchronize_session=False)
+            )
+            Index(
+                'uq_sensor_data_sensor_timestamp', *(getattr(SensorData, column) for column in READING_KEY),
+                unique=True
+            ).create(connection)
+            if self.rollups is not None:
+                self.rollups.rebuild()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return True
+
+    def ingest(self, items, write=None):
+        """
+        Validate and store a batch of readings
+
+        Readings are validated and written one chunk at a time, so a
+        streamed upload never has to be held in memory as a whole. Each
+        chunk is a single bulk INSERT that skips (sensor_id, timestamp)
+        pairs already stored, which makes gateway retries idempotent.
+
+        Args:
+            items: iterable - Raw reading dicts (or InvalidRecord placeholders)
+            write: callable - Takes a chunk of validated rows and returns the
+                   number inserted, or None if they were only queued
+                   (default: write_rows, committing each chunk directly)
+
+        Returns:
+            dict: Counts of received, accepted, inserted, queued, duplicate
+                  and rejected readings plus the first validation errors
+        """
+        if write is None:
+            write = lambda rows: len(self.write_rows(rows))
+
+        summary = {
+            'received': 0,
+            'accepted': 0,
+            'inserted': 0,
+            'queued': 0,
+            'duplicates': 0,
+            'rejected': 0,
+            'truncated': False,
+            'errors': []
+        }
+
+        index = 0
+        for chunk in chunked(items, self.chunk_size):
+            if index + len(chunk) > self.max_readings:
+                chunk = chunk[:self.max_readings - index]
+                summary['truncated'] = True
+
+            rows, errors = self.validate(chunk, start_index=index)
+            index += len(chunk)
+
+            summary['received'] += len(chunk)
+            summary['accepted'] += len(rows)
+            summary['rejected'] += len(errors)
+            room = self.MAX_REPORTED_ERRORS - len(summary['errors'])
+            if room > 0:
+                summary['errors'].extend(errors[:room])
+
+            if rows:
+                inserted = write(rows)
+                if inserted is None:
+                    summary['queued'] += len(rows)
+                else:
+                    summary['inserted'] += inserted
+
+            if summary['truncated']:
+                break
+
+        summary['duplicates'] = summary['accepted'] - summary['inserted'] - summary['queued']
+        return summary
+
+    def validate(self, items, start_index=0):
+        """
+        Validate raw readings in a single pass
+
+        Args:
+            items: list - Raw reading dicts
+            start_index: int - Position of the first item in the upload
+
+        Returns:
+            tuple: (rows ready for insertion, list of {index, error} dicts)
+        """
+        rows = []
+        errors = []
+
+        for offset, item in enumerate(items):
+            if isinstance(item, InvalidRecord):
+                errors.append({'index': start_index + offset, 'error': item.error})
+                continue
+            try:
+                reading = SensorReadingCreate.model_validate(item)
+            except ValidationError as e:
+                errors.append({'index': start_index + offset, 'error': format_validation_error(e)})
+                continue
+
+            rows.append({
+                'sensor_id': reading.sensorId,
+                'temperature': reading.temperature,
+                'humidity': reading.humidity,
+                'soil_moisture': reading.soilMoisture,
+                'water_usage': reading.waterUsage,
+                'timestamp': reading.timestamp
+            })
+
+        return rows, errors
+
+    def write_rows(self, rows):
+        """
+        Insert validated rows in one statement and commit
+
+        Args:
+            rows: list - Column dicts as produced by validate()
+
+        Returns:
+            list: The rows that were actually inserted (duplicates excluded)
+        """
+        # Collapse repeats inside the chunk itself; the last copy wins
+        unique = list({(row['sensor_id'], row['timestamp']): row for row in rows}.values())
+
+        try:
+            dialect = db.session.get_bind().dialect.name
+            if dialect in ('sqlite', 'postgresql'):
+                inserted = self._insert_ignoring_conflicts(dialect, unique)
+            else:
+                inserted = self._insert_new_only(unique)
+            if self.rollups is not None:
+                self.rollups.apply(inserted)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if self.anomalies is not None:
+            self.anomalies.observe(inserted)
+        if self.stream is not None:
+            self._publish(inserted)
+
+        return inserted
+
+    def _publish(self, rows):
+        """Push the newest committed reading of each sensor to stream clients"""
+        newest = {}
+        for row in rows:
+            current = newest.get(row['sensor_id'])
+            if current is None or row['timestamp'] > current['timestamp']:
+                newest[row['sensor_id']] = row
+
+        for sensor_id, row in newest.items():
+            self.stream.publish(sensor_id, {
+                'sensorId': sensor_id,
+                'temperature': row['temperature'],
+                'humidity': row['humidity'],
+                'soilMoisture': row['soil_moisture'],
+                'waterUsage': row['water_usage'],
+                'timestamp': row['timestamp'].isoformat()
+            })
+
+    def _insert_ignoring_conflicts(self, dialect, rows):
+        """INSERT ... ON CONFLICT DO NOTHING, returning only the new rows"""
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        stmt = (
+            dialect_insert(SensorData)
+            .on_conflict_do_nothing(index_elements=['sensor_id', 'timestamp'])
+            .returning(
+                SensorData.sensor_id,
+                SensorData.temperature,
+                SensorData.humidity,
+                SensorData.soil_moisture,
+                SensorData.water_usage,
+                SensorData.timestamp
+            )
+        )
+        result = db.session.execute(stmt, rows)
+        return [row._asdict() for row in result]
+
+    def _insert_new_only(self, rows):
+        """Fallback for dialects without ON CONFLICT: skip keys that already exist"""
+        keys = [(row['sensor_id'], row['timestamp']) for row in rows]
+        existing = set(
+            db.session.execute(
+                select(SensorData.sensor_id, SensorData.timestamp)
+                .where(tuple_(SensorData.sensor_id, SensorData.timestamp).in_(keys))
+            ).all()
+        )
+        new_rows = [row for row in rows if (row['sensor_id'], row['timestamp']) not in existing]
+        if new_rows:
+            db.session.execute(insert(SensorData), new_rows)
+        return new_rows
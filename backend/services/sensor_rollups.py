@@ -0,0 +1,175 @@
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from models.database import db, SensorData, SensorHourlyRollup, SensorDailyRollup
+
+METRICS = ('temperature', 'humidity', 'soil_moisture', 'water_usage')
+METRIC_KEYS = ('temperature', 'humidity', 'soilMoisture', 'waterUsage')
+
+# Ordered from finest to coarsest
+RESOLUTIONS = {
+    'hour': (SensorHourlyRollup, timedelta(hours=1)),
+    'day': (SensorDailyRollup, timedelta(days=1))
+}
+
+def _truncate(timestamp, resolution):
+    """Start of the rollup bucket containing a timestamp"""
+    if resolution == 'day':
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+class SensorRollups:
+    """Service maintaining and querying hourly/daily sensor aggregates"""
+
+    def __init__(self, min_points=24):
+        # History requests use the coarsest resolution that still yields
+        # at least this many buckets over the requested window
+        self.min_points = min_points
+
+    def apply(self, rows):
+        """
+        Fold newly inserted readings into the rollup tables
+
+        Runs inside the caller's transaction so rollups commit (or roll
+        back) together with the raw rows. Only pass rows that were
+        actually inserted, otherwise duplicates would be counted twice.
+
+        Args:
+            rows: list - Column dicts with sensor_id, timestamp and metric values
+        """
+        if not rows:
+            return
+
+        dialect = db.session.get_bind().dialect.name
+        for resolution, (model, _) in RESOLUTIONS.items():
+            buckets = self._aggregate(rows, resolution)
+            if dialect in ('sqlite', 'postgresql'):
+                self._upsert(model, dialect, buckets)
+            else:
+                self._merge(model, buckets)
+
+    def rebuild(self, chunk_size=10000):
+        """Recompute every rollup from the raw sensor_data table"""
+        for model, _ in RESOLUTIONS.values():
+            db.session.query(model).delete()
+
+        columns = [SensorData.sensor_id, SensorData.timestamp] + [getattr(SensorData, m) for m in METRICS]
+        result = db.session.execute(
+            select(*columns)
+            .where(SensorData.timestamp.isnot(None))
+            .execution_options(yield_per=chunk_size)
+        )
+        for partition in result.partitions():
+            self.apply([row._asdict() for row in partition])
+
+        db.session.commit()
+
+    def choose_resolution(self, hours):
+        """Pick the coarsest resolution that still gives min_points buckets"""
+        chosen = 'hour'
+        for resolution, (_, step) in RESOLUTIONS.items():
+            if hours * 3600 / step.total_seconds() >= self.min_points:
+                chosen = resolution
+        return chosen
+
+    def get_history(self, sensor_id, hours=24, resolution=None, now=None):
+        """
+        Get aggregated history for a sensor, newest bucket first
+
+        Args:
+            sensor_id: str - Sensor identifier
+            hours: int - Size of the window ending now
+            resolution: str - 'hour' or 'day' (chosen automatically if omitted)
+            now: datetime - End of the window in UTC (defaults to utcnow)
+
+        Returns:
+            tuple: (resolution used, list of bucket dicts; timestamps are
+                datetimes, serialized by the app's JSON provider)
+        """
+        if resolution is None:
+            resolution = self.choose_resolution(hours)
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f'Unsupported resolution: {resolution}')
+
+        model, step = RESOLUTIONS[resolution]
+        buckets = max(1, math.ceil(hours * 3600 / step.total_seconds()))
+        start = _truncate(now or datetime.utcnow(), resolution) - step * (buckets - 1)
+
+        # Plain column tuples rather than ORM objects; the dicts match to_dict()
+        columns = [model.bucket_start, model.count]
+        for metric in METRICS:
+            columns += [getattr(model, f'{metric}_sum'), getattr(model, f'{metric}_min'), getattr(model, f'{metric}_max')]
+        rows = db.session.execute(
+            select(*columns)
+            .where(model.sensor_id == sensor_id, model.bucket_start >= start)
+            .order_by(model.bucket_start.desc())
+        ).all()
+
+        history = []
+        for row in rows:
+            count = row[1] or 1
+            bucket = {'sensorId': sensor_id, 'timestamp': row[0], 'resolution': resolution, 'count': row[1]}
+            for i, key in enumerate(METRIC_KEYS):
+                bucket[key] = round(row[2 + 3 * i] / count, 2)
+                bucket[f'{key}Min'] = row[3 + 3 * i]
+                bucket[f'{key}Max'] = row[4 + 3 * i]
+            history.append(bucket)
+        return resolution, history
+
+    def _aggregate(self, rows, resolution):
+        """Reduce rows to one aggregate dict per (sensor, bucket)"""
+        buckets = {}
+        for row in rows:
+            key = (row['sensor_id'], _truncate(row['timestamp'], resolution))
+            agg = buckets.get(key)
+            if agg is None:
+                agg = buckets[key] = {'sensor_id': key[0], 'bucket_start': key[1], 'count': 0}
+                for metric in METRICS:
+                    value = row[metric] or 0.0
+                    agg[f'{metric}_min'] = value
+                    agg[f'{metric}_max'] = value
+                    agg[f'{metric}_sum'] = 0.0
+
+            agg['count'] += 1
+            for metric in METRICS:
+                value = row[metric] or 0.0
+                if value < agg[f'{metric}_min']:
+                    agg[f'{metric}_min'] = value
+                if value > agg[f'{metric}_max']:
+                    agg[f'{metric}_max'] = value
+                agg[f'{metric}_sum'] += value
+
+        return list(buckets.values())
+
+    def _upsert(self, model, dialect, buckets):
+        """Merge aggregates with a single INSERT ... ON CONFLICT DO UPDATE"""
+        if dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            least, greatest = func.min, func.max  # scalar min()/max() with two arguments
+        else:
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            least, greatest = func.least, func.greatest
+
+        stmt = dialect_insert(model)
+        excluded = stmt.excluded
+        updates = {'count': model.count + excluded['count']}
+        for metric in METRICS:
+            updates[f'{metric}_min'] = least(getattr(model, f'{metric}_min'), excluded[f'{metric}_min'])
+            updates[f'{metric}_max'] = greatest(getattr(model, f'{metric}_max'), excluded[f'{metric}_max'])
+            updates[f'{metric}_sum'] = getattr(model, f'{metric}_sum') + excluded[f'{metric}_sum']
+
+        stmt = stmt.on_conflict_do_update(index_elements=['sensor_id', 'bucket_start'], set_=updates)
+        db.session.execute(stmt, buckets)
+
+    def _merge(self, model, buckets):
+        """Fallback for dialects without ON CONFLICT: read-modify-write per bucket"""
+        for agg in buckets:
+            rollup = model.query.filter_by(sensor_id=agg['sensor_id'], bucket_start=agg['bucket_start']).first()
+            if rollup is None:
+                db.session.add(model(**agg))
+                continue
+            rollup.count += agg['count']
+            for metric in METRICS:
+                setattr(rollup, f'{metric}_min', min(getattr(rollup, f'{metric}_min'), agg[f'{metric}_min']))
+                setattr(rollup, f'{metric}_max', max(getattr(rollup, f'{metric}_max'), agg[f'{metric}_max']))
+                setattr(rollup, f'{metric}_sum', getattr(rollup, f'{metric}_sum') + agg[f'{metric}_sum'])
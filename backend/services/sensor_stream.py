@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class StreamSubscription:
+    """
+    Pending readings for one connected client
+
+    Readings are coalesced per sensor: if a sensor changes again before
+    the client has consumed the previous value, only the newest value is
+    kept. The buffer is also capped at max_pending sensors; past that the
+    oldest pending sensor is dropped and counted, so a slow client costs
+    bounded memory no matter how fast readings arrive.
+    """
+
+    def __init__(self, sensor_ids=None, max_pending=1000):
+        self.sensor_ids = frozenset(sensor_ids) if sensor_ids else None
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+
+    def wants(self, sensor_id):
+        return self.sensor_ids is None or sensor_id in self.sensor_ids
+
+    def offer(self, sensor_id, reading):
+        """Queue a reading for delivery, replacing any undelivered one for the sensor"""
+        with self._condition:
+            if sensor_id in self._pending:
+                self._pending.move_to_end(sensor_id)
+            elif len(self._pending) >= self.max_pending:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[sensor_id] = reading
+            self._condition.notify()
+
+    def drain(self, timeout):
+        """
+        Wait up to `timeout` seconds for readings
+
+        Returns:
+            tuple: (list of readings, number dropped since the last drain)
+        """
+        with self._condition:
+            if not self._pending:
+                self._condition.wait(timeout)
+            readings = list(self._pending.values())
+            self._pending.clear()
+            dropped, self.dropped = self.dropped, 0
+        return readings, dropped
+
+class SensorStreamHub:
+    """Fan-out of changed sensor readings to streaming clients"""
+
+    def __init__(self, max_pending=1000):
+        self.max_pending = max_pending
+        self._subscriptions = set()
+        self._latest = {}
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+        self._feed = None
+
+    def subscribe(self, sensor_ids=None):
+        """Register a client; pair every call with unsubscribe()"""
+        subscription = StreamSubscription(sensor_ids, self.max_pending)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscriptions)
+
+    def snapshot(self, sensor_ids=None):
+        """Latest known reading of every (matching) sensor"""
+        with self._lock:
+            if sensor_ids:
+                return [self._latest[s] for s in sensor_ids if s in self._latest]
+            return list(self._latest.values())
+
+    def publish(self, sensor_id, reading, fingerprint=None):
+        """
+        Push a reading to every subscriber interested in the sensor
+
+        Args:
+            sensor_id: str - Sensor identifier
+            reading: dict - Payload sent to clients
+            fingerprint: hashable - Measurement values; a reading whose
+                         fingerprint equals the last published one is skipped
+
+        Returns:
+            bool: True if the reading was new or changed
+        """
+        with self._lock:
+            if fingerprint is not None and self._fingerprints.get(sensor_id) == fingerprint:
+                return False
+            self._fingerprints[sensor_id] = fingerprint
+            self._latest[sensor_id] = reading
+            subscribers = [s for s in self._subscriptions if s.wants(sensor_id)]
+
+        for subscription in subscribers:
+            subscription.offer(sensor_id, reading)
+        return True
+
+    def start_feed(self, source, interval):
+        """
+        Poll `source` every `interval` seconds while anyone is subscribed
+
+        One shared feed replaces per-client polling. `source` returns
+        (sensor_id, reading, fingerprint) tuples; only changes are pushed.
+        """
+        with self._lock:
+            if self._feed is not None:
+                return
+            self._feed = threading.Thread(
+                target=self._run_feed, args=(source, interval), name='sensor-stream-feed', daemon=True
+            )
+        self._feed.start()
+
+    def _run_feed(self, source, interval):
+        try:
+            while True:
+                if self.subscriber_count():
+                    try:
+                        for sensor_id, reading, fingerprint in source():
+                            self.publish(sensor_id, reading, fingerprint)
+                    except Exception:
+                        # A failed poll must not end the feed for every client
+                        logger.exception('Sensor stream feed poll failed')
+                time.sleep(interval)
+        finally:
+            # Let the next start_feed() start a fresh thread
+            with self._lock:
+                if self._feed is threading.current_thread():
+                    self._feed = None
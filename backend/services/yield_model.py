@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+# Model inputs, in column order
+FEATURES = ['cropType', 'season', 'temperature', 'humidity', 'soilMoisture']
+TARGET = 'yieldPerHectare'
+
+MANIFEST = 'manifest.json'
+
+def encode_features(crop_types, seasons, temperatures, humidities, soil_moistures, crops, season_names):
+    """
+    Feature matrix for the yield regressor
+
+    Crop type and season are integer category codes in the order of the
+    training vocabularies; values never seen in training become NaN,
+    which the model treats as missing.
+    """
+    import numpy as np
+
+    crop_codes = {crop: float(i) for i, crop in enumerate(crops)}
+    season_codes = {season: float(i) for i, season in enumerate(season_names)}
+    return np.column_stack([
+        np.array([crop_codes.get(crop, np.nan) for crop in crop_types], dtype=float),
+        np.array([season_codes.get(season, np.nan) for season in seasons], dtype=float),
+        np.asarray(temperatures, dtype=float),
+        np.asarray(humidities, dtype=float),
+        np.asarray(soil_moistures, dtype=float)
+    ])
+
+def train_yield_model(frame, model_dir, source=None, random_state=0):
+    """
+    Fit a yield-per-hectare regressor and save it as a new model version
+
+    A HistGradientBoostingRegressor is used because its fitted trees are
+    plain NumPy arrays, which joblib can memory-map when loading. The
+    artifact is written uncompressed for the same reason.
+
+    Args:
+        frame: pandas.DataFrame - FEATURES columns plus yieldPerHectare
+        model_dir: str - Directory holding model versions and the manifest
+        source: str - Description of the training data (optional)
+        random_state: int - Seed for the validation split and the model
+
+    Returns:
+        dict: Manifest entry of the new version
+    """
+    import joblib
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from sklearn.metrics import mean_absolute_error
+    from sklearn.model_selection import train_test_split
+
+    missing = [column for column in FEATURES + [TARGET] if column not in frame.columns]
+    if missing:
+        raise ValueError(f'Training data is missing columns: {", ".join(missing)}')
+    frame = frame.dropna(subset=[TARGET])
+    if len(frame) < 20:
+        raise ValueError('At least 20 training rows are needed')
+
+    crops = sorted(frame['cropType'].dropna().astype(str).unique())
+    seasons = sorted(frame['season'].dropna().astype(str).unique())
+    features = encode_features(
+        frame['cropType'].astype(str), frame['season'].astype(str),
+        frame['temperature'], frame['humidity'], frame['soilMoisture'], crops, seasons
+    )
+    target = frame[TARGET].to_numpy(dtype=float)
+
+    train_x, test_x, train_y, test_y = train_test_split(
+        features, target, test_size=0.2, random_state=random_state
+    )
+    model = HistGradientBoostingRegressor(
+        categorical_features=[0, 1], max_iter=300, learning_rate=0.1, random_state=random_state
+    )
+    model.fit(train_x, train_y)
+    validation_mae = float(mean_absolute_error(test_y, model.predict(test_x)))
+    # Refit on everything once the holdout score is known
+    model.fit(features, target)
+
+    os.makedirs(model_dir, exist_ok=True)
+    version = base_version = datetime.utcnow().strftime('%Y%m%d%H%M%S')
+    suffix = 1
+    while os.path.exists(os.path.join(model_dir, f'yield-{version}.joblib')):
+        suffix += 1
+        version = f'{base_version}-{suffix}'
+    filename = f'yield-{version}.joblib'
+    temp_path = os.path.join(model_dir, filename + '.tmp')
+    joblib.dump({'version': version, 'model': model, 'crops': crops, 'seasons': seasons}, temp_path)
+    os.replace(temp_path, os.path.join(model_dir, filename))
+
+    entry = {
+        'version': version,
+        'file': filename,
+        'trainedAt': datetime.utcnow().isoformat(),
+        'rows': int(len(frame)),
+        'features': FEATURES,
+        'crops': crops,
+        'seasons': seasons,
+        'validationMae': round(validation_mae, 2),
+        'source': source
+    }
+    manifest = read_manifest(model_dir) or {'versions': []}
+    manifest['versions'].append(entry)
+    manifest['current'] = version
+    temp_path = os.path.join(model_dir, MANIFEST + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, os.path.join(model_dir, MANIFEST))
+    return entry
+
+def read_manifest(model_dir):
+    """The model manifest, or None if no model was trained yet"""
+    try:
+        with open(os.path.join(model_dir, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class YieldModel:
+    """A trained yield-per-hectare regressor loaded from a model directory"""
+
+    def __init__(self, version, model, crops, seasons):
+        self.version = version
+        self.model = model
+        self.crops = crops
+        self.seasons = seasons
+
+    @classmethod
+    def load(cls, model_dir):
+        """
+        Load the current model version, or return None if there is none
+
+        The artifact is opened with mmap_mode='r': the tree arrays stay in
+        the OS page cache and are shared by every worker process that
+        loads the same file instead of being copied into each one.
+        """
+        import joblib
+
+        manifest = read_manifest(model_dir)
+        if not manifest or not manifest.get('current'):
+            return None
+        entry = next((v for v in manifest['versions'] if v['version'] == manifest['current']), None)
+        if entry is None:
+            return None
+        artifact = joblib.load(os.path.join(model_dir, entry['file']), mmap_mode='r')
+        return cls(artifact['version'], artifact['model'], artifact['crops'], artifact['seasons'])
+
+    def predict_per_hectare(self, crop_types, seasons, temperatures, humidities, soil_moistures):
+        """Predicted yield per hectare (kg) for every row, never negative"""
+        import numpy as np
+
+        features = encode_features(
+            crop_types, seasons, temperatures, humidities, soil_moistures, self.crops, self.seasons
+        )
+        return np.maximum(self.model.predict(features), 0.0)
+
+class LazyYieldModel:
+    """Loads the model on first use, once per process"""
+
+    def __init__(self, model_dir):
+        self.model_dir = model_dir
+        self._model = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def get(self):
+        """The loaded YieldModel, or None when no model has been trained"""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._model = YieldModel.load(self.model_dir) if self.model_dir else None
+                    self._loaded = True
+        return self._model
+
+    def reload(self):
+        """Pick up a newly trained version on the next prediction"""
+        with self._lock:
+            self._loaded = False
+            self._model = None
@@ -1,11 +1,55 @@
-import numpy as np
+import math
+import random
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List
+from services.yield_model import LazyYieldModel
+
+# Factor and recommendation texts, indexed by the bucket codes used in predict_many
+TEMPERATURE_FACTORS = (None, 'Extreme temperature conditions', 'Optimal temperature range')
+HUMIDITY_FACTORS = (None, 'Suboptimal humidity levels', 'Ideal humidity for crop growth')
+SOIL_MOISTURE_FACTORS = (
+    None,
+    'Low soil moisture - irrigation needed',
+    'Optimal soil moisture',
+    'Excessive soil moisture - drainage needed'
+)
+
+TEMPERATURE_RECOMMENDATIONS = (
+    None,
+    'Consider using greenhouse or cold frames to maintain temperature',
+    'Implement shade structures and increase irrigation frequency'
+)
+SOIL_MOISTURE_RECOMMENDATIONS = (
+    None,
+    'Increase irrigation to maintain soil moisture between 65-80%',
+    'Improve drainage to prevent waterlogging'
+)
+HUMIDITY_RECOMMENDATIONS = (
+    None,
+    'Consider misting systems to increase humidity',
+    'Ensure proper ventilation to reduce humidity'
+)
+DEFAULT_RECOMMENDATION = 'Current conditions are optimal - maintain current practices'
+
+# Reported as the model version when no trained model is available
+RULES_VERSION = 'rules'
+
+def _is_number(value):
+    # bool is an int subclass, and numeric strings would be coerced by NumPy
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
 
 class YieldPredictor:
-    """Service for predicting crop yields based on conditions"""
+    """
+    Service for predicting crop yields based on conditions
+    
+    When a trained model exists in model_dir (see train_yield_model.py)
+    it predicts the yield per hectare; otherwise the rule table below
+    is used. The model is loaded on the first prediction, not at import.
+    """
     
-    def __init__(self):
+    def __init__(self, model_dir=None):
+        self._model = LazyYieldModel(model_dir)
         # Base yield per hectare (kg) for different crops
         self.base_yields = {
             'Wheat': 3000,
@@ -15,6 +59,20 @@ class YieldPredictor:
             'Rice': 4000,
             'Barley': 2500
         }
+        
+        # Every combination of bucket codes maps to a fixed list of strings
+        self._factor_table = [
+            [text for text in (t, h, s) if text]
+            for t in TEMPERATURE_FACTORS
+            for h in HUMIDITY_FACTORS
+            for s in SOIL_MOISTURE_FACTORS
+        ]
+        self._recommendation_table = [
+            [text for text in (t, s, h) if text] or [DEFAULT_RECOMMENDATION]
+            for t in TEMPERATURE_RECOMMENDATIONS
+            for s in SOIL_MOISTURE_RECOMMENDATIONS
+            for h in HUMIDITY_RECOMMENDATIONS
+        ]
     
     def predict(self, crop_type, field_size, conditions, season):
         """
@@ -30,12 +88,24 @@ class YieldPredictor:
             dict: Prediction results with yield, confidence, factors, and recommendations
         """
         base_yield = self.base_yields.get(crop_type, 2000)
+        model = self._model.get()
+        started = time.perf_counter()
         
-        # Calculate yield multiplier based on conditions
-        multiplier = self._calculate_multiplier(conditions)
-        
-        # Predict yield
-        predicted_yield = base_yield * field_size * multiplier
+        if model is None:
+            # Calculate yield multiplier based on conditions
+            multiplier = self._calculate_multiplier(conditions)
+            
+            # Predict yield
+            predicted_yield = base_yield * field_size * multiplier
+        else:
+            per_hectare = model.predict_per_hectare(
+                [crop_type], [season],
+                [conditions.get('temperature', 25)],
+                [conditions.get('humidity', 65)],
+                [conditions.get('soilMoisture', 70)]
+            )
+            predicted_yield = float(per_hectare[0]) * field_size
+        inference_ms = (time.perf_counter() - started) * 1000
         
         # Calculate confidence based on how optimal conditions are
         confidence = self._calculate_confidence(conditions)
@@ -54,9 +124,156 @@ class YieldPredictor:
             'cropType': crop_type,
             'fieldSize': field_size,
             'season': season,
-            'baseYieldPerHectare': base_yield
+            'baseYieldPerHectare': base_yield,
+            'modelVersion': model.version if model is not None else RULES_VERSION,
+            'inferenceMs': round(inference_ms, 3)
         }
     
+    def predict_many(self, crop_types, field_sizes, temperatures=None, humidities=None,
+                     soil_moistures=None, seasons=None, return_info=False):
+        """
+        Predict yields for many fields from columnar inputs
+        
+        Multipliers (or one batched model call), clamping and confidence
+        are computed with NumPy array operations; factors and
+        recommendations are looked up from bucket codes. Each result is
+        identical to calling predict() per field, minus inferenceMs.
+        
+        Args:
+            crop_types: list - Crop type per field
+            field_sizes: list - Field size in hectares per field
+            temperatures: list - Temperature per field (optional, default 25)
+            humidities: list - Humidity per field (optional, default 65)
+            soil_moistures: list - Soil moisture per field (optional, default 70)
+            seasons: list or str - Growing season per field (optional)
+            return_info: bool - Also return {modelVersion, inferenceMs}
+        
+        Returns:
+            list: One prediction dict per field, in input order
+                  (a (list, info) tuple with return_info)
+        """
+        import numpy as np
+        
+        errors = self.validate_columns(crop_types, field_sizes, temperatures, humidities, soil_moistures)
+        if errors:
+            raise ValueError(f"row {errors[0]['index']}: {errors[0]['error']}")
+        
+        count = len(crop_types)
+        sizes = np.asarray(field_sizes, dtype=float)
+        temp = self._column(temperatures, count, 25)
+        humidity = self._column(humidities, count, 65)
+        soil_moisture = self._column(soil_moistures, count, 70)
+        if seasons is None or isinstance(seasons, str):
+            seasons = [seasons or 'Unknown'] * count
+        
+        base = np.array([self.base_yields.get(crop, 2000) for crop in crop_types], dtype=float)
+        temp_optimal = (20 <= temp) & (temp <= 28)
+        humidity_optimal = (60 <= humidity) & (humidity <= 75)
+        soil_optimal = (65 <= soil_moisture) & (soil_moisture <= 80)
+        
+        model = self._model.get()
+        started = time.perf_counter()
+        if model is None:
+            # Same multiplications, in the same order, as _calculate_multiplier
+            multiplier = 1.0 * np.select(
+                [temp_optimal, ((15 <= temp) & (temp < 20)) | ((28 < temp) & (temp <= 32))], [1.2, 1.0], 0.7
+            )
+            multiplier = multiplier * np.select(
+                [humidity_optimal, ((50 <= humidity) & (humidity < 60)) | ((75 < humidity) & (humidity <= 80))], [1.1, 1.0], 0.8
+            )
+            multiplier = multiplier * np.select(
+                [soil_optimal, ((55 <= soil_moisture) & (soil_moisture < 65)) | ((80 < soil_moisture) & (soil_moisture <= 85))], [1.15, 1.0], 0.75
+            )
+            multiplier = np.minimum(np.maximum(multiplier, 0.5), 1.5)
+            predicted = base * sizes * multiplier
+        else:
+            # One model call for the whole batch
+            predicted = model.predict_per_hectare(crop_types, seasons, temp, humidity, soil_moisture) * sizes
+        inference_ms = (time.perf_counter() - started) * 1000
+        model_version = model.version if model is not None else RULES_VERSION
+        
+        confidence = 0.5 + np.where(temp_optimal, 0.15, 0.0)
+        confidence = confidence + np.where(humidity_optimal, 0.15, 0.0)
+        confidence = confidence + np.where(soil_optimal, 0.2, 0.0)
+        confidence = np.minimum(confidence, 1.0)
+        
+        # Bucket codes index the tuples at the top of this module
+        temp_factor = np.select([(temp < 15) | (temp > 35), temp_optimal], [1, 2], 0)
+        humidity_factor = np.select([(humidity < 40) | (humidity > 85), humidity_optimal], [1, 2], 0)
+        soil_factor = np.select([soil_moisture < 50, soil_optimal, soil_moisture > 85], [1, 2, 3], 0)
+        factor_codes = (temp_factor * 3 + humidity_factor) * 4 + soil_factor
+        
+        temp_rec = np.select([temp < 15, temp > 35], [1, 2], 0)
+        soil_rec = np.select([soil_moisture < 50, soil_moisture > 85], [1, 2], 0)
+        humidity_rec = np.select([humidity < 40, humidity > 85], [1, 2], 0)
+        recommendation_codes = (temp_rec * 3 + soil_rec) * 3 + humidity_rec
+        
+        predictions = []
+        for crop_type, field_size, season, yield_value, conf, factor_code, rec_code in zip(
+            crop_types, field_sizes, seasons, predicted.tolist(), confidence.tolist(),
+            factor_codes.tolist(), recommendation_codes.tolist()
+        ):
+            predictions.append({
+                'predictedYield': round(yield_value, 2),
+                'confidence': round(conf, 2),
+                'factors': list(self._factor_table[factor_code]),
+                'recommendations': list(self._recommendation_table[rec_code]),
+                'cropType': crop_type,
+                'fieldSize': field_size,
+                'season': season,
+                'baseYieldPerHectare': self.base_yields.get(crop_type, 2000),
+                'modelVersion': model_version
+            })
+        
+        if return_info:
+            return predictions, {'modelVersion': model_version, 'inferenceMs': round(inference_ms, 3)}
+        return predictions
+    
+    def validate_columns(self, crop_types, field_sizes, temperatures=None, humidities=None,
+                         soil_moistures=None):
+        """
+        Check columnar inputs row by row before predict_many
+        
+        Args:
+            crop_types: list - Crop type per field
+            field_sizes: list - Field size in hectares per field
+            temperatures, humidities, soil_moistures: list - Optional columns
+                (null entries fall back to the defaults)
+        
+        Returns:
+            list: {index, error} dicts, empty when every row is valid
+        """
+        optional = (('temperature', temperatures), ('humidity', humidities), ('soilMoisture', soil_moistures))
+        if any(len(values) != len(crop_types) for values in [field_sizes] + [v for _, v in optional if v is not None]):
+            raise ValueError('All input columns must have the same length')
+        errors = []
+        for index, (crop_type, field_size) in enumerate(zip(crop_types, field_sizes)):
+            problems = []
+            if not isinstance(crop_type, str) or not crop_type:
+                problems.append('cropType must be a non-empty string')
+            if not _is_number(field_size) or field_size <= 0:
+                problems.append('fieldSize must be a positive number')
+            for name, values in optional:
+                if values is not None and values[index] is not None and not _is_number(values[index]):
+                    problems.append(f'{name} must be a number or null')
+            if problems:
+                errors.append({'index': index, 'error': '; '.join(problems)})
+        return errors
+    
+    def reload_model(self):
+        """Use the newest trained model from the next prediction on"""
+        self._model.reload()
+    
+    def _column(self, values, count, default):
+        """Float array for an optional input column, filling gaps with the default"""
+        import numpy as np
+        
+        if values is None:
+            return np.full(count, default, dtype=float)
+        if len(values) != count:
+            raise ValueError('All input columns must have the same length')
+        return np.array([default if value is None else value for value in values], dtype=float)
+    
     def _calculate_multiplier(self, conditions):
         """Calculate yield multiplier based on conditions (0.5 to 1.5)"""
         multiplier = 1.0
@@ -114,23 +331,23 @@ class YieldPredictor:
         
         temp = conditions.get('temperature', 25)
         if temp < 15 or temp > 35:
-            factors.append('Extreme temperature conditions')
+            factors.append(TEMPERATURE_FACTORS[1])
         elif 20 <= temp <= 28:
-            factors.append('Optimal temperature range')
+            factors.append(TEMPERATURE_FACTORS[2])
         
         humidity = conditions.get('humidity', 65)
         if humidity < 40 or humidity > 85:
-            factors.append('Suboptimal humidity levels')
+            factors.append(HUMIDITY_FACTORS[1])
         elif 60 <= humidity <= 75:
-            factors.append('Ideal humidity for crop growth')
+            factors.append(HUMIDITY_FACTORS[2])
         
         soil_moisture = conditions.get('soilMoisture', 70)
         if soil_moisture < 50:
-            factors.append('Low soil moisture - irrigation needed')
+            factors.append(SOIL_MOISTURE_FACTORS[1])
         elif 65 <= soil_moisture <= 80:
-            factors.append('Optimal soil moisture')
+            factors.append(SOIL_MOISTURE_FACTORS[2])
         elif soil_moisture > 85:
-            factors.append('Excessive soil moisture - drainage needed')
+            factors.append(SOIL_MOISTURE_FACTORS[3])
         
         return factors
     
@@ -140,24 +357,24 @@ class YieldPredictor:
         
         temp = conditions.get('temperature', 25)
         if temp < 15:
-            recommendations.append('Consider using greenhouse or cold frames to maintain temperature')
+            recommendations.append(TEMPERATURE_RECOMMENDATIONS[1])
         elif temp > 35:
-            recommendations.append('Implement shade structures and increase irrigation frequency')
+            recommendations.append(TEMPERATURE_RECOMMENDATIONS[2])
         
         soil_moisture = conditions.get('soilMoisture', 70)
         if soil_moisture < 50:
-            recommendations.append('Increase irrigation to maintain soil moisture between 65-80%')
+            recommendations.append(SOIL_MOISTURE_RECOMMENDATIONS[1])
         elif soil_moisture > 85:
-            recommendations.append('Improve drainage to prevent waterlogging')
+            recommendations.append(SOIL_MOISTURE_RECOMMENDATIONS[2])
         
         humidity = conditions.get('humidity', 65)
         if humidity < 40:
-            recommendations.append('Consider misting systems to increase humidity')
+            recommendations.append(HUMIDITY_RECOMMENDATIONS[1])
         elif humidity > 85:
-            recommendations.append('Ensure proper ventilation to reduce humidity')
+            recommendations.append(HUMIDITY_RECOMMENDATIONS[2])
         
         if not recommendations:
-            recommendations.append('Current conditions are optimal - maintain current practices')
+            recommendations.append(DEFAULT_RECOMMENDATION)
         
         return recommendations
     
@@ -168,7 +385,7 @@ class YieldPredictor:
         
         for i in range(months):
             date = base_date - timedelta(days=30 * i)
-            yield_value = self.base_yields.get(crop_type, 2000) * (0.9 + np.random.random() * 0.2)
+            yield_value = self.base_yields.get(crop_type, 2000) * (0.9 + random.random() * 0.2)
             
             history.append({
                 'month': date.strftime('%Y-%m'),
@@ -1,12 +1,17 @@
+import argparse
+import json
 import random
+import sys
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict
 
 class SensorSimulator:
     """Simulate IoT sensor readings for smart irrigation"""
     
-    def __init__(self):
+    def __init__(self, seed=None):
+        # A seed makes the generated variations reproducible
+        self._random = random.Random(seed)
         self.sensors = [
             {
                 'id': 'sensor-001',
@@ -88,10 +93,10 @@ class SensorSimulator:
             timestamp = datetime.now()
         
         # Add realistic variations (±10% for temp, ±5% for others)
-        temp_variation = random.uniform(-2.5, 2.5)
-        humidity_variation = random.uniform(-5, 5)
-        soil_moisture_variation = random.uniform(-3, 3)
-        water_usage_variation = random.uniform(-10, 10)
+        temp_variation = self._random.uniform(-2.5, 2.5)
+        humidity_variation = self._random.uniform(-5, 5)
+        soil_moisture_variation = self._random.uniform(-3, 3)
+        water_usage_variation = self._random.uniform(-10, 10)
         
         temperature = sensor['baseTemp'] + temp_variation
         humidity = max(30, min(90, sensor['baseHumidity'] + humidity_variation))
@@ -127,3 +132,163 @@ class SensorSimulator:
             return True
         return False
 
+
+# Base profiles for fleet simulation; weight is the share of the fleet
+DEFAULT_FLEET_PROFILES = [
+    {'location': 'Open Field', 'baseTemp': 24, 'baseHumidity': 67, 'baseSoilMoisture': 68,
+     'baseWaterUsage': 108, 'dailyTempSwing': 6, 'weight': 0.7},
+    {'location': 'Greenhouse', 'baseTemp': 28, 'baseHumidity': 75, 'baseSoilMoisture': 80,
+     'baseWaterUsage': 150, 'dailyTempSwing': 3, 'weight': 0.2},
+    {'location': 'Orchard', 'baseTemp': 22, 'baseHumidity': 62, 'baseSoilMoisture': 64,
+     'baseWaterUsage': 125, 'dailyTempSwing': 7, 'weight': 0.1}
+]
+
+def _naive_utc(end, interval_minutes):
+    """Window end as naive UTC, defaulting to now truncated to the interval"""
+    if end is None:
+        end = datetime.utcnow().replace(second=0, microsecond=0)
+        return end - timedelta(minutes=end.minute % interval_minutes)
+    if end.tzinfo is not None:
+        return end.astimezone(timezone.utc).replace(tzinfo=None)
+    return end
+
+class FleetSimulator:
+    """
+    Simulate large sensor fleets with NumPy
+    
+    Every sensor gets its own baseline drawn from a weighted profile, and
+    whole histories are generated as (sensors x time steps) arrays with a
+    diurnal cycle (warmest mid-afternoon, most humid at dawn) plus noise.
+    Output depends only on the seed and the requested window, so runs are
+    reproducible.
+    """
+    
+    def __init__(self, size=10000, seed=42, profiles=None, id_prefix='fleet'):
+        import numpy as np
+        
+        self.size = size
+        self.seed = seed
+        self.profiles = profiles or DEFAULT_FLEET_PROFILES
+        self.sensor_ids = [f'{id_prefix}-{i:06d}' for i in range(size)]
+        
+        rng = np.random.default_rng(seed)
+        weights = np.array([p.get('weight', 1) for p in self.profiles], dtype=float)
+        self.profile_index = rng.choice(len(self.profiles), size=size, p=weights / weights.sum())
+        
+        def baseline(key, spread):
+            values = np.array([p[key] for p in self.profiles], dtype=float)[self.profile_index]
+            return values + rng.normal(0, spread, size)
+        
+        self.base_temp = baseline('baseTemp', 1.5)
+        self.base_humidity = baseline('baseHumidity', 3)
+        self.base_soil_moisture = baseline('baseSoilMoisture', 3)
+        self.base_water_usage = baseline('baseWaterUsage', 10)
+        self.temp_swing = np.abs(baseline('dailyTempSwing', 0.5))
+        # Sensors do not all peak at exactly the same minute
+        self.phase_hours = rng.normal(0, 0.5, size)
+    
+    def generate(self, hours=24, end=None, interval_minutes=60, initial_drift=None):
+        """
+        Generate a history window for the whole fleet
+        
+        Args:
+            hours: int - Length of the window
+            end: datetime - Timestamp of the last step, naive UTC or aware
+                 (defaults to the current UTC time truncated to the interval)
+            interval_minutes: int - Minutes between readings
+            initial_drift: array - Soil moisture drift per sensor carried
+                 over from the previous window (default: none)
+        
+        Returns:
+            dict: 'sensorId' (n,), 'timestamp' (steps,) and one
+                  (n, steps) float array per metric, oldest step first,
+                  plus the final 'drift' (n,) to continue from
+        """
+        import numpy as np
+        
+        step = timedelta(minutes=interval_minutes)
+        end = _naive_utc(end, interval_minutes)
+        steps = max(1, int(hours * 60 // interval_minutes))
+        timestamps = [end - step * (steps - 1 - i) for i in range(steps)]
+        
+        # Seeded per window so a given (seed, end, hours) always matches;
+        # the epoch is taken as UTC so the host timezone does not matter
+        epoch = int(end.replace(tzinfo=timezone.utc).timestamp())
+        rng = np.random.default_rng([self.seed, epoch, steps])
+        shape = (self.size, steps)
+        
+        hour_of_day = np.array([t.hour + t.minute / 60 for t in timestamps])
+        angle = 2 * np.pi * (hour_of_day[None, :] - self.phase_hours[:, None] - 9) / 24
+        diurnal = np.sin(angle)  # peaks around 15:00, lowest around 03:00
+        swing = self.temp_swing[:, None]
+        
+        temperature = self.base_temp[:, None] + swing * diurnal + rng.normal(0, 0.8, shape)
+        humidity = self.base_humidity[:, None] - 1.5 * swing * diurnal + rng.normal(0, 2, shape)
+        # Soil dries through the day and drifts slowly between irrigations
+        drift = np.cumsum(rng.normal(0, 0.3, shape), axis=1)
+        if initial_drift is not None:
+            drift += np.asarray(initial_drift)[:, None]
+        soil_moisture = self.base_soil_moisture[:, None] - 2 * diurnal + drift + rng.normal(0, 1, shape)
+        water_usage = self.base_water_usage[:, None] * (1 + 0.3 * np.clip(diurnal, 0, None)) + rng.normal(0, 8, shape)
+        
+        return {
+            'sensorId': self.sensor_ids,
+            'timestamp': timestamps,
+            'temperature': np.round(temperature, 1),
+            'humidity': np.round(np.clip(humidity, 30, 95), 1),
+            'soilMoisture': np.round(np.clip(soil_moisture, 35, 95), 1),
+            'waterUsage': np.round(np.clip(water_usage, 0, None), 1),
+            'drift': drift[:, -1]
+        }
+    
+    def iter_readings(self, hours=24, end=None, interval_minutes=60, block_hours=24):
+        """
+        Yield readings in the POST /iot/readings format, oldest first
+        
+        Long windows are generated block by block, so memory stays
+        proportional to fleet size x block_hours; soil moisture drift
+        carries over from one block to the next.
+        """
+        end = _naive_utc(end, interval_minutes)
+        total_steps = max(1, int(hours * 60 // interval_minutes))
+        block_steps = max(1, int(block_hours * 60 // interval_minutes))
+        step = timedelta(minutes=interval_minutes)
+        
+        drift = None
+        for offset in range(total_steps, 0, -block_steps):
+            steps = min(block_steps, offset)
+            block_end = end - step * (offset - steps)
+            window = self.generate(steps * interval_minutes / 60, block_end, interval_minutes, drift)
+            drift = window['drift']
+            metrics = [window[key].tolist() for key in ('temperature', 'humidity', 'soilMoisture', 'waterUsage')]
+            for t, timestamp in enumerate(window['timestamp']):
+                stamp = timestamp.isoformat()
+                for i, sensor_id in enumerate(self.sensor_ids):
+                    yield {
+                        'sensorId': sensor_id,
+                        'temperature': metrics[0][i][t],
+                        'humidity': metrics[1][i][t],
+                        'soilMoisture': metrics[2][i][t],
+                        'waterUsage': metrics[3][i][t],
+                        'timestamp': stamp
+                    }
+
+def main(argv=None):
+    """Write a simulated fleet history as NDJSON (e.g. for POST /iot/readings)"""
+    parser = argparse.ArgumentParser(description='Generate simulated sensor fleet readings as NDJSON')
+    parser.add_argument('--fleet', type=int, default=10000, help='number of sensors')
+    parser.add_argument('--hours', type=float, default=24, help='hours of history')
+    parser.add_argument('--interval', type=int, default=60, help='minutes between readings')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--end', type=datetime.fromisoformat, default=None,
+                        help='UTC timestamp of the last reading (ISO 8601)')
+    args = parser.parse_args(argv)
+    
+    fleet = FleetSimulator(size=args.fleet, seed=args.seed)
+    out = sys.stdout
+    for reading in fleet.iter_readings(args.hours, args.end, args.interval):
+        out.write(json.dumps(reading))
+        out.write('\n')
+
+if __name__ == '__main__':
+    main()
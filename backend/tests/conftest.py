@@ -0,0 +1,29 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Config reads the environment at import time, so point every writable
+# path at a scratch directory before the app is imported
+_workdir = tempfile.mkdtemp(prefix='agrinova-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ['MARKETPLACE_CACHE_SHARED_PATH'] = os.path.join(_workdir, 'marketplace_cache.generation')
+os.environ['KNOWLEDGE_BASE_INDEX_DIR'] = os.path.join(_workdir, 'kb_index')
+os.environ['YIELD_MODEL_DIR'] = os.path.join(_workdir, 'models')
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app, init_db
+
+    app = create_app()
+    with app.app_context():
+        init_db()
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
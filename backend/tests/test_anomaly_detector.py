@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from services.anomaly_detector import AnomalyDetector
+
+def _reading(minute, humidity):
+    return {
+        'sensor_id': 'sensor-001',
+        'timestamp': datetime(2024, 1, 1) + timedelta(minutes=minute),
+        'temperature': 20.0,
+        'humidity': humidity,
+        'soil_moisture': 50.0,
+        'water_usage': 100.0
+    }
+
+def test_missing_metric_does_not_bias_its_baseline():
+    detector = AnomalyDetector()
+    # Humidity is absent from the first reading only
+    detector.observe([_reading(0, None)] + [_reading(i, 60.0) for i in range(1, 40)])
+
+    assert detector._state['humidity'][0][0] == 60.0
+    assert detector.observe([_reading(40, 60.0)]) == []
+
+def test_readings_across_a_dst_change_are_not_stale(monkeypatch):
+    import time
+    monkeypatch.setenv('TZ', 'Europe/Berlin')
+    time.tzset()
+    try:
+        detector = AnomalyDetector()
+        # 02:00-03:00 does not exist in Berlin on 2024-03-31; read as local
+        # time, 02:45 would come out later than 03:00
+        start = datetime(2024, 3, 31, 1, 0)
+        detector.observe([
+            dict(_reading(0, 60.0), timestamp=start + timedelta(minutes=15 * i)) for i in range(12)
+        ])
+        assert detector.stats()['staleReadings'] == 0
+    finally:
+        monkeypatch.delenv('TZ')
+        time.tzset()
+
+def test_mean_switches_to_exponential_weights_at_one_over_alpha():
+    detector = AnomalyDetector(alpha=0.25, warmup=100)
+    values = [1.0, 2.0, 3.0, 4.0, 10.0]
+    means = []
+    for minute, value in enumerate(values):
+        detector.observe([_reading(minute, value)])
+        means.append(detector._state['humidity'][0][0])
+
+    # Equal weights up to the 4th value (1 / alpha), then the 5th weighs alpha
+    assert means[3] == 2.5
+    assert means[4] == 2.5 + 0.25 * (10.0 - 2.5)
+
+def test_anomalies_endpoint_accepts_repeated_sensor_ids(client):
+    from routes.iot import anomaly_detector
+
+    rows = []
+    for sensor_id in ('anomaly-a', 'anomaly-b', 'anomaly-c'):
+        readings = [_reading(i, 60.0) for i in range(40)] + [_reading(40, 99.0)]
+        rows += [dict(reading, sensor_id=sensor_id) for reading in readings]
+    anomaly_detector.observe(rows)
+
+    response = client.get('/api/v1/iot/anomalies?sensorId=anomaly-a&sensorId=anomaly-b')
+    assert response.status_code == 200
+    assert sorted(a['sensorId'] for a in response.get_json()['anomalies']) == ['anomaly-a', 'anomaly-b']
@@ -0,0 +1,29 @@
+def _product(client, stock):
+    response = client.post('/api/v1/marketplace/products', json={
+        'name': 'Checkout Test Wheat', 'description': 'Test stock', 'category': 'Grains', 'price': 10.0, 'stock': stock
+    })
+    assert response.status_code == 201
+    return response.get_json()['id']
+
+def test_partial_checkout_returns_200(client):
+    in_stock = _product(client, 5)
+    short = _product(client, 1)
+
+    response = client.post('/api/v1/marketplace/checkout', json={
+        'items': [{'productId': in_stock, 'quantity': 2}, {'productId': short, 'quantity': 3}],
+        'allOrNothing': False
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert not body['success']
+    assert body['reservedItems'] == 1
+
+def test_all_or_nothing_failure_returns_409(client):
+    in_stock = _product(client, 5)
+    short = _product(client, 1)
+
+    response = client.post('/api/v1/marketplace/checkout', json={
+        'items': [{'productId': in_stock, 'quantity': 2}, {'productId': short, 'quantity': 3}]
+    })
+    assert response.status_code == 409
+    assert response.get_json()['reservedItems'] == 0
@@ -0,0 +1,57 @@
+import random
+
+from services.crop_recommender import CropRecommender
+
+SOIL_TYPES = ['Loamy', 'Clay', 'Sandy', 'Silty']
+
+def _catalog(rng, size):
+    catalog = {}
+    for i in range(size):
+        temp_min = rng.randint(0, 30)
+        hum_min = rng.randint(20, 80)
+        catalog[f'Crop {i}'] = {
+            'soilTypes': rng.sample(SOIL_TYPES, rng.randint(1, 2)),
+            'tempRange': (temp_min, temp_min + rng.randint(2, 12)),
+            'humidityRange': (hum_min, hum_min + rng.randint(5, 20)),
+            'suitability': 'Medium',
+            'yield': 'Medium'
+        }
+    return catalog
+
+def test_index_matches_full_scan():
+    rng = random.Random(7)
+    recommender = CropRecommender(cache_size=0)
+    # Few buckets, so each one merges many range bounds
+    recommender.INDEX_BUCKETS = 8
+    recommender.crop_database = _catalog(rng, 300)
+
+    for _ in range(200):
+        soil_type = rng.choice(SOIL_TYPES + ['Unknown'])
+        temperature = rng.choice([rng.uniform(-5, 45), float(rng.randint(-5, 45))])
+        humidity = rng.choice([rng.uniform(10, 110), float(rng.randint(10, 110))])
+
+        expected = {}
+        for name, crop_data in recommender.crop_database.items():
+            score = recommender._calculate_suitability_score(crop_data, soil_type, temperature, humidity)
+            if score > 0.5:
+                expected[name] = round(score, 2)
+
+        recommendations = recommender.get_recommendations(soil_type, temperature, humidity)
+        assert {r['crop']: r['score'] for r in recommendations} == expected
+        assert [r['score'] for r in recommendations] == sorted(expected.values(), reverse=True)
+
+def test_index_memory_is_capped():
+    rng = random.Random(3)
+    catalog = _catalog(rng, 500)
+    for crop_data in catalog.values():
+        # Fractional ranges give every crop its own bounds
+        crop_data['tempRange'] = tuple(t + rng.random() for t in crop_data['tempRange'])
+    recommender = CropRecommender(cache_size=0)
+    recommender.crop_database = catalog
+    recommender.get_recommendations('Loamy', 20, 50)
+
+    temp_bounds, _ = recommender._get_breakpoints()
+    index = recommender._get_index()
+    assert len(temp_bounds) > 4 * recommender.INDEX_BUCKETS
+    assert len(index['temp']) <= recommender.INDEX_BUCKETS
+    assert len(index['hum']) <= recommender.INDEX_BUCKETS
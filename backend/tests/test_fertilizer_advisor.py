@@ -0,0 +1,33 @@
+import pytest
+
+from services.fertilizer_advisor import FertilizerAdvisor
+
+def test_shared_plans_cannot_be_changed():
+    advisor = FertilizerAdvisor()
+    plan = advisor.get_recommendations('Wheat', 'Clay', 5.5)
+
+    with pytest.raises(TypeError):
+        plan['notes'] = []
+    with pytest.raises(TypeError):
+        plan.pop('crop')
+    with pytest.raises(AttributeError):
+        plan['notes'].append('extra')
+    with pytest.raises(TypeError):
+        plan['requirements']['nitrogen'] = 'low'
+    with pytest.raises(TypeError):
+        plan['applicationSchedule'][0]['amount'] = '0 kg/ha'
+
+    # A copy is an ordinary dict
+    copy = dict(plan)
+    copy['notes'] = []
+    assert advisor.get_recommendations('Wheat', 'Clay', 5.5)['notes'] == plan['notes'] != []
+
+def test_plans_serialize_as_json(client):
+    response = client.get('/api/v1/fertilizer/recommend', query_string={
+        'cropType': 'Wheat', 'soilType': 'Clay', 'soilPh': 5.5
+    })
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['requirements']['nitrogen'] == 'high'
+    assert body['applicationSchedule'][0]['fertilizer'] == 'DAP'
+    assert len(body['notes']) == 2
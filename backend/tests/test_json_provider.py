@@ -0,0 +1,17 @@
+from models.database import db, Product
+
+def test_product_responses_match_to_dict(app, client):
+    created = client.post('/api/v1/marketplace/products', json={
+        'name': 'Encoding Test "Durum" Wheat', 'description': 'Blé dur', 'price': 12.345,
+        'stock': 3, 'category': 'Grains'
+    })
+    assert created.status_code == 201
+    product_id = created.get_json()['id']
+
+    with app.app_context():
+        expected = app.json.response(db.session.get(Product, product_id).to_dict()).get_data()
+    assert created.get_data() == expected
+    assert client.get(f'/api/v1/marketplace/products/{product_id}').get_data() == expected
+
+def test_missing_product_is_404(client):
+    assert client.get('/api/v1/marketplace/products/999999').status_code == 404
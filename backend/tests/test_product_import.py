@@ -0,0 +1,42 @@
+def _record(name, **fields):
+    record = {'name': name, 'description': 'Imported', 'price': 4.5, 'stock': 10, 'category': 'Grains'}
+    record.update(fields)
+    return record
+
+def test_null_optional_fields_get_their_defaults(client):
+    response = client.post('/api/v1/marketplace/products/import', json=[
+        _record('Import Test Barley', farmer='Green Acres'),
+        _record('Import Test Millet', farmer=None, image=None)
+    ])
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary['inserted'] == 2
+    assert summary['errors'] == []
+
+    products = client.get('/api/v1/marketplace/products', query_string={'search': 'Import Test Millet'}).get_json()
+    millet = next(p for p in products['products'] if p['name'] == 'Import Test Millet')
+    assert millet['farmer'] == 'Unknown'
+    assert millet['image'] == '🌾'
+
+def test_invalid_row_is_reported_per_index(client):
+    response = client.post('/api/v1/marketplace/products/import', json=[
+        _record('Import Test Oats'),
+        _record('Import Test Rye', price=None)
+    ])
+    summary = response.get_json()
+    assert summary['inserted'] == 1
+    assert [error['index'] for error in summary['errors']] == [1]
+
+def test_create_product_applies_the_import_rules(client):
+    missing = client.post('/api/v1/marketplace/products', json={
+        'description': 'No name', 'price': 1, 'stock': 1, 'category': 'Grains'
+    })
+    assert missing.status_code == 400
+    assert 'name' in missing.get_json()['error']
+
+    negative = client.post('/api/v1/marketplace/products', json=_record('Create Test Sorghum', price=-1))
+    assert negative.status_code == 400
+
+    created = client.post('/api/v1/marketplace/products', json=_record('Create Test Sorghum', farmer=None))
+    assert created.status_code == 201
+    assert created.get_json()['farmer'] == 'Unknown'
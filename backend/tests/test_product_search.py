@@ -0,0 +1,35 @@
+from sqlalchemy import text
+
+from models.database import db
+from services.product_search import ProductSearch
+
+FTS_OBJECTS = [
+    'DROP TRIGGER products_fts_ai',
+    'DROP TRIGGER products_fts_ad',
+    'DROP TRIGGER products_fts_au',
+    'DROP TABLE products_fts'
+]
+
+def _index_exists():
+    return db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = 'products_fts'")
+    ).first() is not None
+
+def test_requests_never_build_the_index(app):
+    from app import init_db
+
+    with app.app_context():
+        for statement in FTS_OBJECTS:
+            db.session.execute(text(statement))
+        db.session.commit()
+        try:
+            search = ProductSearch()
+            assert not search.is_available()
+            assert not _index_exists()
+
+            # Picked up once init-db has built it
+            init_db()
+            assert search.is_available()
+        finally:
+            init_db()
+        assert _index_exists()
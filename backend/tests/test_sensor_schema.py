@@ -0,0 +1,48 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from models.database import db, SensorData, SensorHourlyRollup
+from routes.iot import ingestor
+
+# sensor_data as created before readings had a unique key
+OLD_SENSOR_DATA = """CREATE TABLE sensor_data (
+    id INTEGER NOT NULL PRIMARY KEY,
+    sensor_id VARCHAR(50) NOT NULL,
+    temperature FLOAT NOT NULL,
+    humidity FLOAT NOT NULL,
+    soil_moisture FLOAT NOT NULL,
+    water_usage FLOAT,
+    timestamp DATETIME
+)"""
+
+def test_init_db_upgrades_old_sensor_table(app, client):
+    from app import init_db
+
+    with app.app_context():
+        db.session.execute(text('DROP TABLE sensor_data'))
+        db.session.execute(text(OLD_SENSOR_DATA))
+        db.session.execute(text(
+            "INSERT INTO sensor_data (sensor_id, temperature, humidity, soil_moisture, water_usage, timestamp) "
+            "VALUES ('legacy-1', 20, 60, 50, 100, '2024-01-01 00:00:00.000000'), "
+            "('legacy-1', 21, 61, 51, 101, '2024-01-01 00:00:00.000000'), "
+            "('legacy-1', 22, 62, 52, 102, '2024-01-01 01:00:00.000000')"
+        ))
+        db.session.commit()
+
+        init_db()
+        assert not ingestor.ensure_unique_key()
+
+        rows = db.session.execute(db.select(SensorData.temperature).order_by(SensorData.id)).scalars().all()
+        assert rows == [20, 22]
+        counts = db.session.execute(
+            db.select(SensorHourlyRollup.count).where(SensorHourlyRollup.sensor_id == 'legacy-1')
+        ).scalars().all()
+        assert sorted(counts) == [1, 1]
+
+    response = client.post('/api/v1/iot/readings', json=[{
+        'sensorId': 'legacy-1', 'temperature': 20, 'humidity': 60, 'soilMoisture': 50,
+        'waterUsage': 100, 'timestamp': datetime(2024, 1, 1).isoformat()
+    }])
+    assert response.status_code == 200
+    assert response.get_json()['inserted'] == 0